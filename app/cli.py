@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VMware Manager命令行工具
+
+用法:
+    python -m app.cli export vms --format parquet --output vms.parquet
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from vmware import VMwareVSphere, export
+
+
+def export_command(args: argparse.Namespace) -> int:
+    """导出清单到文件
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        int: 退出码
+    """
+    if export.pa is None:
+        logger.error("导出清单需要安装pyarrow")
+        return 1
+    if not settings.is_vmware_configured():
+        logger.error("VMware配置不完整")
+        return 1
+
+    client: VMwareVSphere = VMwareVSphere(settings.get_vmware_config())
+    output: str = args.output or f"{args.table}.{'parquet' if args.format == 'parquet' else 'arrows'}"
+    try:
+        exporter: export.InventoryExporter = export.InventoryExporter(
+            client.vi, page_size=args.page_size or settings.EXPORT_PAGE_SIZE)
+        exporter.export_to_file(args.table, output, args.format)
+    except Exception as e:
+        logger.error(f"导出清单失败: {e}")
+        return 1
+    logger.info(f"导出清单成功: {args.table}, 文件: {output}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """命令行入口
+
+    Args:
+        argv: 命令行参数，默认为sys.argv[1:]
+
+    Returns:
+        int: 退出码
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m app.cli", description="VMware Manager命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser: argparse.ArgumentParser = subparsers.add_parser("export", help="导出清单为Parquet或Arrow IPC流")
+    export_parser.add_argument("table", choices=export.EXPORT_TABLES, help="清单名称")
+    export_parser.add_argument("--format", choices=export.EXPORT_FORMATS, default="parquet", help="导出格式")
+    export_parser.add_argument("--output", help="输出文件路径，默认为<清单名称>.<扩展名>")
+    export_parser.add_argument("--page-size", type=int, help="每页收集的对象数量")
+    export_parser.set_defaults(func=export_command)
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
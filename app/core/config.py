@@ -27,7 +27,61 @@ class Settings:
             'host': '',
             'port': '443',
             'username': '',
-            'password': ''
+            'password': '',
+            'guest_operation_timeout': 300
+        },
+        'task': {
+            'max_workers': 16,
+            'retention': 3600,
+            'max_wait': 60,
+            'bulk_concurrency': 32
+        },
+        'admission': {
+            'host_limit': 8,
+            'cluster_limit': 32,
+            'datastore_limit': 16
+        },
+        'metrics': {
+            'max_query_metrics': 256,
+            'query_concurrency': 8,
+            'catalog_path': 'cache/perf_counters.json',
+            'store_retention': 3600,
+            'collector_enabled': False,
+            'collector_sessions': 4,
+            'collector_counters': [
+                'cpu.usage.average',
+                'mem.usage.average',
+                'disk.usage.average',
+                'net.usage.average'
+            ],
+            'collector_batch_size': 50,
+            'collector_target_latency': 5
+        },
+        'export': {
+            'page_size': 1000
+        },
+        'events': {
+            'poll_interval': 5,
+            'page_size': 100,
+            'buffer_size': 1000,
+            'state_path': 'cache/event_state.json'
+        },
+        'alarms': {
+            'reset_concurrency': 8
+        },
+        'storage_policies': {
+            'ttl': 300
+        },
+        'snapshots': {
+            'page_size': 1000,
+            'host_concurrency': 2,
+            'datastore_concurrency': 4
+        },
+        'deploy': {
+            'state_dir': 'cache/deployments',
+            'host_concurrency': 4,
+            'datastore_concurrency': 8,
+            'template_ttl': 300
         },
         'logging': {
             'level': 'INFO',
@@ -101,6 +155,76 @@ class Settings:
             config['vmware']['username'] = os.environ.get('VMWARE_USERNAME')
         if os.environ.get('VMWARE_PASSWORD'):
             config['vmware']['password'] = os.environ.get('VMWARE_PASSWORD')
+        if os.environ.get('VMWARE_GUEST_OPERATION_TIMEOUT'):
+            config['vmware']['guest_operation_timeout'] = int(os.environ.get('VMWARE_GUEST_OPERATION_TIMEOUT'))
+        
+        # 异步任务配置
+        if os.environ.get('TASK_MAX_WORKERS'):
+            config['task']['max_workers'] = int(os.environ.get('TASK_MAX_WORKERS'))
+        if os.environ.get('TASK_BULK_CONCURRENCY'):
+            config['task']['bulk_concurrency'] = int(os.environ.get('TASK_BULK_CONCURRENCY'))
+        
+        # 准入控制配置
+        if os.environ.get('ADMISSION_HOST_LIMIT'):
+            config['admission']['host_limit'] = int(os.environ.get('ADMISSION_HOST_LIMIT'))
+        if os.environ.get('ADMISSION_CLUSTER_LIMIT'):
+            config['admission']['cluster_limit'] = int(os.environ.get('ADMISSION_CLUSTER_LIMIT'))
+        if os.environ.get('ADMISSION_DATASTORE_LIMIT'):
+            config['admission']['datastore_limit'] = int(os.environ.get('ADMISSION_DATASTORE_LIMIT'))
+        
+        # 性能数据配置
+        if os.environ.get('METRICS_MAX_QUERY_METRICS'):
+            config['metrics']['max_query_metrics'] = int(os.environ.get('METRICS_MAX_QUERY_METRICS'))
+        if os.environ.get('METRICS_QUERY_CONCURRENCY'):
+            config['metrics']['query_concurrency'] = int(os.environ.get('METRICS_QUERY_CONCURRENCY'))
+        if os.environ.get('METRICS_CATALOG_PATH'):
+            config['metrics']['catalog_path'] = os.environ.get('METRICS_CATALOG_PATH')
+        if os.environ.get('METRICS_STORE_RETENTION'):
+            config['metrics']['store_retention'] = int(os.environ.get('METRICS_STORE_RETENTION'))
+        if os.environ.get('METRICS_COLLECTOR_ENABLED'):
+            config['metrics']['collector_enabled'] = os.environ.get('METRICS_COLLECTOR_ENABLED').lower() == 'true'
+        if os.environ.get('METRICS_COLLECTOR_SESSIONS'):
+            config['metrics']['collector_sessions'] = int(os.environ.get('METRICS_COLLECTOR_SESSIONS'))
+        
+        # 清单导出配置
+        if os.environ.get('EXPORT_PAGE_SIZE'):
+            config['export']['page_size'] = int(os.environ.get('EXPORT_PAGE_SIZE'))
+        
+        # 事件配置
+        if os.environ.get('EVENTS_POLL_INTERVAL'):
+            config['events']['poll_interval'] = float(os.environ.get('EVENTS_POLL_INTERVAL'))
+        if os.environ.get('EVENTS_PAGE_SIZE'):
+            config['events']['page_size'] = int(os.environ.get('EVENTS_PAGE_SIZE'))
+        if os.environ.get('EVENTS_BUFFER_SIZE'):
+            config['events']['buffer_size'] = int(os.environ.get('EVENTS_BUFFER_SIZE'))
+        if os.environ.get('EVENTS_STATE_PATH'):
+            config['events']['state_path'] = os.environ.get('EVENTS_STATE_PATH')
+        
+        # 告警配置
+        if os.environ.get('ALARMS_RESET_CONCURRENCY'):
+            config['alarms']['reset_concurrency'] = int(os.environ.get('ALARMS_RESET_CONCURRENCY'))
+        
+        # 存储策略配置
+        if os.environ.get('STORAGE_POLICIES_TTL'):
+            config['storage_policies']['ttl'] = int(os.environ.get('STORAGE_POLICIES_TTL'))
+        
+        # 快照配置
+        if os.environ.get('SNAPSHOTS_PAGE_SIZE'):
+            config['snapshots']['page_size'] = int(os.environ.get('SNAPSHOTS_PAGE_SIZE'))
+        if os.environ.get('SNAPSHOTS_HOST_CONCURRENCY'):
+            config['snapshots']['host_concurrency'] = int(os.environ.get('SNAPSHOTS_HOST_CONCURRENCY'))
+        if os.environ.get('SNAPSHOTS_DATASTORE_CONCURRENCY'):
+            config['snapshots']['datastore_concurrency'] = int(os.environ.get('SNAPSHOTS_DATASTORE_CONCURRENCY'))
+        
+        # 模板部署配置
+        if os.environ.get('DEPLOY_STATE_DIR'):
+            config['deploy']['state_dir'] = os.environ.get('DEPLOY_STATE_DIR')
+        if os.environ.get('DEPLOY_HOST_CONCURRENCY'):
+            config['deploy']['host_concurrency'] = int(os.environ.get('DEPLOY_HOST_CONCURRENCY'))
+        if os.environ.get('DEPLOY_DATASTORE_CONCURRENCY'):
+            config['deploy']['datastore_concurrency'] = int(os.environ.get('DEPLOY_DATASTORE_CONCURRENCY'))
+        if os.environ.get('DEPLOY_TEMPLATE_TTL'):
+            config['deploy']['template_ttl'] = int(os.environ.get('DEPLOY_TEMPLATE_TTL'))
     
     @property
     def DEBUG(self) -> bool:
@@ -126,6 +250,130 @@ class Settings:
     def VMWARE_PASSWORD(self) -> str:
         return self._config['vmware']['password']
     
+    @property
+    def VMWARE_GUEST_OPERATION_TIMEOUT(self) -> int:
+        return self._config['vmware']['guest_operation_timeout']
+    
+    @property
+    def TASK_MAX_WORKERS(self) -> int:
+        return self._config['task']['max_workers']
+    
+    @property
+    def TASK_RETENTION(self) -> int:
+        return self._config['task']['retention']
+    
+    @property
+    def TASK_MAX_WAIT(self) -> int:
+        return self._config['task']['max_wait']
+    
+    @property
+    def TASK_BULK_CONCURRENCY(self) -> int:
+        return self._config['task']['bulk_concurrency']
+    
+    @property
+    def ADMISSION_HOST_LIMIT(self) -> int:
+        return self._config['admission']['host_limit']
+    
+    @property
+    def ADMISSION_CLUSTER_LIMIT(self) -> int:
+        return self._config['admission']['cluster_limit']
+    
+    @property
+    def ADMISSION_DATASTORE_LIMIT(self) -> int:
+        return self._config['admission']['datastore_limit']
+    
+    @property
+    def METRICS_MAX_QUERY_METRICS(self) -> int:
+        return self._config['metrics']['max_query_metrics']
+    
+    @property
+    def METRICS_QUERY_CONCURRENCY(self) -> int:
+        return self._config['metrics']['query_concurrency']
+    
+    @property
+    def METRICS_CATALOG_PATH(self) -> str:
+        return self._config['metrics']['catalog_path']
+    
+    @property
+    def METRICS_STORE_RETENTION(self) -> int:
+        return self._config['metrics']['store_retention']
+    
+    @property
+    def METRICS_COLLECTOR_ENABLED(self) -> bool:
+        return self._config['metrics']['collector_enabled']
+    
+    @property
+    def METRICS_COLLECTOR_SESSIONS(self) -> int:
+        return self._config['metrics']['collector_sessions']
+    
+    @property
+    def METRICS_COLLECTOR_COUNTERS(self) -> list[str]:
+        return self._config['metrics']['collector_counters']
+    
+    @property
+    def METRICS_COLLECTOR_BATCH_SIZE(self) -> int:
+        return self._config['metrics']['collector_batch_size']
+    
+    @property
+    def METRICS_COLLECTOR_TARGET_LATENCY(self) -> float:
+        return self._config['metrics']['collector_target_latency']
+    
+    @property
+    def EXPORT_PAGE_SIZE(self) -> int:
+        return self._config['export']['page_size']
+    
+    @property
+    def EVENTS_POLL_INTERVAL(self) -> float:
+        return self._config['events']['poll_interval']
+    
+    @property
+    def EVENTS_PAGE_SIZE(self) -> int:
+        return self._config['events']['page_size']
+    
+    @property
+    def EVENTS_BUFFER_SIZE(self) -> int:
+        return self._config['events']['buffer_size']
+    
+    @property
+    def EVENTS_STATE_PATH(self) -> str:
+        return self._config['events']['state_path']
+    
+    @property
+    def ALARMS_RESET_CONCURRENCY(self) -> int:
+        return self._config['alarms']['reset_concurrency']
+    
+    @property
+    def STORAGE_POLICIES_TTL(self) -> int:
+        return self._config['storage_policies']['ttl']
+    
+    @property
+    def SNAPSHOTS_PAGE_SIZE(self) -> int:
+        return self._config['snapshots']['page_size']
+    
+    @property
+    def SNAPSHOTS_HOST_CONCURRENCY(self) -> int:
+        return self._config['snapshots']['host_concurrency']
+    
+    @property
+    def SNAPSHOTS_DATASTORE_CONCURRENCY(self) -> int:
+        return self._config['snapshots']['datastore_concurrency']
+    
+    @property
+    def DEPLOY_STATE_DIR(self) -> str:
+        return self._config['deploy']['state_dir']
+    
+    @property
+    def DEPLOY_HOST_CONCURRENCY(self) -> int:
+        return self._config['deploy']['host_concurrency']
+    
+    @property
+    def DEPLOY_DATASTORE_CONCURRENCY(self) -> int:
+        return self._config['deploy']['datastore_concurrency']
+    
+    @property
+    def DEPLOY_TEMPLATE_TTL(self) -> int:
+        return self._config['deploy']['template_ttl']
+    
     @property
     def LOG_LEVEL(self) -> str:
         return self._config['logging']['level']
@@ -142,17 +390,50 @@ class Settings:
     def LOG_RETENTION(self) -> str:
         return self._config['logging']['retention']
     
-    def get_vmware_config(self) -> dict[str, str]:
+    def get_vmware_config(self) -> dict[str, Any]:
         """获取VMware连接配置
         
         Returns:
-            dict[str, str]: VMware连接配置字典
+            dict[str, Any]: VMware连接配置字典
         """
         return {
             'host': self.VMWARE_HOST,
             'port': self.VMWARE_PORT,
             'username': self.VMWARE_USERNAME,
-            'password': self.VMWARE_PASSWORD
+            'password': self.VMWARE_PASSWORD,
+            'guest_operation_timeout': self.VMWARE_GUEST_OPERATION_TIMEOUT,
+            'admission_limits': {
+                'host': self.ADMISSION_HOST_LIMIT,
+                'cluster': self.ADMISSION_CLUSTER_LIMIT,
+                'datastore': self.ADMISSION_DATASTORE_LIMIT
+            },
+            'metrics': {
+                'max_query_metrics': self.METRICS_MAX_QUERY_METRICS,
+                'max_workers': self.METRICS_QUERY_CONCURRENCY,
+                'catalog_path': self.METRICS_CATALOG_PATH
+            },
+            'events': {
+                'state_path': self.EVENTS_STATE_PATH,
+                'page_size': self.EVENTS_PAGE_SIZE,
+                'buffer_size': self.EVENTS_BUFFER_SIZE
+            },
+            'alarms': {
+                'reset_concurrency': self.ALARMS_RESET_CONCURRENCY
+            },
+            'storage_policies': {
+                'ttl': self.STORAGE_POLICIES_TTL
+            },
+            'snapshots': {
+                'page_size': self.SNAPSHOTS_PAGE_SIZE,
+                'host_concurrency': self.SNAPSHOTS_HOST_CONCURRENCY,
+                'datastore_concurrency': self.SNAPSHOTS_DATASTORE_CONCURRENCY
+            },
+            'deploy': {
+                'state_dir': self.DEPLOY_STATE_DIR,
+                'host_concurrency': self.DEPLOY_HOST_CONCURRENCY,
+                'datastore_concurrency': self.DEPLOY_DATASTORE_CONCURRENCY,
+                'template_ttl': self.DEPLOY_TEMPLATE_TTL
+            }
         }
     
     def is_vmware_configured(self) -> bool:
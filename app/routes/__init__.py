@@ -9,6 +9,20 @@ from app.routes.datacenter import router as datacenter_router
 from app.routes.cluster import router as cluster_router
 from app.routes.folder import router as folder_router
 from app.routes.vm import router as vm_router
+from app.routes.task import router as task_router
+from app.routes.admission import router as admission_router
+from app.routes.metrics import router as metrics_router
+from app.routes.capacity import router as capacity_router
+from app.routes.export import router as export_router
+from app.routes.event import router as event_router
+from app.routes.alarm import router as alarm_router
+from app.routes.datastore import router as datastore_router
+from app.routes.fcd import router as fcd_router
+from app.routes.storage_policy import router as storage_policy_router
+from app.routes.impact import router as impact_router
+from app.routes.network import router as network_router
+from app.routes.snapshot import router as snapshot_router
+from app.routes.deployment import router as deployment_router
 
 # 创建主路由
 api_router = APIRouter()
@@ -18,3 +32,17 @@ api_router.include_router(datacenter_router, prefix="/dcs", tags=["datacenter"])
 api_router.include_router(cluster_router, prefix="/dcs", tags=["cluster"])
 api_router.include_router(folder_router, prefix="/dcs", tags=["folder"])
 api_router.include_router(vm_router, prefix="/dcs", tags=["vm"])
+api_router.include_router(task_router, prefix="/tasks", tags=["task"])
+api_router.include_router(admission_router, prefix="/admission", tags=["admission"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(capacity_router, prefix="/capacity", tags=["capacity"])
+api_router.include_router(export_router, prefix="/export", tags=["export"])
+api_router.include_router(event_router, prefix="/events", tags=["event"])
+api_router.include_router(alarm_router, prefix="/alarms", tags=["alarm"])
+api_router.include_router(datastore_router, prefix="/datastores", tags=["datastore"])
+api_router.include_router(fcd_router, prefix="/datastores", tags=["fcd"])
+api_router.include_router(storage_policy_router, prefix="/storage-policies", tags=["storage_policy"])
+api_router.include_router(impact_router, prefix="/impact", tags=["impact"])
+api_router.include_router(network_router, prefix="/networks", tags=["network"])
+api_router.include_router(snapshot_router, prefix="/snapshots", tags=["snapshot"])
+api_router.include_router(deployment_router, prefix="/deployments", tags=["deployment"])
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更操作准入控制API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[dict[str, Any]])
+async def get_admission_stats() -> ApiResponse[dict[str, Any]]:
+    """获取准入控制状态，包括并发上限、运行数量和排队深度
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 准入控制状态响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        stats: dict[str, Any] = client.get_admission_stats()
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=stats
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取准入控制状态失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取准入控制状态失败: {str(e)}'
+        )
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+告警API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse, AlarmReset
+from vmware.alarms import ALARM_SEVERITIES
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[dict[str, Any]])
+async def get_alarms(
+    severity: Optional[str] = Query(default=None, description="告警状态，多个用逗号分隔，可选red/yellow/gray/green"),
+    entity_type: Optional[str] = Query(default=None, description="实体类型，多个用逗号分隔，如VirtualMachine,HostSystem")
+) -> ApiResponse[dict[str, Any]]:
+    """获取所有实体已触发的告警
+    
+    一次属性收集拉取所有实体的triggeredAlarmState和overallStatus，告警定义按MOID缓存
+    
+    Args:
+        severity: 告警状态
+        entity_type: 实体类型
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 告警列表响应
+    """
+    try:
+        severities: Optional[list[str]] = [item.strip() for item in severity.split(",") if item.strip()] if severity else None
+        if severities:
+            invalid: list[str] = [item for item in severities if item not in ALARM_SEVERITIES]
+            if invalid:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"不支持的告警状态: {', '.join(invalid)}"
+                )
+        entity_types: Optional[list[str]] = [item.strip() for item in entity_type.split(",") if item.strip()] if entity_type else None
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        alarms: Optional[dict[str, Any]] = client.get_triggered_alarms(severities, entity_types)
+        if alarms is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取告警失败"
+            )
+        logger.info(f"获取告警成功，告警数量: {alarms['total']}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=alarms
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取告警失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取告警失败: {str(e)}'
+        )
+
+
+@router.post("/reset", response_model=ApiResponse[dict[str, Any]])
+async def reset_alarms(alarm_reset: AlarmReset) -> ApiResponse[dict[str, Any]]:
+    """批量将告警重置为绿色
+    
+    所有请求共用一个保持连接的HTTP会话，按配置的并发数同时发送，返回每个告警的重置结果
+    
+    Args:
+        alarm_reset: 待重置的告警列表
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 重置结果响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        targets: list[dict[str, str]] = list({
+            (target.alarm_moid, target.entity_moid): target.model_dump() for target in alarm_reset.alarms
+        }.values())
+        results: Optional[list[dict[str, Any]]] = client.reset_alarms(targets)
+        if results is None:
+            raise HTTPException(
+                status_code=500,
+                detail="重置告警失败"
+            )
+        succeeded: int = sum(1 for result in results if result["success"])
+        logger.info(f"重置告警完成，成功: {succeeded}, 失败: {len(results) - succeeded}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'total': len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'results': results
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"重置告警失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'重置告警失败: {str(e)}'
+        )
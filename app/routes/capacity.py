@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+容量统计API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+from vmware.capacity import Capacity
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[list[dict[str, Any]]])
+async def get_capacity(
+    group_by: str = Query(default="cluster", description="分组方式，可选host/cluster/datacenter")
+) -> ApiResponse[list[dict[str, Any]]]:
+    """按主机、集群或数据中心汇总容量
+    
+    返回每个分组的虚拟机数量、已分配的vCPU、内存和存储(总量和开机部分)、
+    主机物理CPU核数和内存，以及开机虚拟机的CPU、内存超配比
+    
+    Args:
+        group_by: 分组方式
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 容量统计响应
+    """
+    try:
+        if group_by not in Capacity.GROUP_KINDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的分组方式: {group_by}"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        capacity: list[dict[str, Any]] = client.get_capacity(group_by)
+        logger.info(f"获取容量统计成功，分组方式: {group_by}, 分组数量: {len(capacity)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=capacity
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取容量统计失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取容量统计失败: {str(e)}'
+        )
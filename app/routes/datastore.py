@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_datastores() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有存储
+    
+    一次属性收集获取所有存储的容量、主机挂载和虚拟机列表，结果按TTL缓存
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 存储列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        datastores: Optional[list[dict[str, Any]]] = client.list_datastores()
+        if datastores is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取存储列表失败"
+            )
+        logger.info(f"获取存储列表成功，数量: {len(datastores)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=datastores
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取存储列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取存储列表失败: {str(e)}'
+        )
+
+
+@router.get("/{datastore_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_datastore(datastore_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取存储详情
+    
+    Args:
+        datastore_id: 存储MOID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 存储详情响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        datastore: Optional[dict[str, Any]] = client.get_datastore(datastore_id)
+        if not datastore:
+            raise HTTPException(
+                status_code=404,
+                detail="存储不存在"
+            )
+        logger.info(f"获取存储详情成功: {datastore_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=datastore
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取存储详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取存储详情失败: {str(e)}'
+        )
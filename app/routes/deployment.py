@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模板部署API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.services.task_service import task_manager
+from app.schemas import ApiResponse, DeploymentCreate
+
+router: APIRouter = APIRouter()
+
+
+@router.get("/templates", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_templates() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有虚拟机模板
+
+    模板目录按TTL缓存，包括模板的配置、大小、所在文件夹和是否支持链接克隆
+
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 模板列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        templates: Optional[list[dict[str, Any]]] = client.list_templates()
+        if templates is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取模板列表失败"
+            )
+        logger.info(f"获取模板列表成功，数量: {len(templates)}")
+
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=templates
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取模板列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取模板列表失败: {str(e)}'
+        )
+
+
+@router.get("", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_deployments() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有模板部署任务
+
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 部署任务列表响应，包括各状态的虚拟机数量
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        jobs: Optional[list[dict[str, Any]]] = client.list_deployments()
+        if jobs is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取部署任务列表失败"
+            )
+        logger.info(f"获取部署任务列表成功，数量: {len(jobs)}")
+
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=jobs
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取部署任务列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取部署任务列表失败: {str(e)}'
+        )
+
+
+@router.post("", status_code=202, response_model=ApiResponse[dict[str, Any]])
+async def create_deployment(deployment_create: DeploymentCreate) -> ApiResponse[dict[str, Any]]:
+    """从模板批量部署虚拟机
+
+    创建部署任务时计算每台虚拟机的主机和存储，然后提交异步任务，
+    按主机和存储限制同时执行的克隆任务数，部署任务状态持久化，中断后可以继续部署
+
+    Args:
+        deployment_create: 模板部署内容
+
+    Returns:
+        ApiResponse[dict[str, Any]]: 部署任务ID和异步任务ID
+    """
+    try:
+        if len(set(deployment_create.names)) != len(deployment_create.names):
+            raise HTTPException(
+                status_code=400,
+                detail="虚拟机名称重复"
+            )
+
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        try:
+            job: dict[str, Any] = client.vi.deployments.create_job(
+                deployment_create.template_id,
+                deployment_create.names,
+                deployment_create.cluster_id,
+                folder_moid=deployment_create.folder_id,
+                datastore_moids=deployment_create.datastore_ids,
+                linked_clone=deployment_create.linked_clone,
+                power_on=deployment_create.power_on)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+        task_id: str = task_manager.submit("deploy.run", client.vi.deployments.run_job, job["job_id"])
+        logger.info(f"提交模板部署任务成功, 模板: {job['template']['name']}, 数量: {job['total']}, 任务: {task_id}")
+
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'job_id': job['job_id'],
+                'vm_count': job['total'],
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"模板部署失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'模板部署失败: {str(e)}'
+        )
+
+
+@router.get("/{job_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_deployment(job_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取模板部署任务详情
+
+    Args:
+        job_id: 部署任务ID
+
+    Returns:
+        ApiResponse[dict[str, Any]]: 部署任务详情响应，包括每台虚拟机的主机、存储和状态
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        job: Optional[dict[str, Any]] = client.get_deployment(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=404,
+                detail=f"部署任务不存在: {job_id}"
+            )
+        logger.info(f"获取部署任务详情成功，任务: {job_id}")
+
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=job
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取部署任务详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取部署任务详情失败: {str(e)}'
+        )
+
+
+@router.post("/{job_id}/resume", status_code=202, response_model=ApiResponse[dict[str, Any]])
+async def resume_deployment(job_id: str) -> ApiResponse[dict[str, Any]]:
+    """继续部署任务
+
+    跳过已成功的虚拟机，中断前已提交且已存在的虚拟机记为成功，其余虚拟机按原放置重新克隆
+
+    Args:
+        job_id: 部署任务ID
+
+    Returns:
+        ApiResponse[dict[str, Any]]: 部署任务ID和异步任务ID
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        job: Optional[dict[str, Any]] = client.get_deployment(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=404,
+                detail=f"部署任务不存在: {job_id}"
+            )
+        if client.vi.deployments.is_running(job_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"部署任务正在执行: {job_id}"
+            )
+        task_id: str = task_manager.submit("deploy.run", client.vi.deployments.run_job, job_id)
+        logger.info(f"提交继续部署任务成功, 部署任务: {job_id}, 任务: {task_id}")
+
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'job_id': job_id,
+                'vm_count': job['total'],
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"继续部署任务失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'继续部署任务失败: {str(e)}'
+        )
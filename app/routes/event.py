@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vCenter事件API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.event_service import event_stream
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[dict[str, Any]])
+async def get_events(
+    after: int = Query(default=0, ge=0, description="事件键，只返回键大于该值的事件，使用上次响应中的next"),
+    limit: int = Query(default=100, ge=1, le=1000, description="返回的最大事件数"),
+    timeout: float = Query(default=30, ge=0, le=120, description="没有新事件时的最长等待时间，单位秒，为0时立即返回")
+) -> ApiResponse[dict[str, Any]]:
+    """增量获取vCenter事件
+    
+    后台维持一个事件收集器持续读取新事件，消费者每次携带上次响应中的next继续获取，
+    不需要重新扫描历史事件。没有新事件时长轮询等待，直到有新事件或超时。
+    truncated为True表示after之后有事件已被挤出内存，消费者应重新全量同步
+    
+    Args:
+        after: 事件键
+        limit: 返回的最大事件数
+        timeout: 长轮询的最长等待时间
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 事件列表响应
+    """
+    try:
+        result: Optional[dict[str, Any]] = await event_stream.wait_events(after, limit, timeout)
+        if result is None:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取vCenter事件失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取vCenter事件失败: {str(e)}'
+        )
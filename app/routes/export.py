@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+清单导出API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from vmware import export
+
+router: APIRouter = APIRouter()
+
+# 各导出格式的媒体类型和文件扩展名
+_MEDIA_TYPES: dict[str, tuple[str, str]] = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+@router.get("/{table}")
+async def export_inventory(
+    table: str = Path(..., description="清单名称，可选vms/hosts/datastores/networks"),
+    format: str = Query(default="parquet", description="导出格式，可选parquet/arrow"),
+    page_size: Optional[int] = Query(default=None, ge=1, description="每页收集的对象数量，即每个记录批次的最大行数")
+) -> StreamingResponse:
+    """导出清单
+
+    分页收集清单对象，每页转换为一个Arrow记录批次后立即写出，
+    字符串列使用字典编码。Parquet格式每个批次为一个行组，Arrow格式为IPC流
+
+    Args:
+        table: 清单名称
+        format: 导出格式
+        page_size: 每页收集的对象数量
+
+    Returns:
+        StreamingResponse: 导出文件的流式响应
+    """
+    try:
+        if table not in export.EXPORT_TABLES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的清单: {table}"
+            )
+        if format not in export.EXPORT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的导出格式: {format}"
+            )
+        if export.pa is None:
+            raise HTTPException(
+                status_code=500,
+                detail="导出清单需要安装pyarrow"
+            )
+
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+
+        chunks: Optional[Iterator[bytes]] = client.export_inventory(
+            table, format, page_size or settings.EXPORT_PAGE_SIZE)
+        if chunks is None:
+            raise HTTPException(
+                status_code=500,
+                detail="导出清单失败"
+            )
+        logger.info(f"开始导出清单: {table}, 格式: {format}")
+
+        media_type, extension = _MEDIA_TYPES[format]
+        return StreamingResponse(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"导出清单失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'导出清单失败: {str(e)}'
+        )
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+First Class Disk API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+@router.get("/{datastore_id}/fcds", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_fcds(datastore_id: str) -> ApiResponse[list[dict[str, Any]]]:
+    """获取存储上的所有First Class Disk
+    
+    FCD目录按存储缓存，刷新时只对新增的FCD调用RetrieveVStorageObject
+    
+    Args:
+        datastore_id: 存储MOID
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: FCD列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        fcds: Optional[list[dict[str, Any]]] = client.list_fcds(datastore_id)
+        if fcds is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取FCD列表失败"
+            )
+        logger.info(f"获取FCD列表成功，存储: {datastore_id}, 数量: {len(fcds)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=fcds
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取FCD列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取FCD列表失败: {str(e)}'
+        )
+
+
+@router.get("/{datastore_id}/fcds/{fcd_name}", response_model=ApiResponse[dict[str, Any]])
+async def get_fcd(datastore_id: str, fcd_name: str) -> ApiResponse[dict[str, Any]]:
+    """按名称获取First Class Disk详情
+    
+    Args:
+        datastore_id: 存储MOID
+        fcd_name: FCD名称
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: FCD详情响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        fcd: Optional[dict[str, Any]] = client.get_fcd(datastore_id, fcd_name)
+        if not fcd:
+            raise HTTPException(
+                status_code=404,
+                detail="FCD不存在"
+            )
+        logger.info(f"获取FCD详情成功: {fcd_name}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=fcd
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取FCD详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取FCD详情失败: {str(e)}'
+        )
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+影响分析API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+def _get_dependent_vms(entity_type: str, entity_id: str) -> ApiResponse[dict[str, Any]]:
+    """从清单的反向索引获取实体上的虚拟机"""
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        impact: Optional[dict[str, Any]] = client.get_dependent_vms(entity_type, entity_id)
+        if not impact:
+            raise HTTPException(
+                status_code=404,
+                detail="实体不存在"
+            )
+        logger.info(f"获取影响分析成功，{entity_type}: {entity_id}, 虚拟机数量: {impact['total']}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=impact
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取影响分析失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取影响分析失败: {str(e)}'
+        )
+
+
+@router.get("/datastores/{datastore_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_datastore_impact(datastore_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取存储上的虚拟机
+    
+    Args:
+        datastore_id: 存储MOID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 存储信息和受影响的虚拟机列表响应
+    """
+    return _get_dependent_vms("datastore", datastore_id)
+
+
+@router.get("/hosts/{host_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_host_impact(host_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取主机上的虚拟机
+    
+    Args:
+        host_id: 主机MOID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 主机信息和受影响的虚拟机列表响应
+    """
+    return _get_dependent_vms("host", host_id)
+
+
+@router.get("/networks/{network_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_network_impact(network_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取连接到网络的虚拟机
+    
+    Args:
+        network_id: 网络或分布式端口组MOID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 网络信息和受影响的虚拟机列表响应
+    """
+    return _get_dependent_vms("network", network_id)
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能数据API路由
+"""
+
+import json
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.services.subscription_service import metrics_hub, MetricsSubscription
+from app.services.metric_store_service import metric_store, MetricStore
+from app.services.collector_service import metrics_collector
+from app.schemas import ApiResponse, MetricsQuery, MetricsHistoryQuery, CounterInfo, CounterList
+from vmware.performance import PERF_ENTITY_TYPES, REALTIME_INTERVAL_ID
+
+router: APIRouter = APIRouter()
+
+
+@router.get("/counters", response_model=ApiResponse[CounterList])
+async def list_counters(entity_type: Optional[str] = None, group: Optional[str] = None) -> ApiResponse[CounterList]:
+    """获取性能计数器目录
+    
+    计数器目录按vCenter实例UUID和版本缓存在内存和本地文件中，
+    实体类型的可用计数器按类型缓存
+    
+    Args:
+        entity_type: 实体类型，可选vm/host，指定时只返回该类型可用的计数器
+        group: 计数器分组，例如cpu、mem
+    
+    Returns:
+        ApiResponse[CounterList]: 计数器列表响应
+    """
+    try:
+        if entity_type and entity_type not in PERF_ENTITY_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的实体类型: {entity_type}"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        counters: CounterList = client.list_counters(entity_type, group)
+        logger.info(f"获取性能计数器目录成功，数量: {len(counters)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=counters
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取性能计数器目录失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取性能计数器目录失败: {str(e)}'
+        )
+
+
+@router.get("/counters/{counter_name}", response_model=ApiResponse[CounterInfo])
+async def get_counter(counter_name: str) -> ApiResponse[CounterInfo]:
+    """获取性能计数器详情
+    
+    Args:
+        counter_name: 计数器名称，格式为group.name.rollup，例如cpu.usage.average
+    
+    Returns:
+        ApiResponse[CounterInfo]: 计数器详情响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        counter: Optional[CounterInfo] = next(
+            (item for item in client.list_counters() if item["name"] == counter_name), None)
+        if not counter:
+            raise HTTPException(
+                status_code=404,
+                detail="计数器不存在"
+            )
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=counter
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取性能计数器详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取性能计数器详情失败: {str(e)}'
+        )
+
+
+@router.post("/query", response_model=ApiResponse[dict[str, Any]])
+async def query_metrics(metrics_query: MetricsQuery) -> ApiResponse[dict[str, Any]]:
+    """批量查询虚拟机和主机的性能数据
+    
+    所有实体和计数器打包为QuerySpec列表，按vCenter单次查询的指标数上限分批并发查询，
+    每个实体返回时间戳数组和每个计数器实例的取值数组
+    
+    Args:
+        metrics_query: 查询内容
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 性能数据响应
+    """
+    try:
+        if not metrics_query.vm_ids and not metrics_query.host_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="虚拟机ID和主机ID不能同时为空"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 校验计数器名称
+        counter_dict: Optional[dict[str, int]] = client.get_counter_dict()
+        if counter_dict is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取性能计数器失败"
+            )
+        unknown_counters: list[str] = [name for name in metrics_query.counters if name not in counter_dict]
+        if unknown_counters:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的计数器: {', '.join(unknown_counters)}"
+            )
+        
+        result: Optional[dict[str, Any]] = client.query_metrics(
+            {name: counter_dict[name] for name in metrics_query.counters},
+            vm_uuids=list(dict.fromkeys(metrics_query.vm_ids)),
+            host_moids=list(dict.fromkeys(metrics_query.host_ids)),
+            instance=metrics_query.instance,
+            start_time=metrics_query.start_time,
+            end_time=metrics_query.end_time,
+            interval_id=metrics_query.interval_id,
+            max_sample=metrics_query.max_sample)
+        if result is None:
+            raise HTTPException(
+                status_code=500,
+                detail="查询性能数据失败"
+            )
+        # 存储只保存实时采样，其他采样间隔的数据不写入
+        if metrics_query.interval_id == REALTIME_INTERVAL_ID:
+            metric_store.add_result(result)
+        logger.info(f"查询性能数据成功，实体数量: {len(result['metrics'])}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"查询性能数据失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'查询性能数据失败: {str(e)}'
+        )
+
+
+@router.post("/history", response_model=ApiResponse[dict[str, Any]])
+async def query_metrics_history(history_query: MetricsHistoryQuery) -> ApiResponse[dict[str, Any]]:
+    """查询历史性能数据
+    
+    根据查询范围选择保留时长能覆盖开始时间、且不超过目标分辨率的最粗采样间隔
+    (实时20秒、5分钟、30分钟、2小时、1天)，返回按目标分辨率降采样后的数据
+    
+    Args:
+        history_query: 查询内容
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 选择的采样间隔和性能数据响应
+    """
+    try:
+        if not history_query.vm_ids and not history_query.host_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="虚拟机ID和主机ID不能同时为空"
+            )
+        if history_query.end_time and history_query.end_time <= history_query.start_time:
+            raise HTTPException(
+                status_code=400,
+                detail="结束时间必须晚于开始时间"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 校验计数器名称
+        counter_dict: Optional[dict[str, int]] = client.get_counter_dict()
+        if counter_dict is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取性能计数器失败"
+            )
+        unknown_counters: list[str] = [name for name in history_query.counters if name not in counter_dict]
+        if unknown_counters:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的计数器: {', '.join(unknown_counters)}"
+            )
+        
+        result: Optional[dict[str, Any]] = client.query_metrics_history(
+            {name: counter_dict[name] for name in history_query.counters},
+            history_query.start_time,
+            history_query.end_time,
+            vm_uuids=list(dict.fromkeys(history_query.vm_ids)),
+            host_moids=list(dict.fromkeys(history_query.host_ids)),
+            resolution=history_query.resolution,
+            include_host_vms=history_query.include_host_vms)
+        if result is None:
+            raise HTTPException(
+                status_code=500,
+                detail="查询历史性能数据失败"
+            )
+        logger.info(f"查询历史性能数据成功，采样间隔: {result['interval_id']}, 实体数量: {len(result['metrics'])}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"查询历史性能数据失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'查询历史性能数据失败: {str(e)}'
+        )
+
+
+@router.get("/stream")
+async def stream_metrics(
+    request: Request,
+    counters: list[str] = Query(min_length=1, description="计数器名称列表，格式为group.name.rollup"),
+    vm_ids: list[str] = Query(default=[], description="虚拟机ID列表"),
+    host_ids: list[str] = Query(default=[], description="主机MOID列表"),
+    instance: str = Query(default="", description="实例名称，空字符串表示汇总值，*表示所有实例")
+) -> StreamingResponse:
+    """订阅实时性能数据，以Server-Sent Events推送
+    
+    所有订阅共享一个采集循环，每个实时采样周期(20秒)对订阅的并集查询一次vCenter，
+    每个订阅者收到自己关心的实体和计数器。事件类型为metrics或error
+    
+    Args:
+        request: 请求对象，用于检测客户端断开
+        counters: 计数器名称列表
+        vm_ids: 虚拟机ID列表
+        host_ids: 主机MOID列表
+        instance: 实例名称
+    
+    Returns:
+        StreamingResponse: text/event-stream响应
+    """
+    try:
+        if not vm_ids and not host_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="虚拟机ID和主机ID不能同时为空"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 校验计数器名称
+        counter_dict: Optional[dict[str, int]] = client.get_counter_dict()
+        if counter_dict is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取性能计数器失败"
+            )
+        unknown_counters: list[str] = [name for name in counters if name not in counter_dict]
+        if unknown_counters:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的计数器: {', '.join(unknown_counters)}"
+            )
+        
+        subscription: MetricsSubscription = metrics_hub.subscribe(MetricsSubscription(
+            list(dict.fromkeys(vm_ids)), list(dict.fromkeys(host_ids)),
+            list(dict.fromkeys(counters)), instance))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"订阅性能数据失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'订阅性能数据失败: {str(e)}'
+        )
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            yield f"event: subscribed\ndata: {json.dumps({'subscription_id': subscription.subscription_id})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # 保持连接，避免被代理断开
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            metrics_hub.unsubscribe(subscription.subscription_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/subscriptions", response_model=ApiResponse[dict[str, Any]])
+async def get_subscription_stats() -> ApiResponse[dict[str, Any]]:
+    """获取实时性能数据订阅状态
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 订阅数量和订阅实体数量响应
+    """
+    try:
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=metrics_hub.stats()
+        )
+    except Exception as e:
+        logger.error(f"获取订阅状态失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取订阅状态失败: {str(e)}'
+        )
+
+
+@router.get("/store/aggregate", response_model=ApiResponse[list[dict[str, Any]]])
+async def aggregate_metrics(
+    counter: str = Query(description="计数器名称，格式为group.name.rollup"),
+    entity_ids: list[str] = Query(default=[], description="实体ID列表(虚拟机UUID或主机MOID)，为空时计算所有实体"),
+    window: int = Query(default=3600, gt=0, description="时间窗口，单位秒"),
+    aggregations: list[str] = Query(default=["avg", "min", "max", "p95"], description="聚合方式，可选avg/min/max/last/p50/p90/p95/p99")
+) -> ApiResponse[list[dict[str, Any]]]:
+    """基于本地存储计算实体在时间窗口内的聚合值，不查询vCenter
+    
+    Args:
+        counter: 计数器名称
+        entity_ids: 实体ID列表
+        window: 时间窗口，单位秒
+        aggregations: 聚合方式列表
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 每个实体的采样数和聚合值响应
+    """
+    try:
+        unknown: list[str] = [how for how in aggregations if how not in MetricStore.AGGREGATIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的聚合方式: {', '.join(unknown)}"
+            )
+        
+        result: list[dict[str, Any]] = metric_store.aggregate(
+            counter, entity_ids or None, window, aggregations)
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"计算性能数据聚合值失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'计算性能数据聚合值失败: {str(e)}'
+        )
+
+
+@router.get("/store/top", response_model=ApiResponse[list[dict[str, Any]]])
+async def top_metrics(
+    counter: str = Query(description="计数器名称，格式为group.name.rollup"),
+    limit: int = Query(default=10, gt=0, le=1000, description="返回的实体数量"),
+    by: str = Query(default="avg", description="排序使用的聚合方式，可选avg/min/max/last/p50/p90/p95/p99"),
+    window: int = Query(default=3600, gt=0, description="时间窗口，单位秒"),
+    ascending: bool = Query(default=False, description="为true时取最小的N个")
+) -> ApiResponse[list[dict[str, Any]]]:
+    """基于本地存储获取聚合值最大(或最小)的N个实体
+    
+    Args:
+        counter: 计数器名称
+        limit: 返回的实体数量
+        by: 排序使用的聚合方式
+        window: 时间窗口，单位秒
+        ascending: 为True时取最小的N个
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 实体ID和聚合值响应
+    """
+    try:
+        if by not in MetricStore.AGGREGATIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的聚合方式: {by}"
+            )
+        
+        result: list[dict[str, Any]] = metric_store.top(counter, limit, by, window, ascending=ascending)
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=result
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取性能数据Top N失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取性能数据Top N失败: {str(e)}'
+        )
+
+
+@router.get("/store/series", response_model=ApiResponse[dict[str, Any]])
+async def get_stored_series(
+    counter: str = Query(description="计数器名称，格式为group.name.rollup"),
+    entity_id: str = Query(description="实体ID(虚拟机UUID或主机MOID)"),
+    window: int = Query(default=3600, gt=0, description="时间窗口，单位秒")
+) -> ApiResponse[dict[str, Any]]:
+    """获取本地存储中一个实体的原始采样
+    
+    Args:
+        counter: 计数器名称
+        entity_id: 实体ID
+        window: 时间窗口，单位秒
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 时间戳数组和取值数组响应
+    """
+    try:
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=metric_store.series(counter, entity_id, window)
+        )
+    except Exception as e:
+        logger.error(f"获取性能数据采样失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取性能数据采样失败: {str(e)}'
+        )
+
+
+@router.get("/store/stats", response_model=ApiResponse[dict[str, Any]])
+async def get_store_stats() -> ApiResponse[dict[str, Any]]:
+    """获取本地性能数据存储的实体数、计数器和内存占用
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 存储状态响应
+    """
+    try:
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=metric_store.stats()
+        )
+    except Exception as e:
+        logger.error(f"获取性能数据存储状态失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取性能数据存储状态失败: {str(e)}'
+        )
+
+
+@router.get("/collector", response_model=ApiResponse[dict[str, Any]])
+async def get_collector_stats() -> ApiResponse[dict[str, Any]]:
+    """获取后台性能数据采集状态
+    
+    包括采集周期耗时、超时次数、采集延迟(当前时间与最旧的最新采样时间之差)，
+    以及各分片的实体数、批大小和QueryPerf耗时
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 采集状态响应
+    """
+    try:
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=metrics_collector.stats()
+        )
+    except Exception as e:
+        logger.error(f"获取后台采集状态失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取后台采集状态失败: {str(e)}'
+        )
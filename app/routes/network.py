@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络拓扑API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Path
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+from vmware.networks import VLAN_ID_MAX
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_networks() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有网络和分布式端口组
+    
+    一次属性收集获取网络、分布式交换机及其连接的主机和虚拟机，结果按TTL缓存
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 网络列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        networks: Optional[list[dict[str, Any]]] = client.list_networks()
+        if networks is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取网络列表失败"
+            )
+        logger.info(f"获取网络列表成功，数量: {len(networks)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=networks
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取网络列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取网络列表失败: {str(e)}'
+        )
+
+
+@router.get("/switches", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_switches() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有分布式交换机
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 分布式交换机列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        switches: Optional[list[dict[str, Any]]] = client.list_switches()
+        if switches is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取分布式交换机列表失败"
+            )
+        logger.info(f"获取分布式交换机列表成功，数量: {len(switches)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=switches
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取分布式交换机列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取分布式交换机列表失败: {str(e)}'
+        )
+
+
+@router.get("/vlans/{vlan_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_vlan(vlan_id: int = Path(..., ge=0, le=VLAN_ID_MAX, description="VLAN ID")) -> ApiResponse[dict[str, Any]]:
+    """获取连接到VLAN的网络、主机和虚拟机
+    
+    从预先计算的邻接关系读取，中继端口组计入其包含的每个VLAN
+    
+    Args:
+        vlan_id: VLAN ID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 网络、主机和虚拟机列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        vlan: Optional[dict[str, Any]] = client.get_vlan(vlan_id)
+        if vlan is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取VLAN失败"
+            )
+        logger.info(f"获取VLAN成功: {vlan_id}, 网络数量: {len(vlan['networks'])}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=vlan
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取VLAN失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取VLAN失败: {str(e)}'
+        )
+
+
+@router.get("/{network_id}", response_model=ApiResponse[dict[str, Any]])
+async def get_network(network_id: str) -> ApiResponse[dict[str, Any]]:
+    """获取网络详情，包括VLAN和连接的主机、虚拟机
+    
+    Args:
+        network_id: 网络或分布式端口组MOID
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 网络详情响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        network: Optional[dict[str, Any]] = client.get_network(network_id)
+        if not network:
+            raise HTTPException(
+                status_code=404,
+                detail="网络不存在"
+            )
+        logger.info(f"获取网络详情成功: {network_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=network
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取网络详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取网络详情失败: {str(e)}'
+        )
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+快照API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.services.task_service import task_manager
+from app.schemas import ApiResponse, SnapshotBulkCreate, SnapshotBulkRemove
+from vmware.snapshots import SNAPSHOT_SORTS
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[dict[str, Any]])
+async def get_snapshot_report(
+    older_than_days: Optional[float] = Query(default=None, ge=0, description="只返回创建时间早于该天数的快照"),
+    larger_than_gb: Optional[float] = Query(default=None, ge=0, description="只返回大于该大小(GB)的快照"),
+    sort: str = Query(default="age", description="排序方式，age为最旧的在前，size为最大的在前"),
+    limit: int = Query(default=100, ge=1, le=10000, description="返回的最大快照数")
+) -> ApiResponse[dict[str, Any]]:
+    """获取所有虚拟机的快照报告
+    
+    分页收集所有虚拟机的快照树，在本地展开并过滤，用堆保留前limit个快照
+    
+    Args:
+        older_than_days: 只返回创建时间早于该天数的快照
+        larger_than_gb: 只返回大于该大小(GB)的快照
+        sort: 排序方式
+        limit: 返回的最大快照数
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 快照报告响应
+    """
+    try:
+        if sort not in SNAPSHOT_SORTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的排序方式: {sort}，可选{'/'.join(SNAPSHOT_SORTS)}"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        report: Optional[dict[str, Any]] = client.get_snapshot_report(older_than_days, larger_than_gb, sort, limit)
+        if report is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取快照报告失败"
+            )
+        logger.info(f"获取快照报告成功，快照数量: {report['total']}, 虚拟机数量: {report['vm_count']}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=report
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取快照报告失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取快照报告失败: {str(e)}'
+        )
+
+
+@router.post("/create", status_code=202, response_model=ApiResponse[dict[str, Any]])
+async def bulk_create_snapshots(bulk_create: SnapshotBulkCreate) -> ApiResponse[dict[str, Any]]:
+    """批量创建快照
+    
+    按主机和存储限制同时执行的快照任务数，所有任务通过共享的任务监视器等待，
+    任务进度为已结束的虚拟机比例，任务结果为每台虚拟机的操作结果
+    
+    Args:
+        bulk_create: 批量创建快照内容
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 异步任务响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 去重后提交异步任务，虚拟机的存在性在任务中批量检查
+        vm_ids: list[str] = list(dict.fromkeys(bulk_create.vm_ids))
+        task_id: str = task_manager.submit(
+            "snapshot.batch.create", client.vi.snapshots.create_snapshots,
+            vm_ids, bulk_create.name, bulk_create.description,
+            memory=bulk_create.memory, quiesce=bulk_create.quiesce)
+        logger.info(f"提交批量创建快照任务成功, 快照: {bulk_create.name}, 数量: {len(vm_ids)}, 任务: {task_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'vm_count': len(vm_ids),
+                'operation': 'create',
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"批量创建快照失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'批量创建快照失败: {str(e)}'
+        )
+
+
+@router.post("/remove", status_code=202, response_model=ApiResponse[dict[str, Any]])
+async def bulk_remove_snapshots(bulk_remove: SnapshotBulkRemove) -> ApiResponse[dict[str, Any]]:
+    """批量删除指定名称的快照
+    
+    按主机和存储限制同时执行的快照任务数，同一虚拟机有多个同名快照时不删除
+    
+    Args:
+        bulk_remove: 批量删除快照内容
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 异步任务响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        vm_ids: list[str] = list(dict.fromkeys(bulk_remove.vm_ids))
+        task_id: str = task_manager.submit(
+            "snapshot.batch.remove", client.vi.snapshots.remove_snapshots,
+            vm_ids, bulk_remove.name, remove_children=bulk_remove.remove_children)
+        logger.info(f"提交批量删除快照任务成功, 快照: {bulk_remove.name}, 数量: {len(vm_ids)}, 任务: {task_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'vm_count': len(vm_ids),
+                'operation': 'remove',
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"批量删除快照失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'批量删除快照失败: {str(e)}'
+        )
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储策略API路由
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Any, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.schemas import ApiResponse
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[list[dict[str, Any]]])
+async def list_storage_policies() -> ApiResponse[list[dict[str, Any]]]:
+    """获取所有存储策略
+    
+    存储策略按名称缓存，PBM会话与vCenter会话绑定并复用
+    
+    Returns:
+        ApiResponse[list[dict[str, Any]]]: 存储策略列表响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        policies: Optional[list[dict[str, Any]]] = client.list_storage_policies()
+        if policies is None:
+            raise HTTPException(
+                status_code=500,
+                detail="获取存储策略列表失败"
+            )
+        logger.info(f"获取存储策略列表成功，数量: {len(policies)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=policies
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取存储策略列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取存储策略列表失败: {str(e)}'
+        )
+
+
+@router.get("/{policy_name}", response_model=ApiResponse[dict[str, Any]])
+async def get_storage_policy(policy_name: str) -> ApiResponse[dict[str, Any]]:
+    """按名称获取存储策略详情
+    
+    Args:
+        policy_name: 存储策略名称
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 存储策略详情响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        policy: Optional[dict[str, Any]] = client.get_storage_policy(policy_name)
+        if not policy:
+            raise HTTPException(
+                status_code=404,
+                detail="存储策略不存在"
+            )
+        logger.info(f"获取存储策略详情成功: {policy_name}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=policy
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取存储策略详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取存储策略详情失败: {str(e)}'
+        )
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步任务查询API路由
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.task_service import task_manager
+from app.schemas import ApiResponse, TaskList, TaskInfo
+
+router: APIRouter = APIRouter()
+
+
+@router.get("", response_model=ApiResponse[TaskList])
+async def list_tasks(status: Optional[str] = None) -> ApiResponse[TaskList]:
+    """获取异步任务列表
+    
+    Args:
+        status: 按任务状态过滤，可选pending/running/success/error
+    
+    Returns:
+        ApiResponse[TaskList]: 任务列表响应
+    """
+    try:
+        tasks: TaskList = task_manager.list_tasks(status)
+        logger.info(f"获取异步任务列表成功，数量: {len(tasks)}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=tasks
+        )
+    except Exception as e:
+        logger.error(f"获取异步任务列表失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取异步任务列表失败: {str(e)}'
+        )
+
+
+@router.get("/{task_id}", response_model=ApiResponse[TaskInfo])
+async def get_task(
+    task_id: str,
+    wait: float = Query(default=0, ge=0, description="长轮询等待时间，单位秒，任务结束时立即返回")
+) -> ApiResponse[TaskInfo]:
+    """获取异步任务详情
+    
+    Args:
+        task_id: 任务ID
+        wait: 长轮询等待时间，单位秒
+    
+    Returns:
+        ApiResponse[TaskInfo]: 任务详情响应
+    """
+    try:
+        task: Optional[TaskInfo] = await task_manager.wait(task_id, min(wait, settings.TASK_MAX_WAIT))
+        if not task:
+            raise HTTPException(
+                status_code=404,
+                detail="任务不存在"
+            )
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data=task
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取异步任务详情失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'获取异步任务详情失败: {str(e)}'
+        )
@@ -7,10 +7,12 @@
 from fastapi import APIRouter, HTTPException
 from typing import Any, Optional
 
+from app.core.config import settings
 from app.core.logger import logger
 from app.services.vmware_service import get_vmware_client
+from app.services.task_service import task_manager
 from vmware import PlatformVmOperationType
-from app.schemas import ApiResponse, VmList, VmInfo
+from app.schemas import ApiResponse, VmList, VmInfo, VmUpdate, VmBulkOperation
 
 router: APIRouter = APIRouter()
 
@@ -124,7 +126,7 @@ async def get_vm(dc_id: str, vm_id: str) -> ApiResponse[VmInfo]:
         )
 
 
-@router.post("/{dc_id}/vms/{vm_id}/poweron", response_model=ApiResponse[dict[str, str]])
+@router.post("/{dc_id}/vms/{vm_id}/poweron", status_code=202, response_model=ApiResponse[dict[str, str]])
 async def poweron_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
     """启动虚拟机
     
@@ -133,12 +135,12 @@ async def poweron_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
         vm_id: 虚拟机ID
     
     Returns:
-        ApiResponse[dict[str, str]]: 操作响应
+        ApiResponse[dict[str, str]]: 异步任务响应
     """
     return await operate_vm(dc_id, vm_id, PlatformVmOperationType.POWERON.value)
 
 
-@router.post("/{dc_id}/vms/{vm_id}/poweroff", response_model=ApiResponse[dict[str, str]])
+@router.post("/{dc_id}/vms/{vm_id}/poweroff", status_code=202, response_model=ApiResponse[dict[str, str]])
 async def poweroff_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
     """关闭虚拟机
     
@@ -147,12 +149,12 @@ async def poweroff_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
         vm_id: 虚拟机ID
     
     Returns:
-        ApiResponse[dict[str, str]]: 操作响应
+        ApiResponse[dict[str, str]]: 异步任务响应
     """
     return await operate_vm(dc_id, vm_id, PlatformVmOperationType.POWEROFF.value)
 
 
-@router.post("/{dc_id}/vms/{vm_id}/reboot", response_model=ApiResponse[dict[str, str]])
+@router.post("/{dc_id}/vms/{vm_id}/reboot", status_code=202, response_model=ApiResponse[dict[str, str]])
 async def reboot_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
     """重启虚拟机
     
@@ -161,12 +163,12 @@ async def reboot_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
         vm_id: 虚拟机ID
     
     Returns:
-        ApiResponse[dict[str, str]]: 操作响应
+        ApiResponse[dict[str, str]]: 异步任务响应
     """
     return await operate_vm(dc_id, vm_id, PlatformVmOperationType.REBOOT.value)
 
 
-@router.post("/{dc_id}/vms/{vm_id}/suspend", response_model=ApiResponse[dict[str, str]])
+@router.post("/{dc_id}/vms/{vm_id}/suspend", status_code=202, response_model=ApiResponse[dict[str, str]])
 async def suspend_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
     """挂起虚拟机
     
@@ -175,21 +177,147 @@ async def suspend_vm(dc_id: str, vm_id: str) -> ApiResponse[dict[str, str]]:
         vm_id: 虚拟机ID
     
     Returns:
-        ApiResponse[dict[str, str]]: 操作响应
+        ApiResponse[dict[str, str]]: 异步任务响应
     """
     return await operate_vm(dc_id, vm_id, PlatformVmOperationType.SUSPEND.value)
 
 
+@router.post("/{dc_id}/vms/batch", status_code=202, response_model=ApiResponse[dict[str, Any]])
+async def batch_operate_vms(dc_id: str, bulk_operation: VmBulkOperation) -> ApiResponse[dict[str, Any]]:
+    """批量操作虚拟机
+    
+    开机使用PowerOnMultiVM_Task分批提交，其余操作以有限并发执行，
+    任务结果为每台虚拟机的操作结果
+    
+    Args:
+        dc_id: 数据中心ID
+        bulk_operation: 批量操作内容
+    
+    Returns:
+        ApiResponse[dict[str, Any]]: 异步任务响应
+    """
+    try:
+        operations: list[str] = [item.value for item in PlatformVmOperationType]
+        if bulk_operation.operation not in operations:
+            raise HTTPException(
+                status_code=400,
+                detail=f"不支持的操作类型: {bulk_operation.operation}"
+            )
+        
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 先获取数据中心详情，确认存在
+        datacenter: dict[str, Any] = client.detail_datacenter(dc_id)
+        if not datacenter:
+            raise HTTPException(
+                status_code=404,
+                detail="数据中心不存在"
+            )
+        
+        # 去重后提交异步任务，虚拟机的存在性在任务中批量检查
+        vm_ids: list[str] = list(dict.fromkeys(bulk_operation.vm_ids))
+        task_id: str = task_manager.submit(
+            f"vm.batch.{bulk_operation.operation}", client.vi.operate_vms_by_uuids,
+            dc_id, vm_ids, bulk_operation.operation, max_workers=settings.TASK_BULK_CONCURRENCY)
+        logger.info(f"提交虚拟机批量操作任务成功, 操作: {bulk_operation.operation}, "
+                    f"数量: {len(vm_ids)}, 任务: {task_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'vm_count': len(vm_ids),
+                'operation': bulk_operation.operation,
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"批量操作虚拟机失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'批量操作虚拟机失败: {str(e)}'
+        )
+
+
+@router.put("/{dc_id}/vms/{vm_id}", status_code=202, response_model=ApiResponse[dict[str, str]])
+async def update_vm(dc_id: str, vm_id: str, vm_update: VmUpdate) -> ApiResponse[dict[str, str]]:
+    """修改虚拟机名称和备注
+    
+    Args:
+        dc_id: 数据中心ID
+        vm_id: 虚拟机ID
+        vm_update: 虚拟机配置更新内容
+    
+    Returns:
+        ApiResponse[dict[str, str]]: 异步任务响应
+    """
+    try:
+        client = get_vmware_client()
+        if not client:
+            raise HTTPException(
+                status_code=500,
+                detail="VMware客户端未初始化"
+            )
+        
+        # 先获取数据中心详情，确认存在
+        datacenter: dict[str, Any] = client.detail_datacenter(dc_id)
+        if not datacenter:
+            raise HTTPException(
+                status_code=404,
+                detail="数据中心不存在"
+            )
+        
+        # 检查虚拟机是否存在，只解析对象引用，不组装详情
+        vm_obj: Optional[Any] = client.get_vm_obj(vm_id)
+        if not vm_obj:
+            raise HTTPException(
+                status_code=404,
+                detail="虚拟机不存在"
+            )
+        
+        # 提交异步任务，立即返回任务ID
+        task_id: str = task_manager.submit(
+            "vm.update", client.vi.update_vm_by_uuid, vm_id, vm_update.model_dump(), vm_obj=vm_obj)
+        logger.info(f"提交虚拟机更新任务成功: {vm_id}, 任务: {task_id}")
+        
+        return ApiResponse(
+            code=0,
+            message='success',
+            data={
+                'vm_id': vm_id,
+                'operation': 'update',
+                'task_id': task_id
+            }
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"更新虚拟机失败: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f'更新虚拟机失败: {str(e)}'
+        )
+
+
 async def operate_vm(dc_id: str, vm_id: str, operation: str) -> ApiResponse[dict[str, str]]:
     """操作虚拟机
     
+    操作以异步任务执行，通过/tasks/{task_id}查询进度和结果
+    
     Args:
         dc_id: 数据中心ID
         vm_id: 虚拟机ID
         operation: 操作类型
     
     Returns:
-        ApiResponse[dict[str, str]]: 操作响应
+        ApiResponse[dict[str, str]]: 异步任务响应
     """
     try:
         client = get_vmware_client()
@@ -207,17 +335,18 @@ async def operate_vm(dc_id: str, vm_id: str, operation: str) -> ApiResponse[dict
                 detail="数据中心不存在"
             )
         
-        # 检查虚拟机是否存在
-        vm: Optional[VmInfo] = client.get_vm(vm_uuid=vm_id)
-        if not vm:
+        # 检查虚拟机是否存在，只解析对象引用，不组装详情
+        vm_obj: Optional[Any] = client.get_vm_obj(vm_id)
+        if not vm_obj:
             raise HTTPException(
                 status_code=404,
                 detail="虚拟机不存在"
             )
         
-        # 执行操作
-        result: Any = client.operate_vm(vm_id, operation)
-        logger.info(f"操作虚拟机成功: {vm_id}, 操作: {operation}")
+        # 提交异步任务，复用已解析的虚拟机对象，立即返回任务ID
+        task_id: str = task_manager.submit(
+            f"vm.{operation}", client.vi.operate_vm_by_uuid, vm_id, operation, vm_obj=vm_obj)
+        logger.info(f"提交虚拟机操作任务成功: {vm_id}, 操作: {operation}, 任务: {task_id}")
         
         return ApiResponse(
             code=0,
@@ -225,7 +354,7 @@ async def operate_vm(dc_id: str, vm_id: str, operation: str) -> ApiResponse[dict
             data={
                 'vm_id': vm_id,
                 'operation': operation,
-                'result': 'success'
+                'task_id': task_id
             }
         )
     except HTTPException:
@@ -5,8 +5,9 @@
 使用Pydantic进行类型约束和数据验证
 """
 
+from datetime import datetime, timezone
 from typing import Generic, TypeVar, Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # 定义泛型类型变量
@@ -34,12 +35,168 @@ DatacenterInfo = dict[str, Any]
 ClusterInfo = dict[str, Any]
 FolderInfo = dict[str, Any]
 VmInfo = dict[str, Any]
+TaskInfo = dict[str, Any]
+CounterInfo = dict[str, Any]
 
 # 定义列表类型
 DatacenterList = list[DatacenterInfo]
 ClusterList = list[ClusterInfo]
 FolderList = list[FolderInfo]
 VmList = list[VmInfo]
+TaskList = list[TaskInfo]
+CounterList = list[CounterInfo]
+
+
+class VmUpdate(BaseModel):
+    """虚拟机配置更新请求模型
+    
+    Attributes:
+        vm_name: 虚拟机名称，为空时不修改
+        vm_note: 虚拟机备注，未传时不修改，空字符串表示清空备注
+    """
+    vm_name: Optional[str] = Field(default=None, description="虚拟机名称，为空时不修改")
+    vm_note: Optional[str] = Field(default=None, description="虚拟机备注，未传时不修改，空字符串表示清空备注")
+
+
+class VmBulkOperation(BaseModel):
+    """虚拟机批量操作请求模型
+    
+    Attributes:
+        vm_ids: 虚拟机ID列表
+        operation: 操作类型，可选poweron/poweroff/suspend/reboot/shutdown
+    """
+    vm_ids: list[str] = Field(min_length=1, description="虚拟机ID列表")
+    operation: str = Field(description="操作类型，可选poweron/poweroff/suspend/reboot/shutdown")
+
+
+
+class MetricsQuery(BaseModel):
+    """性能数据批量查询请求模型
+    
+    Attributes:
+        vm_ids: 虚拟机ID列表
+        host_ids: 主机MOID列表
+        counters: 计数器名称列表，格式为group.name.rollup
+        instance: 实例名称，空字符串表示汇总值，*表示所有实例
+        start_time: 开始时间
+        end_time: 结束时间
+        interval_id: 采样间隔，单位秒
+        max_sample: 最多返回的采样点数量
+    """
+    vm_ids: list[str] = Field(default_factory=list, description="虚拟机ID列表")
+    host_ids: list[str] = Field(default_factory=list, description="主机MOID列表")
+    counters: list[str] = Field(min_length=1, description="计数器名称列表，格式为group.name.rollup，例如cpu.usage.average")
+    instance: str = Field(default="", description="实例名称，空字符串表示汇总值，*表示所有实例")
+    start_time: Optional[datetime] = Field(default=None, description="开始时间")
+    end_time: Optional[datetime] = Field(default=None, description="结束时间")
+    interval_id: int = Field(default=20, gt=0, description="采样间隔，单位秒，实时数据为20")
+    max_sample: Optional[int] = Field(default=None, gt=0, description="最多返回的采样点数量")
+
+
+
+class MetricsHistoryQuery(BaseModel):
+    """历史性能数据查询请求模型
+    
+    Attributes:
+        vm_ids: 虚拟机ID列表
+        host_ids: 主机MOID列表
+        counters: 计数器名称列表，格式为group.name.rollup
+        start_time: 开始时间
+        end_time: 结束时间
+        resolution: 目标分辨率，单位秒
+        include_host_vms: 是否同时返回主机上所有虚拟机的数据
+    """
+    vm_ids: list[str] = Field(default_factory=list, description="虚拟机ID列表")
+    host_ids: list[str] = Field(default_factory=list, description="主机MOID列表")
+    counters: list[str] = Field(min_length=1, description="计数器名称列表，格式为group.name.rollup，例如cpu.usage.average")
+    start_time: datetime = Field(description="开始时间")
+    end_time: Optional[datetime] = Field(default=None, description="结束时间，为空时查询到当前时间")
+    resolution: Optional[int] = Field(default=None, gt=0, description="目标分辨率，单位秒，据此选择采样间隔并降采样")
+    include_host_vms: bool = Field(default=False, description="是否用QueryPerfComposite同时返回主机上所有虚拟机的数据")
+
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def to_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """统一转换为UTC时间，未指定时区的时间按UTC处理，避免与带时区的时间比较时出错"""
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+class AlarmTarget(BaseModel):
+    """待重置的告警
+    
+    Attributes:
+        alarm_moid: 告警MOID
+        entity_moid: 触发告警的实体MOID
+        entity_type: 实体类型，如VirtualMachine、HostSystem
+    """
+    alarm_moid: str = Field(description="告警MOID")
+    entity_moid: str = Field(description="触发告警的实体MOID")
+    entity_type: str = Field(description="实体类型，如VirtualMachine、HostSystem")
+
+
+class AlarmReset(BaseModel):
+    """告警批量重置请求模型
+    
+    Attributes:
+        alarms: 待重置的告警列表
+    """
+    alarms: list[AlarmTarget] = Field(min_length=1, description="待重置的告警列表")
+
+
+class SnapshotBulkCreate(BaseModel):
+    """批量创建快照请求模型
+    
+    Attributes:
+        vm_ids: 虚拟机ID列表
+        name: 快照名称
+        description: 快照描述
+        memory: 是否包括虚拟机内存
+        quiesce: 是否静默客户机文件系统
+    """
+    vm_ids: list[str] = Field(min_length=1, description="虚拟机ID列表")
+    name: str = Field(min_length=1, description="快照名称")
+    description: str = Field(default="", description="快照描述")
+    memory: bool = Field(default=False, description="是否包括虚拟机内存")
+    quiesce: bool = Field(default=False, description="是否静默客户机文件系统，需要安装VMware Tools")
+
+
+class SnapshotBulkRemove(BaseModel):
+    """批量删除快照请求模型
+    
+    Attributes:
+        vm_ids: 虚拟机ID列表
+        name: 快照名称
+        remove_children: 是否同时删除子快照
+    """
+    vm_ids: list[str] = Field(min_length=1, description="虚拟机ID列表")
+    name: str = Field(min_length=1, description="快照名称")
+    remove_children: bool = Field(default=False, description="是否同时删除子快照")
+
+
+class DeploymentCreate(BaseModel):
+    """模板部署请求模型
+    
+    Attributes:
+        template_id: 模板UUID
+        names: 新虚拟机名称列表
+        cluster_id: 目标集群MOID
+        folder_id: 目标文件夹MOID
+        datastore_ids: 候选存储MOID列表
+        linked_clone: 是否链接克隆
+        power_on: 克隆完成后是否开机
+    """
+    template_id: str = Field(min_length=1, description="模板UUID")
+    names: list[str] = Field(min_length=1, description="新虚拟机名称列表")
+    cluster_id: str = Field(min_length=1, description="目标集群MOID")
+    folder_id: Optional[str] = Field(default=None, description="目标文件夹MOID，为空时使用模板所在文件夹")
+    datastore_ids: list[str] = Field(default=[], description="候选存储MOID列表，为空时使用集群主机挂载的所有存储")
+    linked_clone: bool = Field(default=False, description="是否链接克隆，需要模板有快照")
+    power_on: bool = Field(default=False, description="克隆完成后是否开机")
+
 
 # 导出所有模型
 __all__ = [
@@ -48,8 +205,21 @@ __all__ = [
     'ClusterInfo',
     'FolderInfo',
     'VmInfo',
+    'TaskInfo',
+    'CounterInfo',
     'DatacenterList',
     'ClusterList',
     'FolderList',
-    'VmList'
+    'VmList',
+    'TaskList',
+    'CounterList',
+    'VmUpdate',
+    'VmBulkOperation',
+    'MetricsQuery',
+    'MetricsHistoryQuery',
+    'AlarmTarget',
+    'AlarmReset',
+    'SnapshotBulkCreate',
+    'SnapshotBulkRemove',
+    'DeploymentCreate'
 ]
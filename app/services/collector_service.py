@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台性能数据采集
+在每个实时采样周期内采集所有虚拟机和主机的性能数据并写入本地存储。
+实体按MOID分片到多个vCenter会话并行采集，每个会话根据QueryPerf的耗时自适应调整批大小
+"""
+
+import time
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Final, Optional
+
+from pyVmomi import vim
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.metric_store_service import metric_store
+from vmware.interface import VMwareVSphereInterface
+from vmware.performance import REALTIME_INTERVAL_ID, REALTIME_RETENTION, PERF_ENTITY_TYPES
+
+
+class CollectorShard:
+    """采集分片，独占一个vCenter会话"""
+
+    def __init__(self, index: int, vi: VMwareVSphereInterface, batch_size: int, max_batch_size: int) -> None:
+        """初始化CollectorShard实例
+
+        Args:
+            index: 分片序号
+            vi: 分片独占的VMwareVSphereInterface实例
+            batch_size: 初始批大小，单次QueryPerf的实体数
+            max_batch_size: 批大小上限
+        """
+        self.index: int = index
+        self.vi: VMwareVSphereInterface = vi
+        self.batch_size: int = batch_size
+        self.max_batch_size: int = max_batch_size
+        self.entities: list[str] = []
+        # 每个实体已采集到的最新采样时间，下次从该时间之后开始查询，避免漏采
+        self.latest: dict[str, datetime] = {}
+        self.last_latency: float = 0
+        self.last_duration: float = 0
+        self.last_errors: int = 0
+
+    def adapt(self, latency: float, target_latency: float) -> None:
+        """根据单批耗时调整批大小：耗时低于目标一半时放大，超过目标时减半"""
+        if latency > target_latency:
+            self.batch_size = max(self.batch_size // 2, 1)
+        elif latency < target_latency / 2:
+            self.batch_size = min(int(self.batch_size * 1.5) + 1, self.max_batch_size)
+
+
+class MetricsCollector:
+    """后台性能数据采集类"""
+
+    def __init__(
+        self,
+        sessions: int,
+        counters: list[str],
+        batch_size: int,
+        target_latency: float,
+        interval: int = REALTIME_INTERVAL_ID,
+    ) -> None:
+        """初始化MetricsCollector实例
+
+        Args:
+            sessions: vCenter会话数，即分片数
+            counters: 采集的计数器名称列表
+            batch_size: 初始批大小，单次QueryPerf的实体数
+            target_latency: 单次QueryPerf的目标耗时，单位秒
+            interval: 采集周期，单位秒
+        """
+        self.sessions: int = max(sessions, 1)
+        self.counters: list[str] = counters
+        self.batch_size: int = max(batch_size, 1)
+        self.target_latency: float = target_latency
+        self.interval: int = interval
+        self._shards: list[CollectorShard] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event: threading.Event = threading.Event()
+        self._entities: dict[str, tuple[str, str]] = {}
+        self._stats: dict[str, Any] = {
+            "cycles": 0,
+            "overruns": 0,
+            "last_cycle_time": "",
+            "last_cycle_duration": 0,
+            "lag": None,
+            "entities": 0,
+            "collected_entities": 0,
+            "errors": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动采集线程，每个分片建立独立的vCenter会话"""
+        if self.running:
+            return
+        account: dict[str, Any] = settings.get_vmware_config()
+        max_batch_size: int = max(settings.METRICS_MAX_QUERY_METRICS // max(len(self.counters), 1), 1)
+        self._shards = [
+            CollectorShard(index, VMwareVSphereInterface(dict(account)),
+                           min(self.batch_size, max_batch_size), max_batch_size)
+            for index in range(self.sessions)
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix="vmware-collector-shard")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="vmware-metrics-collector", daemon=True)
+        self._thread.start()
+        logger.info(f"启动后台性能数据采集，会话数: {self.sessions}, 计数器: {', '.join(self.counters)}")
+
+    def stop(self) -> None:
+        """停止采集线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("停止后台性能数据采集")
+
+    def _run(self) -> None:
+        """采集循环，周期与采样间隔对齐"""
+        while not self._stop_event.is_set():
+            started: float = time.monotonic()
+            try:
+                self.collect_once()
+            except Exception as e:
+                logger.error(f"后台采集性能数据失败: {e}")
+            elapsed: float = time.monotonic() - started
+            if elapsed > self.interval:
+                self._stats["overruns"] += 1
+                logger.warning(f"后台采集耗时{elapsed:.1f}秒，超过采集周期{self.interval}秒")
+            self._stop_event.wait(max(self.interval - elapsed, 0))
+
+    def _assign_entities(self) -> None:
+        """按MOID的哈希把实体分配到分片，实体增减时其余实体所在分片不变"""
+        self._entities = self._shards[0].vi.inventory.list_perf_entities()
+        assigned: list[list[str]] = [[] for _ in self._shards]
+        for moid in sorted(self._entities):
+            assigned[zlib.crc32(moid.encode()) % len(self._shards)].append(moid)
+        for shard, entities in zip(self._shards, assigned):
+            shard.entities = entities
+            shard.latest = {moid: shard.latest[moid] for moid in entities if moid in shard.latest}
+
+    def collect_once(self) -> None:
+        """采集一个周期，所有分片并行执行"""
+        cycle_started: float = time.monotonic()
+        self._assign_entities()
+        counter_dict: dict[str, int] = self._shards[0].vi.get_counter_dict()
+        counter_ids: dict[str, int] = {name: counter_dict[name] for name in self.counters if name in counter_dict}
+        collected: list[int] = list(self._executor.map(
+            lambda shard: self._collect_shard(shard, counter_ids), self._shards))
+
+        latest: list[datetime] = [
+            timestamp for shard in self._shards for timestamp in shard.latest.values()
+        ]
+        self._stats.update({
+            "cycles": self._stats["cycles"] + 1,
+            "last_cycle_time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "last_cycle_duration": round(time.monotonic() - cycle_started, 3),
+            # 采集延迟：当前时间与所有实体中最旧的最新采样时间之差
+            "lag": round((datetime.now(timezone.utc) - min(latest)).total_seconds(), 1) if latest else None,
+            "entities": len(self._entities),
+            "collected_entities": sum(collected),
+            "errors": sum(shard.last_errors for shard in self._shards),
+        })
+
+    def _collect_shard(self, shard: CollectorShard, counter_ids: dict[str, int]) -> int:
+        """采集一个分片的所有实体，返回有数据的实体数"""
+        started: float = time.monotonic()
+        shard.last_errors = 0
+        collected: int = 0
+        counter_names: dict[int, str] = {counter_id: name for name, counter_id in counter_ids.items()}
+        now: datetime = datetime.now(timezone.utc)
+        earliest: datetime = now - timedelta(seconds=REALTIME_RETENTION - self.interval)
+        default_start: datetime = now - timedelta(seconds=self.interval * 2)
+        stub: Any = shard.vi.si._stub
+        position: int = 0
+        while position < len(shard.entities) and not self._stop_event.is_set():
+            batch: list[str] = shard.entities[position:position + shard.batch_size]
+            position += len(batch)
+            # 从批内最旧的已采集时间开始查询，补齐上个周期遗漏的采样
+            start_time: datetime = max(min((shard.latest.get(moid, default_start) for moid in batch)), earliest)
+            query_specs: list[Any] = [
+                shard.vi.performance.build_query_spec(
+                    PERF_ENTITY_TYPES[self._entities[moid][0]](moid, stub), list(counter_ids.values()),
+                    start_time=start_time, interval_id=self.interval)
+                for moid in batch
+            ]
+            batch_started: float = time.monotonic()
+            try:
+                results: list[Any] = shard.vi.performance.perf_manager.QueryPerf(querySpec=query_specs) or []
+            except vim.fault.NotAuthenticated:
+                # 会话过期时重新登录，本批在下个周期补采
+                shard.vi._si = None
+                shard.vi._content = None
+                shard.last_errors += 1
+                break
+            except Exception as e:
+                logger.error(f"采集分片{shard.index}性能数据失败: {e}")
+                shard.last_errors += 1
+                shard.adapt(self.target_latency * 2, self.target_latency)
+                continue
+            shard.last_latency = time.monotonic() - batch_started
+            shard.adapt(shard.last_latency, self.target_latency)
+            collected += self._store_results(shard, results, counter_names)
+        shard.last_duration = time.monotonic() - started
+        return collected
+
+    def _store_results(self, shard: CollectorShard, results: list[Any], counter_names: dict[int, str]) -> int:
+        """写入本地存储并记录每个实体的最新采样时间"""
+        collected: int = 0
+        for entity_metric in results:
+            if not entity_metric.sampleInfo:
+                continue
+            moid: str = entity_metric.entity._moId
+            timestamps: list[float] = [sample_info.timestamp.timestamp() for sample_info in entity_metric.sampleInfo]
+            for series in entity_metric.value:
+                if series.id.instance or series.id.counterId not in counter_names:
+                    continue
+                metric_store.add(self._entities[moid][1], counter_names[series.id.counterId],
+                                 timestamps, list(series.value))
+            shard.latest[moid] = entity_metric.sampleInfo[-1].timestamp
+            collected += 1
+        return collected
+
+    def stats(self) -> dict[str, Any]:
+        """获取采集状态和各分片的批大小、耗时
+
+        Returns:
+            dict[str, Any]: 采集状态
+        """
+        return dict(
+            self._stats,
+            running=self.running,
+            interval=self.interval,
+            counters=self.counters,
+            shards=[
+                {
+                    "index": shard.index,
+                    "entities": len(shard.entities),
+                    "batch_size": shard.batch_size,
+                    "last_latency": round(shard.last_latency, 3),
+                    "last_duration": round(shard.last_duration, 3),
+                    "errors": shard.last_errors,
+                }
+                for shard in self._shards
+            ],
+        )
+
+
+# 全局后台性能数据采集实例
+metrics_collector: Final[MetricsCollector] = MetricsCollector(
+    sessions=settings.METRICS_COLLECTOR_SESSIONS,
+    counters=settings.METRICS_COLLECTOR_COUNTERS,
+    batch_size=settings.METRICS_COLLECTOR_BATCH_SIZE,
+    target_latency=settings.METRICS_COLLECTOR_TARGET_LATENCY
+)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+vCenter事件流
+后台按固定间隔从长期存在的事件收集器读取新事件，
+消费者按事件键增量获取，没有新事件时长轮询等待
+"""
+
+import asyncio
+from typing import Any, Final, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+
+
+class EventStream:
+    """vCenter事件流类
+
+    服务启动时启动读取循环，首次获取事件时若未运行则补充启动，所有消费者共享同一个事件收集器
+    """
+
+    # 连接或读取连续失败时退避的最长间隔，单位秒
+    MAX_BACKOFF: float = 300
+
+    def __init__(self, poll_interval: float) -> None:
+        """初始化EventStream实例
+
+        Args:
+            poll_interval: 读取新事件的间隔，单位秒
+        """
+        self.poll_interval: float = poll_interval
+        self._poller: Optional[asyncio.Task] = None
+        # 每次读到新事件时置位并替换，等待中的消费者随之返回
+        self._new_events: asyncio.Event = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._poller is not None and not self._poller.done()
+
+    def start(self) -> None:
+        """启动读取循环，必须在事件循环中调用"""
+        if not self.running:
+            self._poller = asyncio.create_task(self._poll_loop())
+            logger.info(f"启动vCenter事件读取，间隔: {self.poll_interval}秒")
+
+    async def stop(self) -> None:
+        """停止读取循环并销毁事件收集器"""
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        client = await asyncio.to_thread(get_vmware_client)
+        if client:
+            await asyncio.to_thread(client.close_event_feed)
+        logger.info("停止vCenter事件读取")
+
+    async def _poll_loop(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        failures: int = 0
+        while True:
+            started: float = loop.time()
+            try:
+                # 获取客户端可能需要登录vCenter，不能阻塞事件循环
+                client = await asyncio.to_thread(get_vmware_client)
+                if client:
+                    events: Optional[list[dict[str, Any]]] = await asyncio.to_thread(client.read_new_events)
+                    if events is None:
+                        failures += 1
+                    else:
+                        failures = 0
+                    if events:
+                        self._new_events.set()
+                        self._new_events = asyncio.Event()
+                else:
+                    failures += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                logger.error(f"读取vCenter事件失败: {e}")
+            # 连续失败时按指数退避，避免vCenter不可达时反复登录
+            interval: float = self.poll_interval
+            if failures:
+                interval = min(self.poll_interval * 2 ** min(failures, 16), self.MAX_BACKOFF)
+            await asyncio.sleep(max(interval - (loop.time() - started), 0))
+
+    async def wait_events(self, after: int, limit: int, timeout: float) -> Optional[dict[str, Any]]:
+        """获取指定事件键之后的事件，没有新事件时最多等待timeout秒
+
+        Args:
+            after: 事件键，只返回键大于该值的事件
+            limit: 返回的最大事件数
+            timeout: 长轮询的最长等待时间，单位秒，为0时立即返回
+
+        Returns:
+            Optional[dict[str, Any]]: 事件列表、下次请求使用的事件键和是否有事件被挤出内存，
+                                      VMware客户端未初始化时返回None
+        """
+        client = await asyncio.to_thread(get_vmware_client)
+        if not client:
+            return None
+        self.start()
+        result: dict[str, Any] = client.get_events(after, limit)
+        if result["events"] or timeout <= 0:
+            return result
+        new_events: asyncio.Event = self._new_events
+        try:
+            await asyncio.wait_for(new_events.wait(), timeout)
+        except asyncio.TimeoutError:
+            return result
+        return client.get_events(after, limit)
+
+
+# 全局vCenter事件流实例
+event_stream: Final[EventStream] = EventStream(poll_interval=settings.EVENTS_POLL_INTERVAL)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内性能数据存储
+每个计数器使用一个预分配的NumPy环形缓冲区保存最近一段时间的实时采样，
+聚合、分位数和Top N均为对整个矩阵的向量化计算
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Any, Final, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from vmware.performance import REALTIME_INTERVAL_ID
+
+
+class CounterBuffer:
+    """单个计数器的环形缓冲区
+
+    values为实体数x时间槽的矩阵，时间槽按采样时间对槽数取模定位，
+    slot_epochs记录每个时间槽当前保存的采样时间(按采样间隔取整)，
+    时间槽被新的采样时间占用时整列清空
+    """
+
+    def __init__(self, slots: int, capacity: int) -> None:
+        self.values: np.ndarray = np.full((capacity, slots), np.nan, dtype=np.float32)
+        self.slot_epochs: np.ndarray = np.full(slots, -1, dtype=np.int64)
+
+    def ensure_capacity(self, capacity: int) -> None:
+        """实体数超过容量时按倍数扩容"""
+        current: int = self.values.shape[0]
+        if capacity <= current:
+            return
+        new_capacity: int = max(capacity, current * 2)
+        values: np.ndarray = np.full((new_capacity, self.values.shape[1]), np.nan, dtype=np.float32)
+        values[:current] = self.values
+        self.values = values
+
+
+class MetricStore:
+    """进程内性能数据存储类
+
+    只保存汇总值(instance为空字符串)的序列，实体ID为虚拟机UUID或主机MOID
+    """
+
+    # 支持的聚合方式
+    AGGREGATIONS: tuple[str, ...] = ("avg", "min", "max", "last", "p50", "p90", "p95", "p99")
+
+    def __init__(self, retention: int, interval: int = REALTIME_INTERVAL_ID, initial_capacity: int = 1024) -> None:
+        """初始化MetricStore实例
+
+        Args:
+            retention: 保留时长，单位秒
+            interval: 采样间隔，单位秒
+            initial_capacity: 每个计数器预分配的实体数
+        """
+        self.interval: int = interval
+        self.slots: int = max(retention // interval, 1)
+        self.initial_capacity: int = initial_capacity
+        self._lock: threading.Lock = threading.Lock()
+        self._entities: dict[str, int] = {}
+        self._entity_ids: list[str] = []
+        self._buffers: dict[str, CounterBuffer] = {}
+
+    def _entity_row(self, entity_id: str) -> int:
+        row: Optional[int] = self._entities.get(entity_id)
+        if row is None:
+            row = len(self._entity_ids)
+            self._entities[entity_id] = row
+            self._entity_ids.append(entity_id)
+        return row
+
+    def _buffer(self, counter: str) -> CounterBuffer:
+        buffer: Optional[CounterBuffer] = self._buffers.get(counter)
+        if buffer is None:
+            buffer = CounterBuffer(self.slots, max(self.initial_capacity, len(self._entity_ids)))
+            self._buffers[counter] = buffer
+        return buffer
+
+    def add(self, entity_id: str, counter: str, timestamps: list[float], values: list[float]) -> None:
+        """写入一个实体一个计数器的采样
+
+        Args:
+            entity_id: 实体ID
+            counter: 计数器名称
+            timestamps: 采样时间，Unix时间戳
+            values: 采样值，负数表示vCenter没有数据
+        """
+        if not timestamps:
+            return
+        epochs: np.ndarray = np.asarray(timestamps, dtype=np.int64) // self.interval
+        samples: np.ndarray = np.asarray(values, dtype=np.float32)
+        samples[samples < 0] = np.nan
+        with self._lock:
+            row: int = self._entity_row(entity_id)
+            buffer: CounterBuffer = self._buffer(counter)
+            buffer.ensure_capacity(len(self._entity_ids))
+            slots: np.ndarray = epochs % self.slots
+            # 时间槽被更新的采样时间占用时清空整列，早于槽内时间的采样丢弃
+            advanced: np.ndarray = epochs > buffer.slot_epochs[slots]
+            if advanced.any():
+                buffer.values[:, slots[advanced]] = np.nan
+                buffer.slot_epochs[slots[advanced]] = epochs[advanced]
+            current: np.ndarray = epochs == buffer.slot_epochs[slots]
+            buffer.values[row, slots[current]] = samples[current]
+
+    def add_result(self, result: dict[str, Any]) -> None:
+        """写入query_metrics的查询结果"""
+        for metric in result.get("metrics", []):
+            timestamps: list[float] = [_parse_timestamp(timestamp) for timestamp in metric["timestamps"]]
+            for series in metric["series"]:
+                if series["instance"]:
+                    continue
+                self.add(metric["id"], series["counter"], timestamps, series["values"])
+
+    def _window(self, buffer: CounterBuffer, window: int) -> np.ndarray:
+        """计算时间窗口内的时间槽，窗口以该计数器最新的采样时间为终点"""
+        latest: int = int(buffer.slot_epochs.max())
+        if latest < 0:
+            return np.zeros(0, dtype=np.int64)
+        first: int = latest - max(window // self.interval, 1) + 1
+        return np.flatnonzero(buffer.slot_epochs >= first)
+
+    def _rows(self, entity_ids: Optional[list[str]]) -> tuple[np.ndarray, list[str]]:
+        if entity_ids is None:
+            return np.arange(len(self._entity_ids)), list(self._entity_ids)
+        known: list[str] = [entity_id for entity_id in entity_ids if entity_id in self._entities]
+        return np.asarray([self._entities[entity_id] for entity_id in known], dtype=np.int64), known
+
+    @staticmethod
+    def _aggregate(matrix: np.ndarray, how: str, ordered: Optional[np.ndarray] = None) -> np.ndarray:
+        """按行聚合，matrix的列已按时间顺序排列，每行至少有一个非空值
+
+        Args:
+            matrix: 采样矩阵
+            how: 聚合方式
+            ordered: 按行排序后的采样矩阵(空值排在末尾)，计算分位数时复用
+        """
+        if how == "avg":
+            return np.nanmean(matrix, axis=1)
+        if how == "min":
+            return np.nanmin(matrix, axis=1)
+        if how == "max":
+            return np.nanmax(matrix, axis=1)
+        valid: np.ndarray = ~np.isnan(matrix)
+        rows: np.ndarray = np.arange(matrix.shape[0])
+        if how == "last":
+            # 每行最后一个非空值
+            last_index: np.ndarray = matrix.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+            return matrix[rows, last_index]
+        # 分位数按线性插值计算，与numpy.percentile的默认方式一致，
+        # 对排序后的矩阵按下标取值，避免nanpercentile逐行处理
+        if ordered is None:
+            ordered = np.sort(matrix, axis=1)
+        position: np.ndarray = (np.count_nonzero(valid, axis=1) - 1) * (float(how[1:]) / 100)
+        lower: np.ndarray = np.floor(position).astype(np.int64)
+        upper: np.ndarray = np.ceil(position).astype(np.int64)
+        return ordered[rows, lower] + (ordered[rows, upper] - ordered[rows, lower]) * (position - lower)
+
+    def _window_matrix(
+        self,
+        counter: str,
+        entity_ids: Optional[list[str]],
+        window: int,
+    ) -> tuple[np.ndarray, list[str], np.ndarray]:
+        """取出时间窗口内的子矩阵，列按采样时间排序"""
+        buffer: Optional[CounterBuffer] = self._buffers.get(counter)
+        rows, ids = self._rows(entity_ids)
+        if buffer is None or not len(rows):
+            return np.empty((0, 0), dtype=np.float32), [], np.zeros(0, dtype=np.int64)
+        columns: np.ndarray = self._window(buffer, window)
+        columns = columns[np.argsort(buffer.slot_epochs[columns])]
+        # 实体行号全局分配，只写入其他计数器的实体可能超出该计数器缓冲区的容量，这些行视为空值
+        matrix: np.ndarray = np.full((len(rows), len(columns)), np.nan, dtype=np.float32)
+        in_buffer: np.ndarray = rows < buffer.values.shape[0]
+        matrix[in_buffer] = buffer.values[np.ix_(rows[in_buffer], columns)]
+        return matrix, ids, buffer.slot_epochs[columns]
+
+    def aggregate(
+        self,
+        counter: str,
+        entity_ids: Optional[list[str]] = None,
+        window: int = 3600,
+        aggregations: Optional[list[str]] = None,
+    ) -> list[dict[str, Any]]:
+        """计算每个实体在时间窗口内的聚合值
+
+        Args:
+            counter: 计数器名称
+            entity_ids: 实体ID列表，为空时计算所有实体
+            window: 时间窗口，单位秒
+            aggregations: 聚合方式列表，默认为avg/min/max/p95
+
+        Returns:
+            list[dict[str, Any]]: 每个实体的采样数和聚合值，没有采样的实体不返回
+        """
+        aggregations = aggregations or ["avg", "min", "max", "p95"]
+        with self._lock:
+            matrix, ids, _ = self._window_matrix(counter, entity_ids, window)
+        if not matrix.size:
+            return []
+        counts: np.ndarray = np.count_nonzero(~np.isnan(matrix), axis=1)
+        has_data: np.ndarray = counts > 0
+        matrix = matrix[has_data]
+        ordered: Optional[np.ndarray] = None
+        if any(how.startswith("p") for how in aggregations):
+            ordered = np.sort(matrix, axis=1)
+        columns: dict[str, np.ndarray] = {how: self._aggregate(matrix, how, ordered) for how in aggregations}
+        ids = [entity_id for entity_id, valid in zip(ids, has_data) if valid]
+        return [
+            dict({"id": entity_id, "count": int(count)},
+                 **{how: round(float(columns[how][index]), 2) for how in aggregations})
+            for index, (entity_id, count) in enumerate(zip(ids, counts[has_data]))
+        ]
+
+    def top(
+        self,
+        counter: str,
+        limit: int = 10,
+        by: str = "avg",
+        window: int = 3600,
+        entity_ids: Optional[list[str]] = None,
+        ascending: bool = False,
+    ) -> list[dict[str, Any]]:
+        """按聚合值排序取前N个实体
+
+        Args:
+            counter: 计数器名称
+            limit: 返回的实体数量
+            by: 排序使用的聚合方式
+            window: 时间窗口，单位秒
+            entity_ids: 实体ID列表，为空时在所有实体中排序
+            ascending: 为True时取最小的N个
+
+        Returns:
+            list[dict[str, Any]]: 实体ID和聚合值
+        """
+        with self._lock:
+            matrix, ids, _ = self._window_matrix(counter, entity_ids, window)
+        if not matrix.size:
+            return []
+        has_data: np.ndarray = (~np.isnan(matrix)).any(axis=1)
+        matrix = matrix[has_data]
+        ids = [entity_id for entity_id, valid in zip(ids, has_data) if valid]
+        if not ids:
+            return []
+        scores: np.ndarray = self._aggregate(matrix, by)
+        keys: np.ndarray = scores if ascending else -scores
+        limit = min(limit, len(ids))
+        # 先用argpartition取出前N个，再只对这N个排序
+        candidates: np.ndarray = np.argpartition(keys, limit - 1)[:limit]
+        candidates = candidates[np.argsort(keys[candidates])]
+        return [{"id": ids[index], by: round(float(scores[index]), 2)} for index in candidates]
+
+    def series(self, counter: str, entity_id: str, window: int = 3600) -> dict[str, Any]:
+        """获取一个实体在时间窗口内的原始采样"""
+        with self._lock:
+            matrix, ids, epochs = self._window_matrix(counter, [entity_id], window)
+        if not ids:
+            return {"id": entity_id, "timestamps": [], "values": []}
+        valid: np.ndarray = ~np.isnan(matrix[0])
+        return {
+            "id": entity_id,
+            "timestamps": [
+                datetime.fromtimestamp(int(epoch) * self.interval, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                for epoch in epochs[valid]
+            ],
+            "values": matrix[0][valid].tolist(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """获取存储的实体数、计数器和内存占用"""
+        with self._lock:
+            return {
+                "entities": len(self._entity_ids),
+                "counters": sorted(self._buffers),
+                "slots": self.slots,
+                "interval": self.interval,
+                "memory_bytes": sum(
+                    buffer.values.nbytes + buffer.slot_epochs.nbytes for buffer in self._buffers.values()),
+            }
+
+
+def _parse_timestamp(timestamp: str) -> float:
+    """解析UTC时间字符串为Unix时间戳"""
+    return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+
+
+# 全局性能数据存储实例
+metric_store: Final[MetricStore] = MetricStore(retention=settings.METRICS_STORE_RETENTION)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时性能数据订阅
+所有订阅共享一个采集循环，每个实时采样周期对订阅的并集查询一次vCenter，
+再按订阅拆分结果推送给各订阅者
+"""
+
+import asyncio
+import uuid
+from typing import Any, Final, Optional
+
+from app.core.logger import logger
+from app.services.vmware_service import get_vmware_client
+from app.services.metric_store_service import metric_store
+from vmware.performance import REALTIME_INTERVAL_ID
+
+
+class MetricsSubscription:
+    """性能数据订阅"""
+
+    def __init__(
+        self,
+        vm_ids: list[str],
+        host_ids: list[str],
+        counters: list[str],
+        instance: str = "",
+        queue_size: int = 3,
+    ) -> None:
+        """初始化MetricsSubscription实例
+
+        Args:
+            vm_ids: 虚拟机ID列表
+            host_ids: 主机MOID列表
+            counters: 计数器名称列表
+            instance: 实例名称，空字符串表示汇总值，*表示所有实例
+            queue_size: 待推送消息的最大数量，消费过慢时丢弃最旧的消息
+        """
+        self.subscription_id: str = uuid.uuid4().hex
+        self.vm_ids: list[str] = vm_ids
+        self.host_ids: list[str] = host_ids
+        self.counters: list[str] = counters
+        self.instance: str = instance
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        """放入待推送消息，队列已满时丢弃最旧的消息"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait((event, data))
+
+    def slice(self, result: dict[str, Any]) -> dict[str, Any]:
+        """从并集查询结果中取出本订阅关心的实体和计数器"""
+        entity_ids: set[str] = set(self.vm_ids) | set(self.host_ids)
+        counters: set[str] = set(self.counters)
+        metrics: list[dict[str, Any]] = []
+        for metric in result["metrics"]:
+            if metric["id"] not in entity_ids:
+                continue
+            metrics.append(dict(metric, series=[
+                series for series in metric["series"] if series["counter"] in counters
+            ]))
+        return {
+            "metrics": metrics,
+            "not_found": [entity_id for entity_id in result["not_found"] if entity_id in entity_ids],
+        }
+
+
+class MetricsHub:
+    """实时性能数据订阅中心
+
+    有订阅时启动采集循环，最后一个订阅取消后停止
+    """
+
+    def __init__(self, interval: int = REALTIME_INTERVAL_ID) -> None:
+        """初始化MetricsHub实例
+
+        Args:
+            interval: 采集周期，单位秒，默认与vCenter实时统计的采样间隔一致
+        """
+        self.interval: int = interval
+        self._subscriptions: dict[str, MetricsSubscription] = {}
+        self._collector: Optional[asyncio.Task] = None
+
+    def subscribe(self, subscription: MetricsSubscription) -> MetricsSubscription:
+        """注册订阅，必须在事件循环中调用"""
+        self._subscriptions[subscription.subscription_id] = subscription
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect_loop())
+        logger.info(f"新增性能数据订阅: {subscription.subscription_id}, 当前订阅数: {len(self._subscriptions)}")
+        return subscription
+
+    def unsubscribe(self, subscription_id: str) -> None:
+        """取消订阅"""
+        self._subscriptions.pop(subscription_id, None)
+        if not self._subscriptions and self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+        logger.info(f"取消性能数据订阅: {subscription_id}, 当前订阅数: {len(self._subscriptions)}")
+
+    def stats(self) -> dict[str, Any]:
+        """获取订阅数量和订阅实体的并集大小"""
+        subscriptions: list[MetricsSubscription] = list(self._subscriptions.values())
+        return {
+            "subscriptions": len(subscriptions),
+            "vm_count": len({vm_id for item in subscriptions for vm_id in item.vm_ids}),
+            "host_count": len({host_id for item in subscriptions for host_id in item.host_ids}),
+        }
+
+    async def _collect_loop(self) -> None:
+        """按采集周期对所有订阅的并集查询一次性能数据"""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while self._subscriptions:
+            started: float = loop.time()
+            try:
+                await self._collect_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"采集订阅性能数据失败: {e}")
+            await asyncio.sleep(max(self.interval - (loop.time() - started), 0))
+
+    async def _collect_once(self) -> None:
+        """查询订阅并集并推送给各订阅者，不同实例名称的订阅分开查询"""
+        client = get_vmware_client()
+        groups: dict[str, list[MetricsSubscription]] = {}
+        for subscription in list(self._subscriptions.values()):
+            groups.setdefault(subscription.instance, []).append(subscription)
+
+        for instance, subscriptions in groups.items():
+            counter_dict: Optional[dict[str, int]] = None
+            if client:
+                counter_dict = await asyncio.to_thread(client.get_counter_dict)
+            if counter_dict is None:
+                result: Optional[dict[str, Any]] = None
+            else:
+                counters: list[str] = list(dict.fromkeys(
+                    name for item in subscriptions for name in item.counters if name in counter_dict))
+                result = await asyncio.to_thread(
+                    client.query_metrics,
+                    {name: counter_dict[name] for name in counters},
+                    vm_uuids=list(dict.fromkeys(vm_id for item in subscriptions for vm_id in item.vm_ids)),
+                    host_moids=list(dict.fromkeys(host_id for item in subscriptions for host_id in item.host_ids)),
+                    instance=instance,
+                    max_sample=1)
+
+            if result is not None:
+                metric_store.add_result(result)
+            for subscription in subscriptions:
+                if result is None:
+                    subscription.publish("error", {"message": "查询性能数据失败"})
+                else:
+                    subscription.publish("metrics", subscription.slice(result))
+
+
+# 全局实时性能数据订阅中心
+metrics_hub: Final[MetricsHub] = MetricsHub()
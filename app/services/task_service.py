@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步任务管理
+将耗时的vCenter操作放到后台线程池执行，HTTP请求立即返回任务ID
+"""
+
+import time
+import uuid
+import asyncio
+import threading
+from enum import Enum
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Final, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class TaskStatus(Enum):
+    """异步任务状态"""
+    PENDING = "pending"         # 排队中
+    RUNNING = "running"         # 执行中
+    SUCCESS = "success"         # 执行成功
+    ERROR = "error"             # 执行失败
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    """格式化时间戳为UTC时间字符串"""
+    if timestamp is None:
+        return ""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+class TaskManager:
+    """异步任务管理类
+
+    任务函数在线程池中执行，必须接受on_progress关键字参数，
+    用于上报执行进度(0-100)
+    """
+
+    def __init__(self, max_workers: int, retention: int) -> None:
+        """初始化TaskManager实例
+
+        Args:
+            max_workers: 线程池最大线程数
+            retention: 已结束任务的保留时间，单位秒
+        """
+        self.retention: int = retention
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vmware-task")
+        self._lock: threading.Lock = threading.Lock()
+        self._records: dict[str, dict[str, Any]] = {}
+        self._futures: dict[str, Future] = {}
+
+    def submit(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+        """提交异步任务
+
+        Args:
+            name: 任务名称，例如vm.poweron
+            func: 任务函数
+            *args: 任务函数位置参数
+            **kwargs: 任务函数关键字参数
+
+        Returns:
+            str: 任务ID
+        """
+        self._purge()
+        task_id: str = uuid.uuid4().hex
+        record: dict[str, Any] = {
+            "task_id": task_id,
+            "name": name,
+            "status": TaskStatus.PENDING.value,
+            "progress": 0,
+            "result": None,
+            "error": "",
+            "create_time": time.time(),
+            "start_time": None,
+            "end_time": None
+        }
+        with self._lock:
+            self._records[task_id] = record
+            self._futures[task_id] = self._executor.submit(self._run, task_id, func, args, kwargs)
+        logger.info(f"提交异步任务: {task_id}, 名称: {name}")
+        return task_id
+
+    def _run(self, task_id: str, func: Callable[..., Any], args: tuple, kwargs: dict[str, Any]) -> Any:
+        """在线程池中执行任务并记录结果"""
+        record: dict[str, Any] = self._records[task_id]
+        record["status"] = TaskStatus.RUNNING.value
+        record["start_time"] = time.time()
+        try:
+            result: Any = func(*args, on_progress=lambda progress: self._set_progress(task_id, progress), **kwargs)
+        except Exception as e:
+            logger.error(f"异步任务执行失败: {task_id}, 名称: {record['name']}, 原因: {e}")
+            record["error"] = getattr(e, "msg", None) or str(e)
+            record["status"] = TaskStatus.ERROR.value
+            result = None
+        else:
+            record["result"] = result
+            record["progress"] = 100
+            record["status"] = TaskStatus.SUCCESS.value
+        record["end_time"] = time.time()
+        return result
+
+    def _set_progress(self, task_id: str, progress: int) -> None:
+        """更新任务进度"""
+        record: Optional[dict[str, Any]] = self._records.get(task_id)
+        if record:
+            record["progress"] = progress
+
+    def _purge(self) -> None:
+        """清理超过保留时间的已结束任务"""
+        deadline: float = time.time() - self.retention
+        with self._lock:
+            expired: list[str] = [
+                task_id for task_id, record in self._records.items()
+                if record["end_time"] is not None and record["end_time"] < deadline
+            ]
+            for task_id in expired:
+                self._records.pop(task_id, None)
+                self._futures.pop(task_id, None)
+
+    def get(self, task_id: str) -> Optional[dict[str, Any]]:
+        """获取任务详情
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[dict[str, Any]]: 任务详情，不存在时返回None
+        """
+        record: Optional[dict[str, Any]] = self._records.get(task_id)
+        if record is None:
+            return None
+        return self._layout_record(record)
+
+    def list_tasks(self, status: Optional[str] = None) -> list[dict[str, Any]]:
+        """获取任务列表
+
+        Args:
+            status: 按任务状态过滤
+
+        Returns:
+            list[dict[str, Any]]: 任务列表
+        """
+        with self._lock:
+            records: list[dict[str, Any]] = list(self._records.values())
+        return [
+            self._layout_record(record) for record in records
+            if not status or record["status"] == status
+        ]
+
+    async def wait(self, task_id: str, timeout: float) -> Optional[dict[str, Any]]:
+        """长轮询等待任务结束
+
+        在timeout秒内任务结束则立即返回，否则返回当前状态
+
+        Args:
+            task_id: 任务ID
+            timeout: 最长等待时间，单位秒
+
+        Returns:
+            Optional[dict[str, Any]]: 任务详情，不存在时返回None
+        """
+        future: Optional[Future] = self._futures.get(task_id)
+        if future is not None and timeout > 0 and not future.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(task_id)
+
+    @staticmethod
+    def _layout_record(record: dict[str, Any]) -> dict[str, Any]:
+        """构建任务信息"""
+        layout_data: dict[str, Any] = dict(record)
+        layout_data["create_time"] = _format_time(record["create_time"])
+        layout_data["start_time"] = _format_time(record["start_time"])
+        layout_data["end_time"] = _format_time(record["end_time"])
+        return layout_data
+
+
+# 全局异步任务管理实例
+task_manager: Final[TaskManager] = TaskManager(
+    max_workers=settings.TASK_MAX_WORKERS,
+    retention=settings.TASK_RETENTION
+)
@@ -17,6 +17,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routes import api_router
 from app.core.config import settings
 from app.core.logger import logger
+from app.services.collector_service import metrics_collector
+from app.services.event_service import event_stream
 
 
 def generate_swagger_spec(app_instance: FastAPI) -> None:
@@ -69,9 +71,21 @@ async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
     # 生成Swagger文件
     generate_swagger_spec(app_instance)
     
+    # 启动后台性能数据采集
+    if settings.METRICS_COLLECTOR_ENABLED and settings.is_vmware_configured():
+        metrics_collector.start()
+    
+    # 启动vCenter事件读取，服务启动后的事件不依赖消费者请求即可收集
+    if settings.is_vmware_configured():
+        event_stream.start()
+    
     yield
     
     # 关闭事件
+    if metrics_collector.running:
+        metrics_collector.stop()
+    if event_stream.running:
+        await event_stream.stop()
     logger.info("关闭VMware Manager API服务")
 
 
@@ -4,8 +4,11 @@
 VMware vSphere类
 """
 
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Iterator, Optional
 from .interface import VMwareVSphereInterface, PlatformVmOperationType
+from .performance import Performance, REALTIME_INTERVAL_ID
+from .export import InventoryExporter
 from app.core.logger import logger
 
 
@@ -288,6 +291,23 @@ class VMwareVSphere:
             logger.error(f"获取虚拟机详情失败: {e}")
             return None
 
+    def get_vm_obj(self, vm_uuid: str) -> Optional[Any]:
+        """获取虚拟机对象引用
+        
+        仅通过FindByUuid解析虚拟机，不组装详情，适用于操作前的存在性检查
+        
+        Args:
+            vm_uuid: 虚拟机UUID
+        
+        Returns:
+            Optional[Any]: 虚拟机对象，不存在时返回None
+        """
+        try:
+            return self.vi.get_vm_by_uuid(vm_uuid)
+        except Exception as e:
+            logger.error(f"获取虚拟机对象失败: {e}")
+            return None
+
     def get_vm_ticket(self, vm_uuid: str) -> Optional[dict[str, Any]]:
         """获取虚拟机票据
         
@@ -358,6 +378,485 @@ class VMwareVSphere:
             logger.error(f"操作虚拟机失败: {e}")
             return None
 
+    def get_admission_stats(self) -> dict[str, Any]:
+        """获取变更操作准入控制状态
+        
+        Returns:
+            dict[str, Any]: 并发上限、各资源的运行数量和各优先级的排队数量
+        """
+        try:
+            return self.vi.scheduler.stats()
+        except Exception as e:
+            logger.error(f"获取准入控制状态失败: {e}")
+            return {}
+
+    def get_counter_dict(self) -> Optional[dict[str, int]]:
+        """获取性能计数器名称到计数器ID的映射
+        
+        Returns:
+            Optional[dict[str, int]]: 计数器映射，名称格式为group.name.rollup，例如cpu.usage.average，
+                                      获取失败时返回None
+        """
+        try:
+            return self.vi.get_counter_dict()
+        except Exception as e:
+            logger.error(f"获取性能计数器失败: {e}")
+            return None
+
+    def list_counters(self, entity_type: Optional[str] = None, group: Optional[str] = None) -> list[dict[str, Any]]:
+        """获取性能计数器目录
+        
+        Args:
+            entity_type: 实体类型，可选vm/host，指定时只返回该类型可用的计数器
+            group: 计数器分组，例如cpu、mem
+        
+        Returns:
+            list[dict[str, Any]]: 计数器列表
+        """
+        try:
+            counters: list[dict[str, Any]] = self.vi.performance.get_counter_catalog()
+            if entity_type:
+                available: set[int] = set(self.vi.performance.get_available_counter_ids(entity_type))
+                counters = [counter for counter in counters if counter["key"] in available]
+            if group:
+                counters = [counter for counter in counters if counter["group"] == group]
+            return counters
+        except Exception as e:
+            logger.error(f"获取性能计数器目录失败: {e}")
+            return []
+
+    def query_metrics(
+        self,
+        counter_ids: dict[str, int],
+        vm_uuids: Optional[list[str]] = None,
+        host_moids: Optional[list[str]] = None,
+        instance: str = "",
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval_id: int = REALTIME_INTERVAL_ID,
+        max_sample: Optional[int] = None,
+    ) -> Optional[dict[str, Any]]:
+        """批量查询虚拟机和主机的性能数据
+        
+        Args:
+            counter_ids: 计数器名称到计数器ID的映射
+            vm_uuids: 虚拟机UUID列表
+            host_moids: 主机MOID列表
+            instance: 实例名称，空字符串表示汇总值，*表示所有实例
+            start_time: 开始时间
+            end_time: 结束时间
+            interval_id: 采样间隔，单位秒
+            max_sample: 最多返回的采样点数量
+        
+        Returns:
+            Optional[dict[str, Any]]: 各实体的性能数据和不存在的实体ID
+        """
+        try:
+            entities, not_found = self.vi.get_perf_entities(vm_uuids, host_moids)
+            results: list[Any] = self.vi.performance.query_entities(
+                [entity for _, entity in entities.values()], list(counter_ids.values()),
+                instance, start_time, end_time, interval_id, max_sample)
+            
+            counter_names: dict[int, str] = {counter_id: name for name, counter_id in counter_ids.items()}
+            metrics: list[dict[str, Any]] = []
+            for entity_metric in results:
+                metric: dict[str, Any] = self.vi.performance.layout_entity_metric(entity_metric, counter_names)
+                metric["id"] = entities[metric["entity"]][0]
+                metrics.append(metric)
+            return {
+                "metrics": metrics,
+                "not_found": not_found,
+            }
+        except Exception as e:
+            logger.error(f"查询性能数据失败: {e}")
+            return None
+
+    def query_metrics_history(
+        self,
+        counter_ids: dict[str, int],
+        start_time: datetime,
+        end_time: Optional[datetime] = None,
+        vm_uuids: Optional[list[str]] = None,
+        host_moids: Optional[list[str]] = None,
+        resolution: Optional[int] = None,
+        include_host_vms: bool = False,
+    ) -> Optional[dict[str, Any]]:
+        """查询历史性能数据
+        
+        根据查询范围和目标分辨率自动选择采样间隔，返回按分辨率降采样后的数据
+        
+        Args:
+            counter_ids: 计数器名称到计数器ID的映射
+            start_time: 开始时间
+            end_time: 结束时间，为空时查询到当前时间
+            vm_uuids: 虚拟机UUID列表
+            host_moids: 主机MOID列表
+            resolution: 目标分辨率，单位秒，为空时不降采样
+            include_host_vms: 为True时用QueryPerfComposite同时返回主机上所有虚拟机的数据
+        
+        Returns:
+            Optional[dict[str, Any]]: 选择的采样间隔、各实体的性能数据和不存在的实体ID
+        """
+        try:
+            performance: Performance = self.vi.performance
+            interval_id: int = performance.select_interval(start_time, resolution)
+            counter_names: dict[int, str] = {counter_id: name for name, counter_id in counter_ids.items()}
+            
+            entity_metrics, not_found = self.vi.query_perf_history(
+                list(counter_ids.values()), start_time, end_time, interval_id,
+                vm_uuids, host_moids, include_host_vms)
+            
+            metrics: list[dict[str, Any]] = []
+            for entity_id, entity_metric in entity_metrics:
+                metric: dict[str, Any] = performance.layout_entity_metric(entity_metric, counter_names, resolution)
+                metric["id"] = entity_id
+                metrics.append(metric)
+            return {
+                "interval_id": interval_id,
+                "metrics": metrics,
+                "not_found": not_found,
+            }
+        except Exception as e:
+            logger.error(f"查询历史性能数据失败: {e}")
+            return None
+
+    def get_capacity(self, group_by: str = "cluster") -> list[dict[str, Any]]:
+        """按主机、集群或数据中心汇总容量
+        
+        Args:
+            group_by: 分组方式，可选host/cluster/datacenter
+        
+        Returns:
+            list[dict[str, Any]]: 每个分组的资源分配总量、开机部分和超配比
+        """
+        try:
+            return self.vi.capacity.rollup(group_by)
+        except Exception as e:
+            logger.error(f"获取容量统计失败: {e}")
+            return []
+
+    def get_triggered_alarms(
+        self,
+        severities: Optional[list[str]] = None,
+        entity_types: Optional[list[str]] = None
+    ) -> Optional[dict[str, Any]]:
+        """获取所有实体已触发的告警
+        
+        Args:
+            severities: 告警状态过滤，可选red/yellow/gray/green
+            entity_types: 实体类型过滤，如VirtualMachine、HostSystem
+        
+        Returns:
+            Optional[dict[str, Any]]: 告警列表和统计，失败返回None
+        """
+        try:
+            return self.vi.alarms.get_triggered(severities, entity_types)
+        except Exception as e:
+            logger.error(f"获取告警失败: {e}")
+            return None
+
+    def reset_alarms(self, targets: list[dict[str, str]]) -> Optional[list[dict[str, Any]]]:
+        """批量将告警重置为绿色
+        
+        Args:
+            targets: 待重置的告警，每项包括alarm_moid、entity_moid、entity_type
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 每个告警的重置结果，失败返回None
+        """
+        try:
+            return self.vi.alarms.reset(targets)
+        except Exception as e:
+            logger.error(f"重置告警失败: {e}")
+            return None
+
+    def list_datastores(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有存储
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 存储列表，包括容量、主机挂载和虚拟机MOID，失败返回None
+        """
+        try:
+            return self.vi.datastores.list_datastores()
+        except Exception as e:
+            logger.error(f"获取存储列表失败: {e}")
+            return None
+
+    def get_datastore(self, datastore_moid: str) -> Optional[dict[str, Any]]:
+        """获取存储详情，主机挂载中补充主机名称
+        
+        Args:
+            datastore_moid: 存储MOID
+        
+        Returns:
+            Optional[dict[str, Any]]: 存储详情，不存在或失败返回None
+        """
+        try:
+            ds_info: Optional[dict[str, Any]] = self.vi.datastores.get(datastore_moid)
+            if ds_info is None:
+                return None
+            hosts: list[dict[str, Any]] = []
+            for host_mount in ds_info["hosts"]:
+                host: Optional[dict[str, Any]] = self.vi.inventory.get_host(host_mount["moid"])
+                hosts.append(dict(host_mount, name=host["name"] if host else ""))
+            return dict(ds_info, hosts=hosts)
+        except Exception as e:
+            logger.error(f"获取存储{datastore_moid}失败: {e}")
+            return None
+
+    def list_networks(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有网络和分布式端口组
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 网络列表，包括VLAN和连接的主机、虚拟机数量，失败返回None
+        """
+        try:
+            return self.vi.network_topology.list_networks()
+        except Exception as e:
+            logger.error(f"获取网络列表失败: {e}")
+            return None
+
+    def get_network(self, network_moid: str) -> Optional[dict[str, Any]]:
+        """获取网络详情
+        
+        Args:
+            network_moid: 网络或分布式端口组MOID
+        
+        Returns:
+            Optional[dict[str, Any]]: 网络详情，包括连接的主机和虚拟机，不存在或失败返回None
+        """
+        try:
+            return self.vi.network_topology.get_network(network_moid)
+        except Exception as e:
+            logger.error(f"获取网络{network_moid}失败: {e}")
+            return None
+
+    def list_switches(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有分布式交换机
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 分布式交换机列表，失败返回None
+        """
+        try:
+            return self.vi.network_topology.list_switches()
+        except Exception as e:
+            logger.error(f"获取分布式交换机列表失败: {e}")
+            return None
+
+    def get_vlan(self, vlan_id: int) -> Optional[dict[str, Any]]:
+        """获取连接到VLAN的网络、主机和虚拟机
+        
+        Args:
+            vlan_id: VLAN ID
+        
+        Returns:
+            Optional[dict[str, Any]]: 网络、主机和虚拟机列表，失败返回None
+        """
+        try:
+            return self.vi.network_topology.get_vlan(vlan_id)
+        except Exception as e:
+            logger.error(f"获取VLAN {vlan_id}失败: {e}")
+            return None
+
+    def get_snapshot_report(
+        self,
+        older_than_days: Optional[float] = None,
+        larger_than_gb: Optional[float] = None,
+        sort: str = "age",
+        limit: int = 100,
+    ) -> Optional[dict[str, Any]]:
+        """获取所有虚拟机的快照报告
+        
+        Args:
+            older_than_days: 只返回创建时间早于该天数的快照
+            larger_than_gb: 只返回大于该大小(GB)的快照
+            sort: 排序方式，age为最旧的在前，size为最大的在前
+            limit: 返回的最大快照数
+        
+        Returns:
+            Optional[dict[str, Any]]: 快照报告，失败返回None
+        """
+        try:
+            return self.vi.snapshots.report(older_than_days, larger_than_gb, sort, limit)
+        except Exception as e:
+            logger.error(f"获取快照报告失败: {e}")
+            return None
+
+    def list_templates(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有虚拟机模板
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 模板列表，失败返回None
+        """
+        try:
+            return self.vi.deployments.templates.list_templates()
+        except Exception as e:
+            logger.error(f"获取模板列表失败: {e}")
+            return None
+
+    def list_deployments(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有模板部署任务
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 部署任务列表，失败返回None
+        """
+        try:
+            return self.vi.deployments.list_jobs()
+        except Exception as e:
+            logger.error(f"获取部署任务列表失败: {e}")
+            return None
+
+    def get_deployment(self, job_id: str) -> Optional[dict[str, Any]]:
+        """获取模板部署任务详情
+        
+        Args:
+            job_id: 部署任务ID
+        
+        Returns:
+            Optional[dict[str, Any]]: 部署任务详情，任务不存在或失败返回None
+        """
+        try:
+            return self.vi.deployments.get_job(job_id)
+        except Exception as e:
+            logger.error(f"获取部署任务{job_id}失败: {e}")
+            return None
+
+    def get_dependent_vms(self, entity_type: str, entity_moid: str) -> Optional[dict[str, Any]]:
+        """获取存储、主机或网络上的虚拟机，用于维护前的影响分析
+        
+        Args:
+            entity_type: 实体类型，可选datastore/host/network
+            entity_moid: 实体MOID
+        
+        Returns:
+            Optional[dict[str, Any]]: 实体信息和受影响的虚拟机列表，实体不存在或失败返回None
+        """
+        try:
+            return self.vi.inventory.get_dependent_vms(entity_type, entity_moid)
+        except Exception as e:
+            logger.error(f"获取{entity_type} {entity_moid}上的虚拟机失败: {e}")
+            return None
+
+    def list_fcds(self, datastore_moid: str) -> Optional[list[dict[str, Any]]]:
+        """获取存储上的所有First Class Disk
+        
+        Args:
+            datastore_moid: 存储MOID
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: FCD列表，失败返回None
+        """
+        try:
+            return self.vi.fcds.list_fcds(datastore_moid)
+        except Exception as e:
+            logger.error(f"获取存储{datastore_moid}的FCD列表失败: {e}")
+            return None
+
+    def get_fcd(self, datastore_moid: str, fcd_name: str) -> Optional[dict[str, Any]]:
+        """按名称获取First Class Disk
+        
+        Args:
+            datastore_moid: 存储MOID
+            fcd_name: FCD名称
+        
+        Returns:
+            Optional[dict[str, Any]]: FCD详情，不存在或失败返回None
+        """
+        try:
+            fcd: Optional[Any] = self.vi.fcds.get_by_name(datastore_moid, fcd_name)
+            return self.vi.fcds.layout_fcd(fcd) if fcd is not None else None
+        except Exception as e:
+            logger.error(f"获取FCD {fcd_name}失败: {e}")
+            return None
+
+    def list_storage_policies(self) -> Optional[list[dict[str, Any]]]:
+        """获取所有存储策略
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 存储策略列表，按名称排序，失败返回None
+        """
+        try:
+            profiles: list[Any] = self.vi.call_pbm(self.vi.storage_policies.list_policies)
+            return sorted(
+                (self.vi.layout_storage_policy(profile) for profile in profiles),
+                key=lambda policy_info: policy_info["name"])
+        except Exception as e:
+            logger.error(f"获取存储策略列表失败: {e}")
+            return None
+
+    def get_storage_policy(self, policy_name: str) -> Optional[dict[str, Any]]:
+        """按名称获取存储策略
+        
+        Args:
+            policy_name: 存储策略名称
+        
+        Returns:
+            Optional[dict[str, Any]]: 存储策略详情，不存在或失败返回None
+        """
+        try:
+            profile: Optional[Any] = self.vi.get_storage_policy(policy_name)
+            return self.vi.layout_storage_policy(profile) if profile is not None else None
+        except Exception as e:
+            logger.error(f"获取存储策略{policy_name}失败: {e}")
+            return None
+
+    def read_new_events(self) -> Optional[list[dict[str, Any]]]:
+        """从事件收集器读取上次之后的新事件
+        
+        Returns:
+            Optional[list[dict[str, Any]]]: 新事件，失败返回None
+        """
+        try:
+            return self.vi.events.read_new()
+        except Exception as e:
+            logger.error(f"读取vCenter事件失败: {e}")
+            return None
+
+    def get_events(self, after: int = 0, limit: int = 100) -> dict[str, Any]:
+        """获取已读取的事件中指定事件键之后的事件
+        
+        Args:
+            after: 事件键，只返回键大于该值的事件
+            limit: 返回的最大事件数
+        
+        Returns:
+            dict[str, Any]: 事件列表、下次请求使用的事件键和是否有事件被挤出内存
+        """
+        return self.vi.events.get_events(after, limit)
+
+    def close_event_feed(self) -> None:
+        """销毁事件收集器"""
+        try:
+            self.vi.events.close()
+        except Exception as e:
+            logger.error(f"销毁事件收集器失败: {e}")
+
+    def export_inventory(self, table: str, fmt: str = "parquet", page_size: int = 1000) -> Optional[Iterator[bytes]]:
+        """分页导出清单为Parquet或Arrow IPC流
+        
+        Args:
+            table: 清单名称，可选vms/hosts/datastores/networks
+            fmt: 导出格式，可选parquet/arrow
+            page_size: 每页收集的对象数量
+        
+        Returns:
+            Optional[Iterator[bytes]]: 逐批次输出的已编码数据，失败返回None
+        """
+        try:
+            exporter: InventoryExporter = InventoryExporter(self.vi, page_size=page_size)
+        except Exception as e:
+            logger.error(f"导出清单失败: {e}")
+            return None
+
+        def iter_chunks() -> Iterator[bytes]:
+            try:
+                yield from exporter.iter_export(table, fmt)
+            except Exception as e:
+                logger.error(f"导出清单{table}失败: {e}")
+                raise
+
+        return iter_chunks()
+
     def list_folders(self, datacenter_moid: Optional[str] = None) -> list[dict[str, Any]]:
         """获取文件夹列表
         
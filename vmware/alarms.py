@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere告警查询
+一次属性收集拉取所有实体的triggeredAlarmState和overallStatus，
+告警定义按MOID缓存，只为新出现的告警定义做一次批量收集
+"""
+
+import threading
+import time
+from datetime import timezone
+from typing import Any, Iterable, Optional
+
+from pyVmomi import vim
+
+from .tools import alarm, pchelper
+
+
+# 告警状态，按严重程度从高到低
+ALARM_SEVERITIES: tuple[str, ...] = ("red", "yellow", "gray", "green")
+
+
+class Alarms(object):
+    """ VMware vSphere告警查询类 """
+
+    # 实体需要的属性
+    ENTITY_PROPERTIES: list[str] = [
+        "name",
+        "overallStatus",
+        "triggeredAlarmState",
+    ]
+
+    # 告警定义需要的属性
+    ALARM_PROPERTIES: list[str] = [
+        "info.name",
+        "info.description",
+        "info.enabled",
+        "info.systemName",
+    ]
+
+    def __init__(self, vi: Any, definition_ttl: int = 3600, reset_concurrency: int = 8) -> None:
+        """初始化Alarms实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            definition_ttl: 告警定义缓存的有效期，单位秒
+            reset_concurrency: 批量重置告警的最大并发数
+        """
+        self.vi: Any = vi
+        self.definition_ttl: int = definition_ttl
+        self.reset_concurrency: int = max(int(reset_concurrency), 1)
+        self._lock: threading.Lock = threading.Lock()
+        self._definitions: dict[str, dict[str, Any]] = {}
+        self._definitions_time: float = 0
+
+    @staticmethod
+    def entity_type(entity_obj: Any) -> str:
+        """实体类型名称，如VirtualMachine、HostSystem"""
+        return type(entity_obj).__name__.split(".")[-1]
+
+    def _collect_entities(self) -> list[dict[str, Any]]:
+        """对所有清单实体做一次属性收集"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [vim.ManagedEntity])
+        try:
+            return pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=vim.ManagedEntity,
+                path_set=self.ENTITY_PROPERTIES,
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+
+    def get_definitions(self, alarm_objs: Iterable[Any]) -> dict[str, dict[str, Any]]:
+        """获取告警定义，缓存未命中的告警定义合并为一次属性收集
+
+        Args:
+            alarm_objs: 告警对象
+
+        Returns:
+            dict[str, dict[str, Any]]: 告警MOID到告警定义的映射
+        """
+        with self._lock:
+            if time.monotonic() - self._definitions_time > self.definition_ttl:
+                self._definitions = {}
+                self._definitions_time = time.monotonic()
+            missing: dict[str, Any] = {
+                alarm_obj._moId: alarm_obj for alarm_obj in alarm_objs if alarm_obj._moId not in self._definitions
+            }
+            if missing:
+                for alarm_data in pchelper.collect_object_properties(
+                        self.vi.si, list(missing.values()), vim.alarm.Alarm, self.ALARM_PROPERTIES):
+                    self._definitions[alarm_data["obj"]._moId] = {
+                        "moid": alarm_data["obj"]._moId,
+                        "name": alarm_data.get("info.name", ""),
+                        "description": alarm_data.get("info.description", ""),
+                        "enabled": alarm_data.get("info.enabled"),
+                        "system_name": alarm_data.get("info.systemName") or "",
+                    }
+            return self._definitions
+
+    def get_triggered(
+        self,
+        severities: Optional[list[str]] = None,
+        entity_types: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """获取所有已触发的告警
+
+        triggeredAlarmState包含实体自身及其下级实体触发的告警，
+        同一告警会出现在多个上级实体上，按告警状态的key去重
+
+        Args:
+            severities: 告警状态过滤，可选red/yellow/gray/green，为空时不过滤
+            entity_types: 实体类型过滤，如VirtualMachine、HostSystem，为空时不过滤
+
+        Returns:
+            dict[str, Any]: 按严重程度排序的告警列表、各告警状态的告警数量，
+                            以及各实体类型按overallStatus统计的实体数量
+        """
+        entities: dict[str, dict[str, Any]] = {}
+        entity_status: dict[str, dict[str, int]] = {}
+        alarm_states: dict[str, Any] = {}
+        for entity_data in self._collect_entities():
+            entity_obj: Any = entity_data["obj"]
+            entity_type: str = self.entity_type(entity_obj)
+            overall_status: str = str(entity_data.get("overallStatus") or "gray")
+            entities[entity_obj._moId] = {
+                "moid": entity_obj._moId,
+                "type": entity_type,
+                "name": entity_data.get("name", ""),
+                "overall_status": overall_status,
+            }
+            type_status: dict[str, int] = entity_status.setdefault(entity_type, {})
+            type_status[overall_status] = type_status.get(overall_status, 0) + 1
+            for alarm_state in entity_data.get("triggeredAlarmState") or []:
+                alarm_states.setdefault(alarm_state.key, alarm_state)
+
+        wanted_severities: Optional[set[str]] = set(severities) if severities else None
+        wanted_types: Optional[set[str]] = set(entity_types) if entity_types else None
+        selected: list[Any] = [
+            alarm_state for alarm_state in alarm_states.values()
+            if (wanted_severities is None or str(alarm_state.overallStatus) in wanted_severities)
+            and (wanted_types is None or self.entity_type(alarm_state.entity) in wanted_types)
+        ]
+        definitions: dict[str, dict[str, Any]] = self.get_definitions(
+            alarm_state.alarm for alarm_state in selected)
+
+        alarms: list[dict[str, Any]] = []
+        counts: dict[str, int] = {}
+        for alarm_state in selected:
+            status: str = str(alarm_state.overallStatus)
+            counts[status] = counts.get(status, 0) + 1
+            entity_moid: str = alarm_state.entity._moId
+            alarms.append({
+                "key": alarm_state.key,
+                "status": status,
+                "time": alarm_state.time.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if alarm_state.time else "",
+                "acknowledged": bool(alarm_state.acknowledged),
+                "acknowledged_by": alarm_state.acknowledgedByUser or "",
+                "alarm": definitions.get(alarm_state.alarm._moId, {"moid": alarm_state.alarm._moId}),
+                "entity": entities.get(entity_moid, {
+                    "moid": entity_moid, "type": self.entity_type(alarm_state.entity)}),
+            })
+        severity_rank: dict[str, int] = {status: rank for rank, status in enumerate(ALARM_SEVERITIES)}
+        # 按严重程度排序，同一严重程度中最近触发的在前
+        alarms.sort(key=lambda alarm: alarm["time"], reverse=True)
+        alarms.sort(key=lambda alarm: severity_rank.get(alarm["status"], len(ALARM_SEVERITIES)))
+        return {
+            "total": len(alarms),
+            "counts": counts,
+            "entity_status": entity_status,
+            "alarms": alarms,
+        }
+
+    def reset(self, targets: list[dict[str, str]]) -> list[dict[str, Any]]:
+        """批量将告警重置为绿色
+
+        所有请求共用一个保持连接的HTTP会话，并发数不超过reset_concurrency
+
+        Args:
+            targets: 待重置的告警，每项包括alarm_moid、entity_moid、entity_type
+
+        Returns:
+            list[dict[str, Any]]: 每个告警的重置结果
+        """
+        results: list[dict[str, Any]] = alarm.reset_alarms(self.vi.si, [
+            {
+                "alarm_moref": target["alarm_moid"],
+                "entity_moref": target["entity_moid"],
+                "entity_type": target["entity_type"],
+            }
+            for target in targets
+        ], max_workers=self.reset_concurrency)
+        return [
+            {
+                "alarm_moid": result["alarm"],
+                "entity_moid": result["entity"],
+                "success": result["success"],
+                "error": result["error"],
+            }
+            for result in results
+        ]
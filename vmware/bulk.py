@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+批量vCenter任务提交
+每个操作同时申请专用的并发名额和变更操作准入名额，获得名额后立即提交任务，
+也可以凑批提交一个覆盖多个操作的任务，如PowerOnMultiVM_Task，
+任务由共享的任务监视器等待，不为每个任务占用线程，吞吐量只受vCenter限制
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from .scheduler import AdmissionKey, AdmissionScheduler, OperationPriority
+
+
+# 一个操作占用的专用名额和准入名额
+Acquired = tuple[tuple[AdmissionKey, ...], tuple[AdmissionKey, ...]]
+
+# 操作结束回调，参数为操作ID、任务结果和错误
+Complete = Callable[[str, Any, Optional[Any]], None]
+
+
+class BulkTaskRunner(object):
+    """ 批量vCenter任务提交类 """
+
+    def __init__(self, vi: Any, scheduler: Optional[AdmissionScheduler] = None) -> None:
+        """初始化BulkTaskRunner实例
+
+        Args:
+            vi: VMwareVSphereInterface实例，使用其准入控制和任务监视器
+            scheduler: 该类操作专用的并发名额，在变更操作的准入控制之外单独限制，为空时只经过变更操作的准入控制
+        """
+        self.vi: Any = vi
+        self.scheduler: Optional[AdmissionScheduler] = scheduler
+
+    def _try_acquire(self, keys: list[AdmissionKey], vm_keys: list[AdmissionKey]) -> Optional[Acquired]:
+        """同时申请专用名额和变更操作准入名额，任一不足时都不占用"""
+        acquired: Optional[tuple[AdmissionKey, ...]] = ()
+        if self.scheduler is not None:
+            acquired = self.scheduler.try_acquire(keys, OperationPriority.BULK)
+            if acquired is None:
+                return None
+        vm_acquired: Optional[tuple[AdmissionKey, ...]] = self.vi.scheduler.try_acquire(
+            vm_keys, OperationPriority.BULK)
+        if vm_acquired is None:
+            self._release((acquired, ()))
+            return None
+        return acquired, vm_acquired
+
+    def _release(self, acquired: Acquired) -> None:
+        if self.scheduler is not None:
+            self.scheduler.release(acquired[0])
+        self.vi.scheduler.release(acquired[1])
+
+    def run(
+        self,
+        items: dict[str, tuple[list[AdmissionKey], list[AdmissionKey]]],
+        submit: Callable[[str], Any],
+        finish: Callable[[str, Any, Optional[Any]], None],
+    ) -> None:
+        """在名额内逐个提交任务，并等待所有任务结束
+
+        每个操作获得名额后立即提交任务，任务结束后释放名额，再放行排队中的操作
+
+        Args:
+            items: 操作ID到(专用准入键, 变更操作准入键)的映射
+            submit: 提交任务的函数，参数为操作ID，返回vCenter任务
+            finish: 每个操作结束时调用，参数为操作ID、任务结果和错误，在调用run的线程中执行
+        """
+
+        def submit_batch(item_ids: list[str], complete: Complete) -> None:
+            item_id: str = item_ids[0]
+            task: Any = submit(item_id)
+
+            def on_task_done(future: Future) -> None:
+                error: Optional[BaseException] = future.exception()
+                complete(item_id, None if error else future.result(), error)
+
+            self.vi.task_monitor.watch(task, callback=on_task_done)
+
+        self.run_batches(items, submit_batch, finish, batch_size=1)
+
+    def run_batches(
+        self,
+        items: dict[str, tuple[list[AdmissionKey], list[AdmissionKey]]],
+        submit_batch: Callable[[list[str], Complete], None],
+        finish: Callable[[str, Any, Optional[Any]], None],
+        batch_size: int,
+    ) -> None:
+        """在名额内按批提交任务，并等待所有操作结束
+
+        获得名额的操作凑满batch_size即提交一批，一轮申请结束时提交不满的批次，
+        每个操作结束后单独释放名额，再放行排队中的操作
+
+        Args:
+            items: 操作ID到(专用准入键, 变更操作准入键)的映射
+            submit_batch: 提交一批任务的函数，参数为操作ID列表和结束回调，
+                          每个操作结束时调用一次结束回调(操作ID, 任务结果, 错误)，可在任意线程调用，
+                          抛出异常时尚未结束的操作都以该异常结束
+            finish: 每个操作结束时调用，参数为操作ID、任务结果和错误，在调用run_batches的线程中执行
+            batch_size: 每批的最大操作数
+        """
+        completed: queue.Queue = queue.Queue()
+        pending: list[str] = list(items)
+        inflight: int = 0
+        self.vi.scheduler.add_waiting(OperationPriority.BULK, len(pending))
+        try:
+            while pending or inflight:
+                waiting: list[str] = []
+                batch: list[tuple[str, Acquired]] = []
+                for item_id in pending:
+                    acquired: Optional[Acquired] = self._try_acquire(*items[item_id])
+                    if acquired is None:
+                        waiting.append(item_id)
+                        continue
+                    batch.append((item_id, acquired))
+                    if len(batch) >= batch_size:
+                        inflight += self._submit(batch, submit_batch, completed)
+                        batch = []
+                if batch:
+                    inflight += self._submit(batch, submit_batch, completed)
+                pending = waiting
+
+                # 还有排队的操作时定期重试，名额也可能被其他操作释放
+                try:
+                    item_id, result, error = completed.get(timeout=1 if pending else None)
+                except queue.Empty:
+                    continue
+                while True:
+                    inflight -= 1
+                    finish(item_id, result, error)
+                    try:
+                        item_id, result, error = completed.get_nowait()
+                    except queue.Empty:
+                        break
+        finally:
+            self.vi.scheduler.add_waiting(OperationPriority.BULK, -len(pending))
+
+    def _submit(
+        self,
+        batch: list[tuple[str, Acquired]],
+        submit_batch: Callable[[list[str], Complete], None],
+        completed: queue.Queue,
+    ) -> int:
+        """提交一批任务，每个操作结束时释放名额并放入completed队列
+
+        Returns:
+            int: 提交的操作数
+        """
+        self.vi.scheduler.add_waiting(OperationPriority.BULK, -len(batch))
+        unfinished: dict[str, Acquired] = dict(batch)
+        lock: threading.Lock = threading.Lock()
+
+        def complete(item_id: str, result: Any = None, error: Optional[Any] = None) -> None:
+            with lock:
+                acquired: Optional[Acquired] = unfinished.pop(item_id, None)
+            # 每个操作只结束一次
+            if acquired is None:
+                return
+            self._release(acquired)
+            completed.put((item_id, result, error))
+
+        try:
+            submit_batch([item_id for item_id, _ in batch], complete)
+        except Exception as e:
+            for item_id in list(unfinished):
+                complete(item_id, error=e)
+        return len(batch)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+按TTL整体刷新的清单缓存
+子类实现refresh()重新收集数据，基类负责加锁、过期判断和缓存未命中时的限频刷新
+"""
+
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def is_expired(refresh_time: Optional[float], max_age: float) -> bool:
+    """缓存从未加载或距上次刷新超过max_age秒
+
+    从未加载时refresh_time为None，不能用0，time.monotonic()从系统启动开始计时
+    """
+    return refresh_time is None or time.monotonic() - refresh_time > max_age
+
+
+class TtlCache(object):
+    """ 按TTL整体刷新的缓存基类 """
+
+    # 缓存未命中时强制刷新的最小间隔，单位秒
+    MISS_REFRESH_INTERVAL: int = 5
+
+    def __init__(self, ttl: int) -> None:
+        """初始化TtlCache实例
+
+        Args:
+            ttl: 缓存有效期，单位秒
+        """
+        self.ttl: int = ttl
+        self._lock: threading.Lock = threading.Lock()
+        self._refresh_time: Optional[float] = None
+
+    def refresh(self) -> None:
+        """重新收集数据，子类实现，刷新完成后整体替换缓存的数据"""
+        raise NotImplementedError
+
+    def _ensure_fresh(self, max_age: Optional[float] = None) -> None:
+        """缓存超过max_age(默认为ttl)秒时刷新"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if is_expired(self._refresh_time, max_age):
+                self.refresh()
+                self._refresh_time = time.monotonic()
+
+    def _lookup(self, find: Callable[[], Optional[T]]) -> Optional[T]:
+        """在缓存中查找，找不到时提前刷新一次再查找，兼容新建的对象
+
+        Args:
+            find: 在当前缓存中查找的函数，找不到时返回None
+        """
+        self._ensure_fresh()
+        found: Optional[T] = find()
+        if found is None:
+            self._ensure_fresh(max_age=self.MISS_REFRESH_INTERVAL)
+            found = find()
+        return found
+
+    def invalidate(self) -> None:
+        """清除缓存，下次访问时重新收集"""
+        with self._lock:
+            self._refresh_time = None
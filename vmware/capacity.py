@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere容量统计
+通过属性收集器批量拉取虚拟机和主机的容量属性，按列保存为NumPy数组，
+按主机、集群、数据中心的分组汇总均为向量化的bincount
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+from pyVmomi import vim
+
+from .cache import TtlCache
+from .tools import pchelper
+
+
+class Capacity(TtlCache):
+    """ VMware vSphere容量统计类 """
+
+    # 虚拟机需要的属性
+    VM_PROPERTIES: list[str] = [
+        "runtime.host",
+        "runtime.powerState",
+        "summary.config.numCpu",
+        "summary.config.memorySizeMB",
+        "summary.storage.committed",
+        "summary.storage.uncommitted",
+    ]
+
+    # 主机需要的属性
+    HOST_PROPERTIES: list[str] = [
+        "name",
+        "parent",
+        "summary.hardware.numCpuCores",
+        "summary.hardware.numCpuThreads",
+        "summary.hardware.memorySize",
+    ]
+
+    # 支持的分组方式
+    GROUP_KINDS: tuple[str, ...] = ("host", "cluster", "datacenter")
+
+    def __init__(self, vi: Any, ttl: int = 300) -> None:
+        """初始化Capacity实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 缓存有效期，单位秒
+        """
+        super().__init__(ttl)
+        self.vi: Any = vi
+        # 各分组方式的分组MOID和名称
+        self._groups: dict[str, list[tuple[str, str]]] = {kind: [] for kind in self.GROUP_KINDS}
+        # 虚拟机和主机所属分组的下标，不属于任何分组时为-1
+        self._vm_groups: dict[str, np.ndarray] = {}
+        self._host_groups: dict[str, np.ndarray] = {}
+        self._vm_columns: dict[str, np.ndarray] = {}
+        self._host_columns: dict[str, np.ndarray] = {}
+
+    def _collect(self, obj_type: Any, path_set: list[str], container: Optional[Any] = None) -> list[dict[str, Any]]:
+        """对指定类型的所有对象做一次属性收集"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [obj_type], container)
+        try:
+            return pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=obj_type,
+                path_set=path_set,
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+
+    def refresh(self) -> None:
+        """重新拉取容量数据"""
+        # 主机所在的数据中心，数据中心数量很少，逐个收集其下的主机
+        datacenters: list[dict[str, Any]] = self._collect(vim.Datacenter, ["name"])
+        host_datacenter: dict[str, int] = {}
+        for index, dc_data in enumerate(datacenters):
+            for host_data in self._collect(vim.HostSystem, ["name"], container=dc_data["obj"]):
+                host_datacenter[host_data["obj"]._moId] = index
+
+        clusters: list[dict[str, Any]] = self._collect(vim.ClusterComputeResource, ["name"])
+        cluster_index: dict[str, int] = {
+            cluster_data["obj"]._moId: index for index, cluster_data in enumerate(clusters)
+        }
+
+        hosts: list[dict[str, Any]] = self._collect(vim.HostSystem, self.HOST_PROPERTIES)
+        host_index: dict[str, int] = {host_data["obj"]._moId: index for index, host_data in enumerate(hosts)}
+        host_count: int = len(hosts)
+        host_groups: dict[str, np.ndarray] = {
+            "host": np.arange(host_count, dtype=np.int64),
+            "cluster": np.fromiter(
+                (cluster_index.get(getattr(host_data.get("parent"), "_moId", None), -1) for host_data in hosts),
+                dtype=np.int64, count=host_count),
+            "datacenter": np.fromiter(
+                (host_datacenter.get(host_data["obj"]._moId, -1) for host_data in hosts),
+                dtype=np.int64, count=host_count),
+        }
+        host_columns: dict[str, np.ndarray] = {
+            "cpu_cores": np.fromiter(
+                (host_data.get("summary.hardware.numCpuCores") or 0 for host_data in hosts),
+                dtype=np.int64, count=host_count),
+            "cpu_threads": np.fromiter(
+                (host_data.get("summary.hardware.numCpuThreads") or 0 for host_data in hosts),
+                dtype=np.int64, count=host_count),
+            "memory_mb": np.fromiter(
+                ((host_data.get("summary.hardware.memorySize") or 0) // (1024 * 1024) for host_data in hosts),
+                dtype=np.int64, count=host_count),
+        }
+
+        vms: list[dict[str, Any]] = self._collect(vim.VirtualMachine, self.VM_PROPERTIES)
+        vm_count: int = len(vms)
+        vm_host: np.ndarray = np.fromiter(
+            (host_index.get(getattr(vm_data.get("runtime.host"), "_moId", None), -1) for vm_data in vms),
+            dtype=np.int64, count=vm_count)
+        committed: np.ndarray = np.fromiter(
+            (vm_data.get("summary.storage.committed") or 0 for vm_data in vms), dtype=np.int64, count=vm_count)
+        vm_columns: dict[str, np.ndarray] = {
+            "powered_on": np.fromiter(
+                (vm_data.get("runtime.powerState") == vim.VirtualMachinePowerState.poweredOn for vm_data in vms),
+                dtype=bool, count=vm_count),
+            "vcpu": np.fromiter(
+                (vm_data.get("summary.config.numCpu") or 0 for vm_data in vms), dtype=np.int64, count=vm_count),
+            "memory_mb": np.fromiter(
+                (vm_data.get("summary.config.memorySizeMB") or 0 for vm_data in vms), dtype=np.int64, count=vm_count),
+            "storage_committed": committed,
+            "storage_provisioned": committed + np.fromiter(
+                (vm_data.get("summary.storage.uncommitted") or 0 for vm_data in vms), dtype=np.int64, count=vm_count),
+        }
+        # 虚拟机的分组取自所在主机，没有主机的虚拟机不属于任何分组
+        vm_groups: dict[str, np.ndarray] = {
+            kind: np.where(vm_host >= 0, groups[vm_host], -1) if host_count else np.full(vm_count, -1)
+            for kind, groups in host_groups.items()
+        }
+
+        self._groups = {
+            "host": [(host_data["obj"]._moId, host_data.get("name", "")) for host_data in hosts],
+            "cluster": [(cluster_data["obj"]._moId, cluster_data.get("name", "")) for cluster_data in clusters],
+            "datacenter": [(dc_data["obj"]._moId, dc_data.get("name", "")) for dc_data in datacenters],
+        }
+        self._host_groups = host_groups
+        self._host_columns = host_columns
+        self._vm_groups = vm_groups
+        self._vm_columns = vm_columns
+
+    def rollup(self, group_by: str = "cluster") -> list[dict[str, Any]]:
+        """按分组汇总容量
+
+        Args:
+            group_by: 分组方式，可选host/cluster/datacenter
+
+        Returns:
+            list[dict[str, Any]]: 每个分组的虚拟机数量、已分配的vCPU/内存/存储(总量和开机部分)、
+                                  主机物理资源以及开机虚拟机的CPU、内存超配比
+        """
+        self._ensure_fresh()
+        groups: list[tuple[str, str]] = self._groups[group_by]
+        group_count: int = len(groups)
+        if not group_count:
+            return []
+
+        vm_groups: np.ndarray = self._vm_groups[group_by]
+        vm_valid: np.ndarray = vm_groups >= 0
+        vm_index: np.ndarray = vm_groups[vm_valid]
+        powered_on: np.ndarray = self._vm_columns["powered_on"][vm_valid]
+
+        def vm_sum(column: Optional[str] = None, only_powered_on: bool = False) -> np.ndarray:
+            weights: np.ndarray = self._vm_columns[column][vm_valid] if column else np.ones(len(vm_index))
+            if only_powered_on:
+                weights = weights * powered_on
+            return np.bincount(vm_index, weights=weights, minlength=group_count)
+
+        host_groups: np.ndarray = self._host_groups[group_by]
+        host_valid: np.ndarray = host_groups >= 0
+        host_index: np.ndarray = host_groups[host_valid]
+
+        def host_sum(column: Optional[str] = None) -> np.ndarray:
+            weights: np.ndarray = self._host_columns[column][host_valid] if column else np.ones(len(host_index))
+            return np.bincount(host_index, weights=weights, minlength=group_count)
+
+        columns: dict[str, np.ndarray] = {
+            "vm_count": vm_sum(),
+            "powered_on_vm_count": vm_sum(only_powered_on=True),
+            "vcpu": vm_sum("vcpu"),
+            "powered_on_vcpu": vm_sum("vcpu", True),
+            "memory_mb": vm_sum("memory_mb"),
+            "powered_on_memory_mb": vm_sum("memory_mb", True),
+            "storage_committed": vm_sum("storage_committed"),
+            "storage_provisioned": vm_sum("storage_provisioned"),
+            "host_count": host_sum(),
+            "host_cpu_cores": host_sum("cpu_cores"),
+            "host_cpu_threads": host_sum("cpu_threads"),
+            "host_memory_mb": host_sum("memory_mb"),
+        }
+        cpu_overcommit: np.ndarray = np.zeros(group_count)
+        np.divide(columns["powered_on_vcpu"], columns["host_cpu_cores"],
+                  out=cpu_overcommit, where=columns["host_cpu_cores"] > 0)
+        memory_overcommit: np.ndarray = np.zeros(group_count)
+        np.divide(columns["powered_on_memory_mb"], columns["host_memory_mb"],
+                  out=memory_overcommit, where=columns["host_memory_mb"] > 0)
+
+        integer_columns: dict[str, list[int]] = {
+            name: column.astype(np.int64).tolist() for name, column in columns.items()
+        }
+        cpu_ratios: list[float] = np.round(cpu_overcommit, 2).tolist()
+        memory_ratios: list[float] = np.round(memory_overcommit, 2).tolist()
+        return [
+            dict(
+                {"moid": moid, "name": name},
+                **{column_name: values[index] for column_name, values in integer_columns.items()},
+                cpu_overcommit=cpu_ratios[index],
+                memory_overcommit=memory_ratios[index],
+            )
+            for index, (moid, name) in enumerate(groups)
+        ]
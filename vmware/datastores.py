@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere存储清单
+一次属性收集拉取所有存储的容量、主机挂载和虚拟机列表，按TTL整体刷新，
+虚拟机详情中的存储容量也从该缓存读取，不再逐个读取存储的summary
+"""
+
+from typing import Any, Optional
+
+from pyVmomi import vim
+
+from .cache import TtlCache
+from .tools import pchelper
+
+
+# 字节转TB
+TB: float = float(1024 * 1024 * 1024 * 1024)
+
+
+class Datastores(TtlCache):
+    """ VMware vSphere存储清单类 """
+
+    # 存储需要的属性
+    DATASTORE_PROPERTIES: list[str] = [
+        "name",
+        "summary.type",
+        "summary.url",
+        "summary.capacity",
+        "summary.freeSpace",
+        "summary.uncommitted",
+        "summary.accessible",
+        "summary.maintenanceMode",
+        "summary.multipleHostAccess",
+        "host",
+        "vm",
+    ]
+
+    def __init__(self, vi: Any, ttl: int = 60) -> None:
+        """初始化Datastores实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 缓存有效期，单位秒
+        """
+        super().__init__(ttl)
+        self.vi: Any = vi
+        self._datastores: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def layout_datastore(ds_data: dict[str, Any]) -> dict[str, Any]:
+        """将收集的存储属性整理为可序列化的字典"""
+        capacity: int = ds_data.get("summary.capacity") or 0
+        free_space: int = ds_data.get("summary.freeSpace") or 0
+        uncommitted: int = ds_data.get("summary.uncommitted") or 0
+        hosts: list[dict[str, Any]] = []
+        for host_mount in ds_data.get("host") or []:
+            mount_info: Any = host_mount.mountInfo
+            hosts.append({
+                "moid": host_mount.key._moId,
+                "path": mount_info.path or "",
+                "access_mode": mount_info.accessMode or "",
+                "mounted": bool(mount_info.mounted),
+                "accessible": bool(mount_info.accessible),
+            })
+        return {
+            "moid": ds_data["obj"]._moId,
+            "name": ds_data.get("name", ""),
+            "type": ds_data.get("summary.type") or "",
+            "url": ds_data.get("summary.url") or "",
+            "accessible": bool(ds_data.get("summary.accessible")),
+            "maintenance_mode": ds_data.get("summary.maintenanceMode") or "",
+            "multiple_host_access": bool(ds_data.get("summary.multipleHostAccess")),
+            # 容量单位TB，与虚拟机详情一致
+            "total_size": round(capacity / TB, 2),
+            "free_size": round(free_space / TB, 2),
+            "provisioned_size": round((capacity - free_space + uncommitted) / TB, 2),
+            "free_bytes": free_space,
+            "hosts": hosts,
+            "vms": [vm_obj._moId for vm_obj in ds_data.get("vm") or []],
+        }
+
+    def refresh(self) -> None:
+        """对所有存储做一次属性收集，重新生成缓存"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [vim.Datastore])
+        try:
+            datastores_data: list[dict[str, Any]] = pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=vim.Datastore,
+                path_set=self.DATASTORE_PROPERTIES,
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+        self._datastores = {
+            ds_data["obj"]._moId: self.layout_datastore(ds_data) for ds_data in datastores_data
+        }
+
+    def list_datastores(self) -> list[dict[str, Any]]:
+        """获取所有存储
+
+        Returns:
+            list[dict[str, Any]]: 存储列表，按名称排序
+        """
+        self._ensure_fresh()
+        return sorted(self._datastores.values(), key=lambda ds_info: ds_info["name"])
+
+    def get(self, datastore_moid: str) -> Optional[dict[str, Any]]:
+        """获取存储，缓存中不存在时提前刷新一次，兼容新建的存储
+
+        Args:
+            datastore_moid: 存储MOID
+
+        Returns:
+            Optional[dict[str, Any]]: 存储信息，存储不存在时返回None
+        """
+        return self._lookup(lambda: self._datastores.get(datastore_moid))
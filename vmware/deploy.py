@@ -0,0 +1,538 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere模板部署
+模板目录按TTL缓存，部署任务创建时一次性计算每台虚拟机的主机和存储，
+按主机和存储限制并发提交CloneVM_Task，任务状态持久化到文件，中断后可以继续部署
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+from pyVmomi import vim
+
+from .bulk import BulkTaskRunner
+from .cache import TtlCache
+from .scheduler import AdmissionScheduler
+from .tools import pchelper
+
+
+# 字节转GB
+GB: float = float(1024 * 1024 * 1024)
+
+
+class CloneStatus(object):
+    """部署任务中单台虚拟机的状态"""
+    PENDING = "pending"     # 等待提交
+    RUNNING = "running"     # 已提交克隆任务
+    SUCCESS = "success"     # 克隆完成
+    ERROR = "error"         # 克隆失败
+
+
+class JobStatus(object):
+    """部署任务的状态"""
+    PENDING = "pending"     # 已创建，未开始
+    RUNNING = "running"     # 部署中
+    FINISHED = "finished"   # 所有虚拟机已结束
+
+
+class TemplateCatalog(TtlCache):
+    """ VMware vSphere模板目录类 """
+
+    # 模板需要的属性，模板无法在服务端过滤，收集所有虚拟机后按summary.config.template过滤
+    TEMPLATE_PROPERTIES: list[str] = [
+        "name",
+        "parent",
+        "datastore",
+        "summary.config.uuid",
+        "summary.config.template",
+        "summary.config.guestFullName",
+        "summary.config.numCpu",
+        "summary.config.memorySizeMB",
+        "summary.storage.committed",
+        "summary.storage.uncommitted",
+        "snapshot.currentSnapshot",
+    ]
+
+    def __init__(self, vi: Any, ttl: int = 300) -> None:
+        """初始化TemplateCatalog实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 缓存有效期，单位秒
+        """
+        super().__init__(ttl)
+        self.vi: Any = vi
+        self._templates: dict[str, dict[str, Any]] = {}
+        # 模板UUID到模板对象、所在文件夹和当前快照的映射
+        self._objs: dict[str, dict[str, Any]] = {}
+
+    def refresh(self) -> None:
+        """收集所有虚拟机，重新生成模板目录"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [vim.VirtualMachine])
+        try:
+            vms_data: list[dict[str, Any]] = pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=vim.VirtualMachine,
+                path_set=self.TEMPLATE_PROPERTIES,
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+
+        templates: dict[str, dict[str, Any]] = {}
+        objs: dict[str, dict[str, Any]] = {}
+        for vm_data in vms_data:
+            template_uuid: Optional[str] = vm_data.get("summary.config.uuid")
+            if not vm_data.get("summary.config.template") or not template_uuid:
+                continue
+            committed: int = vm_data.get("summary.storage.committed") or 0
+            uncommitted: int = vm_data.get("summary.storage.uncommitted") or 0
+            parent_obj: Any = vm_data.get("parent")
+            snapshot_obj: Any = vm_data.get("snapshot.currentSnapshot")
+            templates[template_uuid] = {
+                "uuid": template_uuid,
+                "moid": vm_data["obj"]._moId,
+                "name": vm_data.get("name", ""),
+                "os_name": vm_data.get("summary.config.guestFullName") or "",
+                "cpu": vm_data.get("summary.config.numCpu") or 0,
+                "memory": vm_data.get("summary.config.memorySizeMB") or 0,
+                "storage_size": round((committed + uncommitted) / GB, 2),
+                "storage_bytes": committed + uncommitted,
+                "folder": parent_obj._moId if parent_obj is not None else None,
+                "datastores": [ds_obj._moId for ds_obj in vm_data.get("datastore") or []],
+                # 链接克隆需要模板有快照
+                "linked_clone": snapshot_obj is not None,
+            }
+            objs[template_uuid] = {
+                "obj": vm_data["obj"],
+                "folder": parent_obj,
+                "snapshot": snapshot_obj,
+            }
+        self._templates = templates
+        self._objs = objs
+
+    def list_templates(self) -> list[dict[str, Any]]:
+        """获取所有模板
+
+        Returns:
+            list[dict[str, Any]]: 模板列表，按名称排序
+        """
+        self._ensure_fresh()
+        return sorted(self._templates.values(), key=lambda template: template["name"])
+
+    def get(self, template_uuid: str) -> Optional[tuple[dict[str, Any], dict[str, Any]]]:
+        """获取模板信息和模板对象，缓存中不存在时提前刷新一次，兼容新建的模板
+
+        Returns:
+            Optional[tuple[dict[str, Any], dict[str, Any]]]: 模板信息和模板对象，模板不存在时返回None
+        """
+        return self._lookup(lambda: self._find(template_uuid))
+
+    def _find(self, template_uuid: str) -> Optional[tuple[dict[str, Any], dict[str, Any]]]:
+        templates: dict[str, dict[str, Any]] = self._templates
+        objs: dict[str, dict[str, Any]] = self._objs
+        if template_uuid not in templates or template_uuid not in objs:
+            return None
+        return templates[template_uuid], objs[template_uuid]
+
+
+class Deployments(object):
+    """ VMware vSphere模板部署类 """
+
+    def __init__(
+        self,
+        vi: Any,
+        state_dir: Optional[str] = None,
+        host_concurrency: int = 4,
+        datastore_concurrency: int = 8,
+        template_ttl: int = 300,
+    ) -> None:
+        """初始化Deployments实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            state_dir: 部署任务状态的持久化目录，为空时只保存在内存中
+            host_concurrency: 每台目标主机同时执行的克隆任务数，0表示不限制
+            datastore_concurrency: 每个目标存储同时执行的克隆任务数，0表示不限制
+            template_ttl: 模板目录的缓存有效期，单位秒
+        """
+        self.vi: Any = vi
+        self.state_dir: Optional[str] = state_dir
+        self.templates: TemplateCatalog = TemplateCatalog(vi, ttl=template_ttl)
+        # 克隆任务的并发上限，在变更操作的准入控制之外单独限制
+        self.scheduler: AdmissionScheduler = AdmissionScheduler({
+            "host": host_concurrency,
+            "datastore": datastore_concurrency,
+        })
+        self._runner: BulkTaskRunner = BulkTaskRunner(vi, self.scheduler)
+        self._lock: threading.Lock = threading.Lock()
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._jobs_loaded: bool = False
+        # 正在执行的部署任务ID
+        self._running: set[str] = set()
+
+    # ---------- 任务状态 ----------
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _load_jobs(self) -> None:
+        """读取持久化的部署任务，调用方需持有_lock，文件损坏时忽略"""
+        self._jobs_loaded = True
+        if not self.state_dir or not os.path.isdir(self.state_dir):
+            return
+        for file_name in os.listdir(self.state_dir):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.state_dir, file_name), "r", encoding="utf-8") as f:
+                    job: dict[str, Any] = json.load(f)
+                self._jobs.setdefault(job["job_id"], job)
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+
+    def _save_job(self, job: dict[str, Any]) -> None:
+        """写入部署任务状态，调用方需持有_lock，先写临时文件再替换，避免读到半个文件"""
+        job["update_time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        if not self.state_dir:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path: str = self._job_path(job["job_id"]) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, self._job_path(job["job_id"]))
+
+    @staticmethod
+    def _layout_job(job: dict[str, Any], include_vms: bool = True) -> dict[str, Any]:
+        """部署任务信息，包括各状态的虚拟机数量"""
+        counts: dict[str, int] = {}
+        for vm in job["vms"]:
+            counts[vm["status"]] = counts.get(vm["status"], 0) + 1
+        job_info: dict[str, Any] = {key: value for key, value in job.items() if key != "vms"}
+        job_info["total"] = len(job["vms"])
+        job_info["counts"] = counts
+        if include_vms:
+            job_info["vms"] = copy.deepcopy(job["vms"])
+        return job_info
+
+    def list_jobs(self) -> list[dict[str, Any]]:
+        """获取所有部署任务，不包括虚拟机列表
+
+        Returns:
+            list[dict[str, Any]]: 部署任务列表，最近创建的在前
+        """
+        with self._lock:
+            if not self._jobs_loaded:
+                self._load_jobs()
+            jobs: list[dict[str, Any]] = [self._layout_job(job, include_vms=False) for job in self._jobs.values()]
+        return sorted(jobs, key=lambda job_info: job_info["create_time"], reverse=True)
+
+    def get_job(self, job_id: str) -> Optional[dict[str, Any]]:
+        """获取部署任务详情
+
+        Returns:
+            Optional[dict[str, Any]]: 部署任务详情，包括每台虚拟机的放置和状态，任务不存在时返回None
+        """
+        with self._lock:
+            if not self._jobs_loaded:
+                self._load_jobs()
+            job: Optional[dict[str, Any]] = self._jobs.get(job_id)
+            return self._layout_job(job) if job is not None else None
+
+    # ---------- 放置 ----------
+
+    def place(
+        self,
+        cluster_moid: str,
+        count: int,
+        datastore_moids: Optional[list[str]] = None,
+        reserve_bytes: int = 0,
+    ) -> list[tuple[str, str]]:
+        """计算每台虚拟机的目标主机和存储
+
+        从存储清单缓存读取可用空间和主机挂载，每台虚拟机选择扣除已放置虚拟机后
+        可用空间最大的存储，再从挂载该存储的集群主机中选择已放置虚拟机最少的主机，
+        未连接、处于维护模式或隔离模式的主机不参与放置
+
+        Args:
+            cluster_moid: 目标集群MOID
+            count: 虚拟机数量
+            datastore_moids: 候选存储MOID，为空时使用集群主机挂载的所有存储
+            reserve_bytes: 每台虚拟机预留的存储空间，单位字节
+
+        Returns:
+            list[tuple[str, str]]: 每台虚拟机的(主机MOID, 存储MOID)
+
+        Raises:
+            ValueError: 没有可用的主机或存储空间不足
+        """
+        wanted: Optional[set[str]] = set(datastore_moids) if datastore_moids else None
+        cluster_hosts: dict[str, bool] = {}
+        candidates: dict[str, dict[str, Any]] = {}
+        for ds_info in self.vi.datastores.list_datastores():
+            if wanted is not None and ds_info["moid"] not in wanted:
+                continue
+            if not ds_info["accessible"] or ds_info["maintenance_mode"] not in ("", "normal"):
+                continue
+            hosts: list[str] = []
+            for host_mount in ds_info["hosts"]:
+                if not (host_mount["mounted"] and host_mount["accessible"]):
+                    continue
+                host_moid: str = host_mount["moid"]
+                if host_moid not in cluster_hosts:
+                    host: Optional[dict[str, Any]] = self.vi.inventory.get_host(host_moid)
+                    cluster_hosts[host_moid] = (
+                        host is not None
+                        and host["cluster"] == cluster_moid
+                        and host["connection_state"] == "connected"
+                        and not host["in_maintenance_mode"]
+                        and not host["in_quarantine_mode"])
+                if cluster_hosts[host_moid]:
+                    hosts.append(host_moid)
+            if hosts:
+                candidates[ds_info["moid"]] = {"free": ds_info["free_bytes"], "hosts": sorted(hosts)}
+        if not candidates:
+            raise ValueError("集群中没有可用的主机和存储")
+
+        host_counts: dict[str, int] = {}
+        placements: list[tuple[str, str]] = []
+        for _ in range(count):
+            ds_moid: str = max(candidates, key=lambda moid: candidates[moid]["free"])
+            candidate: dict[str, Any] = candidates[ds_moid]
+            if candidate["free"] < reserve_bytes:
+                raise ValueError(f"存储空间不足，已放置{len(placements)}台虚拟机")
+            candidate["free"] -= reserve_bytes
+            host_moid = min(candidate["hosts"], key=lambda moid: host_counts.get(moid, 0))
+            host_counts[host_moid] = host_counts.get(host_moid, 0) + 1
+            placements.append((host_moid, ds_moid))
+        return placements
+
+    # ---------- 部署 ----------
+
+    def create_job(
+        self,
+        template_uuid: str,
+        names: list[str],
+        cluster_moid: str,
+        folder_moid: Optional[str] = None,
+        datastore_moids: Optional[list[str]] = None,
+        linked_clone: bool = False,
+        power_on: bool = False,
+    ) -> dict[str, Any]:
+        """创建部署任务并计算放置，不提交克隆任务
+
+        Args:
+            template_uuid: 模板UUID
+            names: 新虚拟机名称列表
+            cluster_moid: 目标集群MOID
+            folder_moid: 目标文件夹MOID，为空时使用模板所在文件夹
+            datastore_moids: 候选存储MOID，为空时使用集群主机挂载的所有存储
+            linked_clone: 是否链接克隆，需要模板有快照
+            power_on: 克隆完成后是否开机
+
+        Returns:
+            dict[str, Any]: 部署任务详情
+
+        Raises:
+            ValueError: 模板不存在、不支持链接克隆或放置失败
+        """
+        template: Optional[tuple[dict[str, Any], dict[str, Any]]] = self.templates.get(template_uuid)
+        if template is None:
+            raise ValueError(f"模板不存在: {template_uuid}")
+        template_info: dict[str, Any] = template[0]
+        if linked_clone and not template_info["linked_clone"]:
+            raise ValueError(f"模板没有快照，不能链接克隆: {template_info['name']}")
+        folder_moid = folder_moid or template_info["folder"]
+        if not folder_moid:
+            raise ValueError("目标文件夹不存在")
+
+        # 链接克隆只写入增量磁盘，不按模板大小预留空间
+        placements: list[tuple[str, str]] = self.place(
+            cluster_moid, len(names), datastore_moids,
+            reserve_bytes=0 if linked_clone else template_info["storage_bytes"])
+        now: str = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        job: dict[str, Any] = {
+            "job_id": uuid.uuid4().hex,
+            "status": JobStatus.PENDING,
+            "template": {"uuid": template_uuid, "name": template_info["name"]},
+            "cluster": cluster_moid,
+            "folder": folder_moid,
+            "linked_clone": linked_clone,
+            "power_on": power_on,
+            "create_time": now,
+            "update_time": now,
+            "vms": [
+                {
+                    "name": name,
+                    "host": host_moid,
+                    "datastore": ds_moid,
+                    "status": CloneStatus.PENDING,
+                    "vm_moid": "",
+                    "vm_uuid": "",
+                    "error": "",
+                }
+                for name, (host_moid, ds_moid) in zip(names, placements)
+            ],
+        }
+        with self._lock:
+            if not self._jobs_loaded:
+                self._load_jobs()
+            self._jobs[job["job_id"]] = job
+            self._save_job(job)
+            return self._layout_job(job)
+
+    def _adopt_cloned(self, job: dict[str, Any]) -> None:
+        """中断前已提交的克隆若已完成，按名称在目标文件夹中找到虚拟机并记为成功，避免重复克隆"""
+        submitted: dict[str, dict[str, Any]] = {
+            vm["name"]: vm for vm in job["vms"] if vm["status"] == CloneStatus.RUNNING
+        }
+        if not submitted:
+            return
+        view_ref: Any = self.vi.get_vms_view()
+        try:
+            vms_data: list[dict[str, Any]] = pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=vim.VirtualMachine,
+                path_set=["name", "parent", "summary.config.uuid"],
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+        for vm_data in vms_data:
+            vm: Optional[dict[str, Any]] = submitted.get(vm_data.get("name"))
+            parent_obj: Any = vm_data.get("parent")
+            if vm is not None and parent_obj is not None and parent_obj._moId == job["folder"]:
+                vm.update(
+                    status=CloneStatus.SUCCESS,
+                    vm_moid=vm_data["obj"]._moId,
+                    vm_uuid=vm_data.get("summary.config.uuid") or "",
+                    error="")
+
+    def run_job(self, job_id: str, on_progress: Optional[Callable[[int], None]] = None) -> dict[str, Any]:
+        """执行或继续部署任务
+
+        跳过已成功的虚拟机；中断前已提交的虚拟机若已存在则记为成功，否则与失败的虚拟机一起重新克隆。
+        每台虚拟机获得主机和存储的名额后立即提交CloneVM_Task，任务由共享的任务监视器等待，
+        每台虚拟机结束时持久化任务状态
+
+        Args:
+            job_id: 部署任务ID
+            on_progress: 接收整体进度(0-100)
+
+        Returns:
+            dict[str, Any]: 部署任务信息，包括各状态的虚拟机数量
+
+        Raises:
+            ValueError: 部署任务不存在或正在执行
+        """
+        with self._lock:
+            if not self._jobs_loaded:
+                self._load_jobs()
+            job: Optional[dict[str, Any]] = self._jobs.get(job_id)
+            if job is None:
+                raise ValueError(f"部署任务不存在: {job_id}")
+            if job_id in self._running:
+                raise ValueError(f"部署任务正在执行: {job_id}")
+            self._running.add(job_id)
+        try:
+            self._run_job(job, on_progress)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+                job["status"] = JobStatus.FINISHED
+                self._save_job(job)
+        with self._lock:
+            return self._layout_job(job, include_vms=False)
+
+    def is_running(self, job_id: str) -> bool:
+        """部署任务是否正在执行"""
+        with self._lock:
+            return job_id in self._running
+
+    def _run_job(self, job: dict[str, Any], on_progress: Optional[Callable[[int], None]]) -> None:
+        self._adopt_cloned(job)
+        vms: dict[str, dict[str, Any]] = {
+            vm["name"]: vm for vm in job["vms"] if vm["status"] != CloneStatus.SUCCESS
+        }
+        total: int = len(job["vms"]) or 1
+        finished: int = total - len(vms)
+        with self._lock:
+            job["status"] = JobStatus.RUNNING
+            self._save_job(job)
+        if not vms:
+            return
+
+        template: Optional[tuple[dict[str, Any], dict[str, Any]]] = self.templates.get(job["template"]["uuid"])
+        if template is None:
+            raise ValueError(f"模板不存在: {job['template']['name']}")
+        template_obj: Any = template[1]["obj"]
+        snapshot_obj: Any = template[1]["snapshot"]
+        if job["linked_clone"] and snapshot_obj is None:
+            raise ValueError(f"模板没有快照，不能链接克隆: {job['template']['name']}")
+        stub: Any = self.vi.si._stub
+        folder_obj: Any = vim.Folder(job["folder"], stub)
+        resource_pool: Any = vim.ClusterComputeResource(job["cluster"], stub).resourcePool
+
+        def submit(name: str) -> Any:
+            vm: dict[str, Any] = vms[name]
+            relocate_spec: vim.vm.RelocateSpec = vim.vm.RelocateSpec(
+                pool=resource_pool,
+                host=vim.HostSystem(vm["host"], stub),
+                datastore=vim.Datastore(vm["datastore"], stub))
+            clone_spec: vim.vm.CloneSpec = vim.vm.CloneSpec(
+                location=relocate_spec, powerOn=job["power_on"], template=False)
+            if job["linked_clone"]:
+                relocate_spec.diskMoveType = "createNewChildDiskBacking"
+                clone_spec.snapshot = snapshot_obj
+            task: Any = template_obj.CloneVM_Task(folder=folder_obj, name=name, spec=clone_spec)
+            with self._lock:
+                vm.update(status=CloneStatus.RUNNING, error="")
+                self._save_job(job)
+            return task
+
+        def finish(name: str, result: Any = None, error: Optional[Any] = None) -> None:
+            nonlocal finished
+            vm: dict[str, Any] = vms[name]
+            with self._lock:
+                if error is None:
+                    vm.update(status=CloneStatus.SUCCESS, vm_moid=result._moId if result is not None else "", error="")
+                else:
+                    vm.update(status=CloneStatus.ERROR, error=getattr(error, "msg", None) or str(error))
+                self._save_job(job)
+            finished += 1
+            if on_progress:
+                on_progress(int(finished * 100 / total))
+
+        self._runner.run(
+            {
+                name: (
+                    [("host", vm["host"]), ("datastore", vm["datastore"])],
+                    [("host", vm["host"]), ("datastore", vm["datastore"]), ("cluster", job["cluster"])],
+                )
+                for name, vm in vms.items()
+            },
+            submit,
+            finish)
+        self._resolve_uuids(job)
+
+    def _resolve_uuids(self, job: dict[str, Any]) -> None:
+        """通过一次属性收集获取新虚拟机的UUID"""
+        vms: dict[str, dict[str, Any]] = {
+            vm["vm_moid"]: vm for vm in job["vms"]
+            if vm["status"] == CloneStatus.SUCCESS and vm["vm_moid"] and not vm["vm_uuid"]
+        }
+        if not vms:
+            return
+        stub: Any = self.vi.si._stub
+        vms_data: list[dict[str, Any]] = pchelper.collect_object_properties(
+            self.vi.si, [vim.VirtualMachine(vm_moid, stub) for vm_moid in vms],
+            vim.VirtualMachine, ["summary.config.uuid"])
+        with self._lock:
+            for vm_data in vms_data:
+                vms[vm_data["obj"]._moId]["vm_uuid"] = vm_data.get("summary.config.uuid") or ""
+            self._save_job(job)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere事件增量读取
+维持一个长期存在的EventHistoryCollector，用ReadNextEvents逐页读取新事件，
+并持久化最后读取的事件键，重启后从该事件之后继续读取
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pyVmomi import vim, vmodl
+
+
+# 事件参数属性名称、整理后的字段名称和参数中被管理对象的属性名称
+EVENT_ENTITY_ARGUMENTS: dict[str, tuple[str, str]] = {
+    "datacenter": ("datacenter", "datacenter"),
+    "computeResource": ("compute_resource", "computeResource"),
+    "host": ("host", "host"),
+    "vm": ("vm", "vm"),
+    "ds": ("datastore", "datastore"),
+    "net": ("network", "network"),
+    "dvs": ("dvs", "dvs"),
+}
+
+
+class EventFeed(object):
+    """ VMware vSphere事件增量读取类 """
+
+    def __init__(
+        self,
+        vi: Any,
+        state_path: Optional[str] = None,
+        page_size: int = 100,
+        buffer_size: int = 1000,
+    ) -> None:
+        """初始化EventFeed实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            state_path: 最后读取的事件键的持久化文件，为空时只保存在内存中
+            page_size: 单次ReadNextEvents读取的最大事件数
+            buffer_size: 内存中保留的最近事件数
+        """
+        self.vi: Any = vi
+        self.state_path: Optional[str] = state_path
+        self.page_size: int = max(int(page_size), 1)
+        # _lock保护事件收集器，_buffer_lock保护内存中的事件，读取vCenter期间不阻塞取事件
+        self._lock: threading.Lock = threading.Lock()
+        self._buffer_lock: threading.Lock = threading.Lock()
+        self._collector: Optional[Any] = None
+        self._events: deque = deque(maxlen=max(int(buffer_size), 1))
+        self._last_key: int = 0
+        # 已被挤出内存的最大事件键
+        self._dropped_key: int = 0
+        self._last_time: Optional[datetime] = None
+        self._state_loaded: bool = False
+
+    @property
+    def last_key(self) -> int:
+        """最后读取的事件键"""
+        return self._last_key
+
+    @staticmethod
+    def layout_event(event: Any) -> dict[str, Any]:
+        """将Event整理为可序列化的字典"""
+        event_info: dict[str, Any] = {
+            "key": event.key,
+            "chain_id": event.chainId,
+            "type": type(event).__name__.split(".")[-1],
+            "created_time": event.createdTime.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user": event.userName or "",
+            "message": event.fullFormattedMessage or "",
+        }
+        for argument_name, (field_name, entity_name) in EVENT_ENTITY_ARGUMENTS.items():
+            argument: Any = getattr(event, argument_name, None)
+            entity_obj: Any = getattr(argument, entity_name, None) if argument is not None else None
+            event_info[field_name] = {
+                "moid": entity_obj._moId if entity_obj is not None else None,
+                "name": argument.name,
+            } if argument is not None else None
+        return event_info
+
+    @property
+    def _instance_uuid(self) -> str:
+        return self.vi.content.about.instanceUuid
+
+    def _load_state(self) -> None:
+        """读取持久化的最后事件键，vCenter实例不一致或文件损坏时忽略"""
+        self._state_loaded = True
+        if not self.state_path or not os.path.isfile(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state: dict[str, Any] = json.load(f)
+            if state.get("instance") != self._instance_uuid:
+                return
+            self._last_key = int(state["key"])
+            self._last_time = datetime.strptime(
+                state["created_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+    def _save_state(self) -> None:
+        """写入最后事件键，先写临时文件再替换，避免读到半个文件"""
+        if not self.state_path or self._last_time is None:
+            return
+        directory: str = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path: str = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "instance": self._instance_uuid,
+                "key": self._last_key,
+                "created_time": self._last_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _create_collector(self) -> Any:
+        """创建事件收集器，从最后读取的事件时间开始，首次读取时从当前时间开始，不回放历史事件"""
+        if self._last_time is not None:
+            # 事件时间精度为秒，从同一秒开始读取，已读取的事件按键跳过
+            begin_time: datetime = self._last_time
+        else:
+            begin_time = self.vi.si.CurrentTime() - timedelta(seconds=1)
+        filter_spec: Any = vim.event.EventFilterSpec(
+            time=vim.event.EventFilterSpec.ByTime(beginTime=begin_time))
+        collector: Any = self.vi.content.eventManager.CreateCollectorForEvents(filter=filter_spec)
+        collector.RewindCollector()
+        return collector
+
+    def _destroy_collector(self) -> None:
+        if self._collector is None:
+            return
+        try:
+            self._collector.DestroyCollector()
+        except Exception:
+            pass
+        self._collector = None
+
+    def read_new(self) -> list[dict[str, Any]]:
+        """读取上次之后的新事件
+
+        逐页调用ReadNextEvents直到没有新事件，读取后更新并持久化最后事件键。
+        收集器失效(如会话过期)时丢弃，下次从最后事件时间重新创建
+
+        Returns:
+            list[dict[str, Any]]: 新事件，按事件键升序
+        """
+        with self._lock:
+            if not self._state_loaded:
+                self._load_state()
+            new_events: list[dict[str, Any]] = []
+            last_key: int = self._last_key
+            last_time: Optional[datetime] = self._last_time
+            try:
+                if self._collector is None:
+                    self._collector = self._create_collector()
+                while True:
+                    events: list[Any] = self._collector.ReadNextEvents(maxCount=self.page_size) or []
+                    if not events:
+                        break
+                    for event in events:
+                        if event.key <= last_key:
+                            continue
+                        new_events.append(self.layout_event(event))
+                        last_key = event.key
+                        last_time = event.createdTime.astimezone(timezone.utc)
+            except (vmodl.fault.ManagedObjectNotFound, vim.fault.NotAuthenticated):
+                self._collector = None
+                raise
+            except Exception:
+                self._destroy_collector()
+                raise
+            finally:
+                if new_events:
+                    with self._buffer_lock:
+                        overflow: int = len(self._events) + len(new_events) - self._events.maxlen
+                        if overflow > 0:
+                            self._dropped_key = (list(self._events) + new_events)[overflow - 1]["key"]
+                        self._events.extend(new_events)
+                        self._last_key = last_key
+                        self._last_time = last_time
+                    self._save_state()
+            return new_events
+
+    def get_events(self, after: int = 0, limit: int = 100) -> dict[str, Any]:
+        """从内存中取出指定事件键之后的事件
+
+        Args:
+            after: 事件键，只返回键大于该值的事件
+            limit: 返回的最大事件数
+
+        Returns:
+            dict[str, Any]: 事件列表、下次请求使用的事件键，以及请求的事件键之后
+                            是否已有事件被挤出内存(truncated)
+        """
+        with self._buffer_lock:
+            events: list[dict[str, Any]] = [event for event in self._events if event["key"] > after][:limit]
+            return {
+                "events": events,
+                "next": events[-1]["key"] if events else max(after, self._last_key),
+                "truncated": 0 < after < self._dropped_key,
+            }
+
+    def close(self) -> None:
+        """销毁事件收集器"""
+        with self._lock:
+            self._destroy_collector()
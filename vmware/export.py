@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere清单导出
+分页收集虚拟机、主机、存储和网络，逐页转换为Apache Arrow记录批次，
+流式写出为Parquet或Arrow IPC流，字符串列使用字典编码
+"""
+
+import io
+from typing import Any, Callable, Iterator, Optional
+
+from pyVmomi import vim
+
+from .tools import pchelper
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# 支持的导出格式
+EXPORT_FORMATS: tuple[str, ...] = ("parquet", "arrow")
+
+# 支持导出的清单
+EXPORT_TABLES: tuple[str, ...] = ("vms", "hosts", "datastores", "networks")
+
+# 各清单的列名和列类型，dictionary为字典编码的字符串列
+TABLE_COLUMNS: dict[str, list[tuple[str, str]]] = {
+    "vms": [
+        ("uuid", "string"),
+        ("name", "string"),
+        ("is_template", "bool"),
+        ("status", "dictionary"),
+        ("vmware_tools_status", "dictionary"),
+        ("note", "string"),
+        ("create_time", "string"),
+        ("folder", "dictionary"),
+        ("os_type", "dictionary"),
+        ("os_name", "dictionary"),
+        ("cpu", "int32"),
+        ("memory_mb", "int64"),
+        ("ip", "string"),
+        ("disk_count", "int32"),
+        ("disk_size_gb", "float64"),
+        ("host", "dictionary"),
+    ],
+    "hosts": [
+        ("moid", "string"),
+        ("name", "string"),
+        ("cluster", "dictionary"),
+        ("connection_state", "dictionary"),
+        ("power_state", "dictionary"),
+        ("vendor", "dictionary"),
+        ("model", "dictionary"),
+        ("cpu_mhz", "int32"),
+        ("cpu_cores", "int32"),
+        ("cpu_threads", "int32"),
+        ("memory_bytes", "int64"),
+        ("version", "dictionary"),
+    ],
+    "datastores": [
+        ("moid", "string"),
+        ("name", "string"),
+        ("type", "dictionary"),
+        ("url", "string"),
+        ("capacity_bytes", "int64"),
+        ("free_bytes", "int64"),
+        ("uncommitted_bytes", "int64"),
+        ("accessible", "bool"),
+        ("multiple_host_access", "bool"),
+    ],
+    "networks": [
+        ("moid", "string"),
+        ("name", "string"),
+        ("type", "dictionary"),
+        ("accessible", "bool"),
+    ],
+}
+
+
+def _dictionary(values: list[Optional[str]]) -> Any:
+    """字典编码的字符串列"""
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+
+def table_schema(table: str) -> Any:
+    """清单固定的表结构，写出器按该结构创建，空清单也能输出有效的文件"""
+    types: dict[str, Any] = {
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+        "bool": pa.bool_(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in TABLE_COLUMNS[table]])
+
+
+class _ChunkSink(io.RawIOBase):
+    """收集写入的数据块，每写完一个记录批次取出一次，实现边收集边输出"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+class InventoryExporter(object):
+    """ VMware vSphere清单导出类 """
+
+    # 主机需要的属性
+    HOST_PROPERTIES: list[str] = [
+        "name",
+        "parent",
+        "runtime.connectionState",
+        "runtime.powerState",
+        "summary.hardware.vendor",
+        "summary.hardware.model",
+        "summary.hardware.cpuMhz",
+        "summary.hardware.numCpuCores",
+        "summary.hardware.numCpuThreads",
+        "summary.hardware.memorySize",
+        "summary.config.product.version",
+    ]
+
+    # 存储需要的属性
+    DATASTORE_PROPERTIES: list[str] = [
+        "name",
+        "summary.type",
+        "summary.url",
+        "summary.capacity",
+        "summary.freeSpace",
+        "summary.uncommitted",
+        "summary.accessible",
+        "summary.multipleHostAccess",
+    ]
+
+    # 网络需要的属性
+    NETWORK_PROPERTIES: list[str] = [
+        "name",
+        "summary.accessible",
+    ]
+
+    def __init__(self, vi: Any, page_size: int = 1000) -> None:
+        """初始化InventoryExporter实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            page_size: 每页收集的对象数量，即每个记录批次的最大行数
+        """
+        if pa is None:
+            raise RuntimeError("导出清单需要安装pyarrow")
+        self.vi: Any = vi
+        self.page_size: int = page_size
+
+    def _iter_pages(self, obj_type: Any, path_set: list[str]) -> Iterator[list[dict[str, Any]]]:
+        """分页收集指定类型的所有对象"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [obj_type])
+        try:
+            yield from pchelper.iter_properties(
+                self.vi.si, view_ref, obj_type, path_set,
+                include_mors=True, page_size=self.page_size)
+        finally:
+            view_ref.Destroy()
+
+    def _host_names(self) -> dict[str, str]:
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [vim.HostSystem])
+        try:
+            return {
+                host_data["obj"]._moId: host_data.get("name", "")
+                for host_data in pchelper.collect_properties(
+                    self.vi.si, view_ref=view_ref, obj_type=vim.HostSystem,
+                    path_set=["name"], include_mors=True)
+            }
+        finally:
+            view_ref.Destroy()
+
+    def iter_vm_batches(self) -> Iterator[Any]:
+        """虚拟机记录批次，每行由layout_dict_vm_data整理，文件夹路径和主机名称预先一次收集"""
+        folder_paths: dict[str, str] = self.vi.get_folder_paths()
+        host_names: dict[str, str] = self._host_names()
+        for page in self._iter_pages(vim.VirtualMachine, self.vi._init_vm_properties()):
+            vms: list[dict[str, Any]] = [
+                vm_info for vm_info in (
+                    self.vi.layout_dict_vm_data(vm_data, folder_paths, host_names) for vm_data in page
+                ) if vm_info
+            ]
+            if not vms:
+                continue
+            yield pa.RecordBatch.from_arrays([
+                pa.array([vm["uuid"] for vm in vms], type=pa.string()),
+                pa.array([vm["name"] for vm in vms], type=pa.string()),
+                pa.array([vm["is_template"] for vm in vms], type=pa.bool_()),
+                _dictionary([vm["status"] for vm in vms]),
+                _dictionary([vm["vmware_tools_status"] for vm in vms]),
+                pa.array([vm["note"] for vm in vms], type=pa.string()),
+                pa.array([vm["create_time"] or None for vm in vms], type=pa.string()),
+                _dictionary([vm["folder"] for vm in vms]),
+                _dictionary([vm["os_type"] for vm in vms]),
+                _dictionary([vm["os_name"] for vm in vms]),
+                pa.array([vm["cpu"] for vm in vms], type=pa.int32()),
+                pa.array([vm["memory"] for vm in vms], type=pa.int64()),
+                pa.array([vm["nic"][0]["ip"] or None for vm in vms], type=pa.string()),
+                pa.array([len(vm.get("disk", [])) for vm in vms], type=pa.int32()),
+                pa.array([sum(disk["size"] for disk in vm.get("disk", [])) for vm in vms], type=pa.float64()),
+                _dictionary([vm.get("host") for vm in vms]),
+            ], schema=table_schema("vms"))
+
+    def iter_host_batches(self) -> Iterator[Any]:
+        """主机记录批次"""
+        for page in self._iter_pages(vim.HostSystem, self.HOST_PROPERTIES):
+            yield pa.RecordBatch.from_arrays([
+                pa.array([host["obj"]._moId for host in page], type=pa.string()),
+                pa.array([host.get("name") for host in page], type=pa.string()),
+                _dictionary([
+                    host["parent"]._moId if isinstance(host.get("parent"), vim.ClusterComputeResource) else None
+                    for host in page
+                ]),
+                _dictionary([host.get("runtime.connectionState") for host in page]),
+                _dictionary([host.get("runtime.powerState") for host in page]),
+                _dictionary([host.get("summary.hardware.vendor") for host in page]),
+                _dictionary([host.get("summary.hardware.model") for host in page]),
+                pa.array([host.get("summary.hardware.cpuMhz") for host in page], type=pa.int32()),
+                pa.array([host.get("summary.hardware.numCpuCores") for host in page], type=pa.int32()),
+                pa.array([host.get("summary.hardware.numCpuThreads") for host in page], type=pa.int32()),
+                pa.array([host.get("summary.hardware.memorySize") for host in page], type=pa.int64()),
+                _dictionary([host.get("summary.config.product.version") for host in page]),
+            ], schema=table_schema("hosts"))
+
+    def iter_datastore_batches(self) -> Iterator[Any]:
+        """存储记录批次"""
+        for page in self._iter_pages(vim.Datastore, self.DATASTORE_PROPERTIES):
+            yield pa.RecordBatch.from_arrays([
+                pa.array([ds["obj"]._moId for ds in page], type=pa.string()),
+                pa.array([ds.get("name") for ds in page], type=pa.string()),
+                _dictionary([ds.get("summary.type") for ds in page]),
+                pa.array([ds.get("summary.url") for ds in page], type=pa.string()),
+                pa.array([ds.get("summary.capacity") for ds in page], type=pa.int64()),
+                pa.array([ds.get("summary.freeSpace") for ds in page], type=pa.int64()),
+                pa.array([ds.get("summary.uncommitted") for ds in page], type=pa.int64()),
+                pa.array([ds.get("summary.accessible") for ds in page], type=pa.bool_()),
+                pa.array([ds.get("summary.multipleHostAccess") for ds in page], type=pa.bool_()),
+            ], schema=table_schema("datastores"))
+
+    def iter_network_batches(self) -> Iterator[Any]:
+        """网络记录批次，包括标准端口组和分布式端口组"""
+        for page in self._iter_pages(vim.Network, self.NETWORK_PROPERTIES):
+            yield pa.RecordBatch.from_arrays([
+                pa.array([network["obj"]._moId for network in page], type=pa.string()),
+                pa.array([network.get("name") for network in page], type=pa.string()),
+                _dictionary([type(network["obj"]).__name__.split(".")[-1] for network in page]),
+                pa.array([network.get("summary.accessible") for network in page], type=pa.bool_()),
+            ], schema=table_schema("networks"))
+
+    def iter_batches(self, table: str) -> Iterator[Any]:
+        """指定清单的记录批次"""
+        batch_iterators: dict[str, Callable[[], Iterator[Any]]] = {
+            "vms": self.iter_vm_batches,
+            "hosts": self.iter_host_batches,
+            "datastores": self.iter_datastore_batches,
+            "networks": self.iter_network_batches,
+        }
+        return batch_iterators[table]()
+
+    def iter_export(self, table: str, fmt: str = "parquet") -> Iterator[bytes]:
+        """导出清单，每写完一个记录批次输出一次已编码的数据
+
+        Parquet的每个记录批次写为一个行组，Arrow使用IPC流格式，
+        允许各批次的字典不同；写出器按清单固定的表结构预先创建，空清单输出只有表结构的文件
+
+        Args:
+            table: 清单名称，可选vms/hosts/datastores/networks
+            fmt: 导出格式，可选parquet/arrow
+
+        Yields:
+            bytes: 已编码的数据
+        """
+        sink: _ChunkSink = _ChunkSink()
+        schema: Any = table_schema(table)
+        if fmt == "parquet":
+            writer: Any = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        else:
+            writer = pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+        try:
+            for batch in self.iter_batches(table):
+                if fmt == "parquet":
+                    writer.write_table(pa.Table.from_batches([batch], schema=schema))
+                else:
+                    writer.write_batch(batch)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    def export_to_file(self, table: str, path: str, fmt: str = "parquet") -> None:
+        """导出清单到文件
+
+        Args:
+            table: 清单名称，可选vms/hosts/datastores/networks
+            path: 文件路径
+            fmt: 导出格式，可选parquet/arrow
+        """
+        with open(path, "wb") as f:
+            for chunk in self.iter_export(table, fmt):
+                f.write(chunk)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere First Class Disk目录
+按存储缓存FCD的名称到ID、ID到配置的映射，刷新时只对新增的FCD调用RetrieveVStorageObject，
+按名称查找为O(1)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from pyVmomi import vim
+
+from .cache import is_expired
+
+
+class DatastoreFcds(object):
+    """ 单个存储的FCD缓存 """
+
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        # FCD ID到VStorageObject的映射
+        self.objects: dict[str, Any] = {}
+        # FCD名称到FCD ID的映射
+        self.names: dict[str, str] = {}
+        # FCD ID到快照描述到快照ID的映射
+        self.snapshots: dict[str, dict[str, Any]] = {}
+        self.refresh_time: Optional[float] = None
+        self.full_refresh_time: Optional[float] = None
+
+
+class FcdCatalog(object):
+    """ VMware vSphere First Class Disk目录类 """
+
+    # 查找未命中时增量刷新的最小间隔，单位秒
+    MISS_REFRESH_INTERVAL: int = 5
+    # 按名称查找未命中时全量刷新的最小间隔，单位秒，增量刷新发现不了重命名
+    MISS_FULL_REFRESH_INTERVAL: int = 60
+
+    def __init__(self, vi: Any, ttl: int = 60, full_refresh_interval: int = 3600, max_workers: int = 8) -> None:
+        """初始化FcdCatalog实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 增量刷新的间隔，单位秒，按名称查找未命中时也会增量刷新
+            full_refresh_interval: 全量刷新的间隔，单位秒，用于发现重命名等配置变化
+            max_workers: 并发执行RetrieveVStorageObject的最大线程数
+        """
+        self.vi: Any = vi
+        self.ttl: int = ttl
+        self.full_refresh_interval: int = full_refresh_interval
+        self.max_workers: int = max(int(max_workers), 1)
+        self._lock: threading.Lock = threading.Lock()
+        self._datastores: dict[str, DatastoreFcds] = {}
+
+    @property
+    def storage(self) -> Any:
+        return self.vi.content.vStorageObjectManager
+
+    def _datastore_fcds(self, datastore_moid: str) -> DatastoreFcds:
+        with self._lock:
+            fcds: Optional[DatastoreFcds] = self._datastores.get(datastore_moid)
+            if fcds is None:
+                fcds = DatastoreFcds()
+                self._datastores[datastore_moid] = fcds
+            return fcds
+
+    def _datastore(self, datastore: Any) -> Any:
+        if isinstance(datastore, str):
+            return vim.Datastore(datastore, self.vi.si._stub)
+        return datastore
+
+    @staticmethod
+    def layout_fcd(fcd: Any) -> dict[str, Any]:
+        """将VStorageObject整理为可序列化的字典"""
+        config: Any = fcd.config
+        backing: Any = config.backing
+        return {
+            "id": config.id.id,
+            "name": config.name,
+            "capacity_mb": config.capacityInMB,
+            "create_time": config.createTime.strftime("%Y-%m-%dT%H:%M:%SZ") if config.createTime else "",
+            "file_path": getattr(backing, "filePath", "") or "",
+            "provisioning_type": getattr(backing, "provisioningType", "") or "",
+            "consumption_type": list(config.consumptionType or []),
+            "keep_after_delete_vm": bool(config.keepAfterDeleteVm),
+        }
+
+    def refresh(self, datastore: Any, full: bool = False) -> None:
+        """刷新存储的FCD缓存
+
+        增量刷新只调用一次ListVStorageObject，移除已删除的FCD，
+        只对新增的FCD调用RetrieveVStorageObject；全量刷新重新获取所有FCD的配置
+
+        Args:
+            datastore: 存储对象或存储MOID
+            full: 是否全量刷新
+        """
+        datastore = self._datastore(datastore)
+        fcds: DatastoreFcds = self._datastore_fcds(datastore._moId)
+        with fcds.lock:
+            self._refresh(datastore, fcds, full)
+
+    def _refresh(self, datastore: Any, fcds: DatastoreFcds, full: bool) -> None:
+        storage: Any = self.storage
+        ids: list[Any] = storage.ListVStorageObject(datastore) or []
+        current: set[str] = {fcd_id.id for fcd_id in ids}
+        objects: dict[str, Any] = {} if full else {
+            fcd_id: fcd for fcd_id, fcd in fcds.objects.items() if fcd_id in current
+        }
+        new_ids: list[Any] = [fcd_id for fcd_id in ids if fcd_id.id not in objects]
+        kept: set[str] = set(objects)
+        if new_ids:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(new_ids))) as executor:
+                for fcd in executor.map(lambda fcd_id: storage.RetrieveVStorageObject(fcd_id, datastore), new_ids):
+                    objects[fcd.config.id.id] = fcd
+
+        fcds.objects = objects
+        fcds.names = {fcd.config.name: fcd_id for fcd_id, fcd in objects.items()}
+        # 重新获取配置的FCD同时丢弃快照缓存，其快照可能已被删除或重建
+        fcds.snapshots = {
+            fcd_id: snapshots for fcd_id, snapshots in fcds.snapshots.items() if fcd_id in kept
+        }
+        now: float = time.monotonic()
+        fcds.refresh_time = now
+        if full:
+            fcds.full_refresh_time = now
+
+    def _ensure_fresh(
+        self,
+        datastore: Any,
+        fcds: DatastoreFcds,
+        max_age: Optional[int] = None,
+        full_max_age: Optional[int] = None
+    ) -> None:
+        """超过full_max_age(默认为全量刷新间隔)时全量刷新，超过max_age(默认为ttl)时增量刷新，调用方需持有fcds.lock"""
+        if is_expired(fcds.full_refresh_time, self.full_refresh_interval if full_max_age is None else full_max_age):
+            self._refresh(datastore, fcds, full=True)
+        elif is_expired(fcds.refresh_time, self.ttl if max_age is None else max_age):
+            self._refresh(datastore, fcds, full=False)
+
+    def list_fcds(self, datastore: Any) -> list[dict[str, Any]]:
+        """获取存储上的所有FCD
+
+        Args:
+            datastore: 存储对象或存储MOID
+
+        Returns:
+            list[dict[str, Any]]: FCD列表，按名称排序
+        """
+        datastore = self._datastore(datastore)
+        fcds: DatastoreFcds = self._datastore_fcds(datastore._moId)
+        with fcds.lock:
+            self._ensure_fresh(datastore, fcds)
+            objects: list[Any] = list(fcds.objects.values())
+        return sorted((self.layout_fcd(fcd) for fcd in objects), key=lambda fcd_info: fcd_info["name"])
+
+    def get_by_name(self, datastore: Any, name: str) -> Optional[Any]:
+        """按名称查找FCD，未命中时刷新一次后再查找
+
+        增量刷新不会重新获取已缓存FCD的配置，发现不了重命名，
+        因此未命中时距上次全量刷新超过MISS_FULL_REFRESH_INTERVAL秒则全量刷新，否则增量刷新
+
+        Args:
+            datastore: 存储对象或存储MOID
+            name: FCD名称
+
+        Returns:
+            Optional[Any]: VStorageObject，不存在时返回None
+        """
+        datastore = self._datastore(datastore)
+        fcds: DatastoreFcds = self._datastore_fcds(datastore._moId)
+        with fcds.lock:
+            self._ensure_fresh(datastore, fcds)
+            fcd_id: Optional[str] = fcds.names.get(name)
+            if fcd_id is None:
+                self._ensure_fresh(
+                    datastore,
+                    fcds,
+                    max_age=self.MISS_REFRESH_INTERVAL,
+                    full_max_age=self.MISS_FULL_REFRESH_INTERVAL)
+                fcd_id = fcds.names.get(name)
+            return fcds.objects.get(fcd_id) if fcd_id is not None else None
+
+    def get_by_id(self, datastore: Any, fcd_id: str) -> Optional[Any]:
+        """按ID查找FCD，未命中时增量刷新一次后再查找
+
+        Args:
+            datastore: 存储对象或存储MOID
+            fcd_id: FCD ID
+
+        Returns:
+            Optional[Any]: VStorageObject，不存在时返回None
+        """
+        datastore = self._datastore(datastore)
+        fcds: DatastoreFcds = self._datastore_fcds(datastore._moId)
+        with fcds.lock:
+            self._ensure_fresh(datastore, fcds)
+            if fcd_id not in fcds.objects:
+                self._ensure_fresh(datastore, fcds, max_age=self.MISS_REFRESH_INTERVAL)
+            return fcds.objects.get(fcd_id)
+
+    def get_snapshot_id(self, datastore: Any, fcd: Any, description: str) -> Optional[Any]:
+        """按描述查找FCD快照，每个FCD的快照列表只调用一次RetrieveSnapshotInfo，未命中时重新获取
+
+        Args:
+            datastore: 存储对象或存储MOID
+            fcd: VStorageObject
+            description: 快照描述
+
+        Returns:
+            Optional[Any]: 快照ID，不存在时返回None
+        """
+        datastore = self._datastore(datastore)
+        fcds: DatastoreFcds = self._datastore_fcds(datastore._moId)
+        fcd_id: str = fcd.config.id.id
+        with fcds.lock:
+            snapshots: Optional[dict[str, Any]] = fcds.snapshots.get(fcd_id)
+            if snapshots is None or description not in snapshots:
+                snapshot_info: Any = self.storage.RetrieveSnapshotInfo(fcd.config.id, datastore)
+                snapshots = {snapshot.description: snapshot.id for snapshot in snapshot_info.snapshots}
+                fcds.snapshots[fcd_id] = snapshots
+            return snapshots.get(description)
+
+    def invalidate(self, datastore_moid: Optional[str] = None) -> None:
+        """清除缓存，下次访问时全量刷新
+
+        Args:
+            datastore_moid: 存储MOID，为空时清除所有存储
+        """
+        with self._lock:
+            if datastore_moid is None:
+                self._datastores = {}
+            else:
+                self._datastores.pop(datastore_moid, None)
@@ -1,13 +1,26 @@
 # -*- coding: utf-8 -*-
 
 import ssl
-import time
-from typing import Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
 
 from enum import Enum
 
-from .tools import service_instance, pchelper, tasks
+from .tools import service_instance, pchelper, pbmhelper, tasks
+from .inventory import Inventory
+from .performance import Performance, REALTIME_INTERVAL_ID
+from .capacity import Capacity
+from .events import EventFeed
+from .alarms import Alarms
+from .fcd import FcdCatalog
+from .datastores import Datastores
+from .networks import NetworkTopology
+from .snapshots import Snapshots
+from .deploy import Deployments
+from .bulk import BulkTaskRunner, Complete
+from .scheduler import AdmissionKey, AdmissionScheduler, OperationPriority
 from pyVmomi import vim
+from app.core.logger import logger
 
 
 class PlatformVmOperationType(Enum):
@@ -19,6 +32,12 @@ class PlatformVmOperationType(Enum):
     SHUTDOWN = "shutdown"       # 关闭操作系统
 
 
+# PowerOnMultiVM_Task单次提交的虚拟机数量
+MULTI_POWERON_BATCH_SIZE: int = 200
+
+# 等待客户机开始重启的超时时间，单位秒，不使用关闭操作系统的超时时间
+REBOOT_START_TIMEOUT: int = 60
+
 # 忽略ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
@@ -29,8 +48,26 @@ class VMwareVSphereInterface(object):
     def __init__(self, account: dict[str, Any]) -> None:
         self.account: dict[str, Any] = account
         self.account["timeout"] = 200
+        # 重启/关闭操作系统后等待状态变化的超时时间，单位秒
+        self.guest_operation_timeout: int = int(account.get("guest_operation_timeout") or 300)
         self._si: Optional[Any] = None
         self._content: Optional[Any] = None
+        self._task_monitor: Optional[tasks.TaskMonitor] = None
+        self._inventory: Optional[Inventory] = None
+        self._performance: Optional[Performance] = None
+        self._capacity: Optional[Capacity] = None
+        self._events: Optional[EventFeed] = None
+        self._alarms: Optional[Alarms] = None
+        self._fcds: Optional[FcdCatalog] = None
+        self._datastores: Optional[Datastores] = None
+        self._network_topology: Optional[NetworkTopology] = None
+        self._snapshots: Optional[Snapshots] = None
+        self._deployments: Optional[Deployments] = None
+        self._pbm_si: Optional[Any] = None
+        self._pbm_content: Optional[Any] = None
+        self._storage_policies: Optional[pbmhelper.StoragePolicyCache] = None
+        # 按主机、集群、存储限制变更操作的并发数
+        self.scheduler: AdmissionScheduler = AdmissionScheduler(account.get("admission_limits") or {})
 
     @property
     def si(self) -> Any:
@@ -44,6 +81,129 @@ class VMwareVSphereInterface(object):
             self._content = self.si.RetrieveContent()
         return self._content
 
+    @property
+    def task_monitor(self) -> tasks.TaskMonitor:
+        """共享的任务监视器，所有vCenter任务通过同一个过滤器等待完成"""
+        if self._task_monitor is None:
+            self._task_monitor = tasks.TaskMonitor(self.si)
+        return self._task_monitor
+
+    @property
+    def inventory(self) -> Inventory:
+        """清单缓存，提供虚拟机到主机、集群、存储的映射"""
+        if self._inventory is None:
+            self._inventory = Inventory(self)
+        return self._inventory
+
+    @property
+    def performance(self) -> Performance:
+        """性能数据查询，按vCenter的单次查询上限拆分批次并发执行"""
+        if self._performance is None:
+            self._performance = Performance(self, **(self.account.get("metrics") or {}))
+        return self._performance
+
+    @property
+    def capacity(self) -> Capacity:
+        """容量统计，按列缓存虚拟机和主机的容量属性"""
+        if self._capacity is None:
+            self._capacity = Capacity(self)
+        return self._capacity
+
+    @property
+    def events(self) -> EventFeed:
+        """事件增量读取，维持一个长期存在的事件收集器"""
+        if self._events is None:
+            self._events = EventFeed(self, **(self.account.get("events") or {}))
+        return self._events
+
+    @property
+    def alarms(self) -> Alarms:
+        """告警查询，缓存告警定义"""
+        if self._alarms is None:
+            self._alarms = Alarms(self, **(self.account.get("alarms") or {}))
+        return self._alarms
+
+    @property
+    def fcds(self) -> FcdCatalog:
+        """First Class Disk目录，按存储缓存名称和ID索引"""
+        if self._fcds is None:
+            self._fcds = FcdCatalog(self)
+        return self._fcds
+
+    @property
+    def datastores(self) -> Datastores:
+        """存储清单，一次收集所有存储的容量、主机挂载和虚拟机列表"""
+        if self._datastores is None:
+            self._datastores = Datastores(self)
+        return self._datastores
+
+    @property
+    def network_topology(self) -> NetworkTopology:
+        """网络拓扑，预先计算VLAN、网络、主机和虚拟机之间的邻接关系"""
+        if self._network_topology is None:
+            self._network_topology = NetworkTopology(self)
+        return self._network_topology
+
+    @property
+    def snapshots(self) -> Snapshots:
+        """快照报告，分页收集所有虚拟机的快照树"""
+        if self._snapshots is None:
+            self._snapshots = Snapshots(self, **(self.account.get("snapshots") or {}))
+        return self._snapshots
+
+    @property
+    def deployments(self) -> Deployments:
+        """模板部署，按主机和存储限制并发克隆，任务状态持久化后可以继续部署"""
+        if self._deployments is None:
+            self._deployments = Deployments(self, **(self.account.get("deploy") or {}))
+        return self._deployments
+
+    @property
+    def pbm_content(self) -> Any:
+        """存储策略服务内容，PBM会话与vCenter会话绑定并在线程间共享，vCenter会话变化后重建"""
+        pbm_si: Any = pbmhelper.get_pbm_session(self.si._stub)
+        if pbm_si is not self._pbm_si:
+            self._pbm_content = pbm_si.RetrieveContent()
+            self._pbm_si = pbm_si
+        return self._pbm_content
+
+    def call_pbm(self, call: Callable[[Any], Any]) -> Any:
+        """以存储策略服务内容调用call
+
+        PBM会话使用vCenter会话认证，vCenter会话空闲超时后返回NotAuthenticated，
+        此时重新登录vCenter并重建PBM会话，再重试一次
+        """
+        try:
+            return call(self.pbm_content)
+        except vim.fault.NotAuthenticated:
+            logger.warning("存储策略服务会话已过期，重新登录后重试")
+            self._si = None
+            self._content = None
+            self._pbm_si = None
+            return call(self.pbm_content)
+
+    @property
+    def storage_policies(self) -> pbmhelper.StoragePolicyCache:
+        """存储策略缓存，按名称索引"""
+        if self._storage_policies is None:
+            self._storage_policies = pbmhelper.StoragePolicyCache(**(self.account.get("storage_policies") or {}))
+        return self._storage_policies
+
+    def get_storage_policy(self, policy_name: str) -> Optional[Any]:
+        """按名称获取存储策略，不存在时返回None"""
+        return self.call_pbm(lambda pbm_content: self.storage_policies.get(pbm_content, policy_name))
+
+    @staticmethod
+    def layout_storage_policy(profile: Any) -> dict[str, Any]:
+        """将存储策略整理为可序列化的字典"""
+        return {
+            "id": profile.profileId.uniqueId,
+            "name": profile.name,
+            "description": profile.description or "",
+            "category": profile.profileCategory or "",
+            "last_updated_time": profile.lastUpdatedTime.strftime("%Y-%m-%dT%H:%M:%SZ") if profile.lastUpdatedTime else "",
+        }
+
     @property
     def version(self) -> str:
         return self.content.about.version
@@ -135,47 +295,252 @@ class VMwareVSphereInterface(object):
         vm_obj: Optional[Any] = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
         return vm_obj.AcquireTicket('webmks')
 
-    def update_vm_by_uuid(self, vm_uuid: str, vm_info: dict[str, Any]) -> Optional[Any]:
-        """通过UUID修改单个虚拟机对象"""
-        vm_obj: Optional[Any] = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+    def update_vm_by_uuid(
+        self,
+        vm_uuid: str,
+        vm_info: dict[str, Any],
+        vm_obj: Optional[Any] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        priority: OperationPriority = OperationPriority.INTERACTIVE,
+    ) -> Optional[Any]:
+        """通过UUID修改单个虚拟机对象
+
+        on_progress用于接收vCenter任务进度(0-100)；
+        操作在准入控制的名额内执行
+        """
+        if vm_obj is None:
+            vm_obj = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
         vm_note: Optional[str] = vm_info.get("vm_note")
         vm_name: Optional[str] = vm_info.get("vm_name")
         spec: vim.vm.ConfigSpec = vim.vm.ConfigSpec()
-        spec.annotation = vm_note or ""
+        # 未传备注时不修改，空字符串表示清空备注
+        if vm_note is not None:
+            spec.annotation = vm_note
         if vm_name:
             spec.name = vm_name
-        task: Any = vm_obj.ReconfigVM_Task(spec)
-        tasks.wait_for_tasks(self.si, [task])
+        with self.scheduler.admit(self.get_vm_admission_keys(vm_uuid), priority):
+            task: Any = vm_obj.ReconfigVM_Task(spec)
+            self.task_monitor.wait([task], on_progress=on_progress)
         return None
 
-    def operate_vm_by_uuid(self, vm_uuid: str, operation: str) -> Optional[Any]:
-        """通过UUID操作单个虚拟机对象"""
-        vm_obj: Optional[Any] = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+    def get_vm_admission_keys(self, vm_uuid: str) -> list[AdmissionKey]:
+        """根据清单中的放置信息获取虚拟机的准入键"""
+        if not self.scheduler.limits:
+            return []
+        placement: Optional[dict[str, Any]] = self.inventory.get_vm_placement(vm_uuid)
+        if not placement:
+            return []
+        keys: list[AdmissionKey] = [("datastore", ds_moid) for ds_moid in placement["datastores"]]
+        if placement["host"]:
+            keys.append(("host", placement["host"]))
+        if placement["cluster"]:
+            keys.append(("cluster", placement["cluster"]))
+        return keys
+
+    def operate_vm_by_uuid(
+        self,
+        vm_uuid: str,
+        operation: str,
+        vm_obj: Optional[Any] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        priority: OperationPriority = OperationPriority.INTERACTIVE,
+    ) -> Optional[Any]:
+        """通过UUID操作单个虚拟机对象
 
+        调用方已经解析出虚拟机对象时可通过vm_obj传入，避免重复FindByUuid；
+        on_progress用于接收vCenter任务进度(0-100)；
+        操作在准入控制的名额内执行
+        """
+        if vm_obj is None:
+            vm_obj = self.content.searchIndex.FindByUuid(None, vm_uuid, True)
+
+        with self.scheduler.admit(self.get_vm_admission_keys(vm_uuid), priority):
+            return self._operate_vm(vm_obj, operation, on_progress)
+
+    def _operate_vm(
+        self,
+        vm_obj: Any,
+        operation: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[Any]:
+        """执行虚拟机操作并等待完成"""
         if operation == PlatformVmOperationType.POWEROFF.value:
             # vm_obj.PowerOff()
             task: Any = vm_obj.PowerOffVM_Task()
-            tasks.wait_for_tasks(self.si, [task])
+            self.task_monitor.wait([task], on_progress=on_progress)
 
         if operation == PlatformVmOperationType.POWERON.value:
             # vm_obj.PowerOn()
             task = vm_obj.PowerOnVM_Task()
-            tasks.wait_for_tasks(self.si, [task])
+            self.task_monitor.wait([task], on_progress=on_progress)
 
         if operation == PlatformVmOperationType.SUSPEND.value:
             # vm_obj.Suspend()
             task = vm_obj.SuspendVM_Task()
-            tasks.wait_for_tasks(self.si, [task])
+            self.task_monitor.wait([task], on_progress=on_progress)
 
         if operation == PlatformVmOperationType.REBOOT.value:
             vm_obj.RebootGuest()
-            time.sleep(10)
+            # 操作系统开始重启后客户机状态会离开running或心跳离开green状态；
+            # 重启很快时状态可能在两次属性更新之间恢复而观察不到，RebootGuest已被接受，
+            # 在较短的超时内没有观察到时记录警告并视为成功
+            try:
+                self.wait_for_vm_state(
+                    vm_obj,
+                    lambda props: props.get("guest.guestState") not in (None, "running")
+                    or props.get("guest.guestHeartbeatStatus") not in (None, vim.ManagedEntity.Status.green),
+                    timeout=REBOOT_START_TIMEOUT,
+                    path_set=["guest.guestState", "guest.guestHeartbeatStatus"])
+            except TimeoutError:
+                logger.warning(f"虚拟机{vm_obj._moId}在{REBOOT_START_TIMEOUT}秒内未观察到重启，按重启已完成处理")
 
         if operation == PlatformVmOperationType.SHUTDOWN.value:
             vm_obj.ShutdownGuest()
-            time.sleep(10)
+            self.wait_for_vm_state(
+                vm_obj, lambda props: props.get("runtime.powerState") == vim.VirtualMachine.PowerState.poweredOff)
         return None
 
+    def wait_for_vm_state(
+        self,
+        vm_obj: Any,
+        condition: Callable[[dict[str, Any]], bool],
+        timeout: Optional[int] = None,
+        path_set: Optional[list[str]] = None,
+    ) -> dict[str, Any]:
+        """等待虚拟机电源状态或心跳状态满足条件
+
+        通过属性收集器订阅path_set(默认为runtime.powerState和guest.guestHeartbeatStatus)的变化，
+        观察到目标状态即返回，超时抛出TimeoutError
+        """
+        return pchelper.wait_for_properties(
+            self.si,
+            vm_obj,
+            path_set or ["runtime.powerState", "guest.guestHeartbeatStatus"],
+            condition,
+            timeout or self.guest_operation_timeout)
+
+    def get_vm_objs_by_uuids(self, vm_uuids: list[str], dc_obj: Optional[Any] = None) -> dict[str, Any]:
+        """通过一次属性收集批量解析虚拟机UUID到虚拟机对象的映射
+
+        传入数据中心时只收集该数据中心虚拟机文件夹下的虚拟机
+        """
+        wanted: set[str] = set(vm_uuids)
+        view_ref: Any = pchelper.get_container_view(
+            self.si, [vim.VirtualMachine], dc_obj.vmFolder if dc_obj is not None else None)
+        try:
+            vms_data: list[dict[str, Any]] = pchelper.collect_properties(
+                self.si,
+                view_ref=view_ref,
+                obj_type=vim.VirtualMachine,
+                path_set=["summary.config.uuid"],
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+        return {
+            vm_data["summary.config.uuid"]: vm_data["obj"]
+            for vm_data in vms_data
+            if vm_data.get("summary.config.uuid") in wanted
+        }
+
+    def operate_vms_by_uuids(
+        self,
+        dc_moid: str,
+        vm_uuids: list[str],
+        operation: str,
+        max_workers: int = 32,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict[str, dict[str, str]]:
+        """通过UUID批量操作虚拟机
+
+        开机通过数据中心的PowerOnMultiVM_Task分批提交，其余操作以有限并发逐台执行，
+        均以批量优先级经过准入控制
+
+        Returns:
+            dict[str, dict[str, str]]: 每台虚拟机的操作结果，result为success或error
+        """
+        results: dict[str, dict[str, str]] = {}
+        total: int = len(vm_uuids) or 1
+
+        def finish(vm_uuid: str, error: Optional[Any] = None) -> None:
+            if error is None:
+                results[vm_uuid] = {"result": "success", "error": ""}
+            else:
+                results[vm_uuid] = {"result": "error", "error": getattr(error, "msg", None) or str(error)}
+            if on_progress:
+                on_progress(int(len(results) * 100 / total))
+
+        dc_obj: Optional[Any] = self.get_datacenter_by_moid(dc_moid)
+        if dc_obj is None:
+            raise RuntimeError("Datacenter " + dc_moid + " not found.")
+        vm_objs: dict[str, Any] = self.get_vm_objs_by_uuids(vm_uuids, dc_obj)
+        for vm_uuid in vm_uuids:
+            if vm_uuid not in vm_objs:
+                finish(vm_uuid, "虚拟机不存在")
+
+        if operation == PlatformVmOperationType.POWERON.value:
+            self._power_on_multi_vm(dc_obj, vm_objs, finish)
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vmware-bulk") as executor:
+            futures: dict[Future, str] = {
+                executor.submit(self.operate_vm_by_uuid, vm_uuid, operation, vm_obj,
+                                priority=OperationPriority.BULK): vm_uuid
+                for vm_uuid, vm_obj in vm_objs.items()
+            }
+            for future in as_completed(futures):
+                finish(futures[future], future.exception())
+        return results
+
+    def _power_on_multi_vm(self, dc_obj: Any, vm_objs: dict[str, Any], finish: Callable[..., None]) -> None:
+        """通过PowerOnMultiVM_Task批量开机，并等待每台虚拟机的开机任务
+
+        每台虚拟机先申请批量优先级的准入名额，获得名额的虚拟机凑批提交，
+        开机任务结束后释放名额，再放行排队中的虚拟机
+        """
+        BulkTaskRunner(self).run_batches(
+            {vm_uuid: ([], self.get_vm_admission_keys(vm_uuid)) for vm_uuid in vm_objs},
+            lambda vm_uuids, complete: self._submit_power_on_batch(dc_obj, vm_objs, vm_uuids, complete),
+            lambda vm_uuid, result, error: finish(vm_uuid, error),
+            batch_size=MULTI_POWERON_BATCH_SIZE)
+
+    def _submit_power_on_batch(
+        self,
+        dc_obj: Any,
+        vm_objs: dict[str, Any],
+        vm_uuids: list[str],
+        complete: Complete,
+    ) -> None:
+        """提交一批PowerOnMultiVM_Task，每台虚拟机的开机任务结束时调用complete"""
+        uuid_by_moid: dict[str, str] = {vm_objs[vm_uuid]._moId: vm_uuid for vm_uuid in vm_uuids}
+        handled: set[str] = set()
+
+        def on_batch_done(batch_future: Future) -> None:
+            try:
+                power_on_result: Any = batch_future.result()
+                for not_attempted in power_on_result.notAttempted:
+                    vm_uuid: str = uuid_by_moid[not_attempted.vm._moId]
+                    handled.add(vm_uuid)
+                    complete(vm_uuid, None, not_attempted.fault)
+                for attempted in power_on_result.attempted:
+                    vm_uuid = uuid_by_moid[attempted.vm._moId]
+                    handled.add(vm_uuid)
+                    if attempted.task is None:
+                        complete(vm_uuid, None, None)
+                    else:
+                        self.task_monitor.watch(
+                            attempted.task,
+                            callback=lambda future, vm_uuid=vm_uuid: complete(vm_uuid, None, future.exception()))
+                error: Any = "开机未被执行"
+            except Exception as e:
+                error = e
+            # DRS手动模式下只返回推荐，未执行开机
+            for vm_uuid in vm_uuids:
+                if vm_uuid not in handled:
+                    complete(vm_uuid, None, error)
+
+        task: Any = dc_obj.PowerOnMultiVM_Task(vm=[vm_objs[vm_uuid] for vm_uuid in vm_uuids])
+        self.task_monitor.watch(task, callback=on_batch_done)
+
     def get_cluster_vms(self, cluster_name: str, vm_properties: Optional[list[str]] = None) -> list[dict[str, Any]]:
         """获取平台中某一个集群里所有的虚拟机"""
         cluster_obj: Optional[Any] = self.get_cluster_by_name(cluster_name)
@@ -218,7 +583,19 @@ class VMwareVSphereInterface(object):
             vm_properties.append("config.createDate")
         return vm_properties
 
-    def layout_dict_vm_data(self, vm_data: dict[str, Any]) -> Optional[dict[str, Any]]:
+    def layout_dict_vm_data(
+        self,
+        vm_data: dict[str, Any],
+        folder_paths: Optional[dict[str, str]] = None,
+        host_names: Optional[dict[str, str]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """整理虚拟机属性
+
+        Args:
+            vm_data: collect_properties收集的虚拟机属性
+            folder_paths: 文件夹MOID到路径的映射，传入时不再逐级访问父文件夹
+            host_names: 主机MOID到名称的映射，传入时不再逐个访问主机名称
+        """
         vm_obj: Any = vm_data["obj"]
 
         # todo: 着力于优化此项目，提升速度
@@ -244,7 +621,11 @@ class VMwareVSphereInterface(object):
             layout_data["create_time"] = ""
 
         # 所属目录
-        layout_data["folder"] = self.parse_obj_path(vm_data["parent"], "")
+        parent_obj: Any = vm_data["parent"]
+        if folder_paths is not None and parent_obj._moId in folder_paths:
+            layout_data["folder"] = folder_paths[parent_obj._moId]
+        else:
+            layout_data["folder"] = self.parse_obj_path(parent_obj, "")
 
         # 操作系统
         layout_data["os_type"] = self.parse_vm_type(
@@ -255,8 +636,7 @@ class VMwareVSphereInterface(object):
         layout_data["cpu"] = vm_data["config.hardware.numCPU"]
         layout_data["memory"] = vm_data["config.hardware.memoryMB"]
 
-        # TODO: vm_obj.guest.ipAddress是否可以改为vm_data["guest.ipAddress"]
-        layout_data["nic"] = [{"ip": vm_obj.guest.ipAddress or ""}]
+        layout_data["nic"] = [{"ip": vm_data.get("guest.ipAddress") or ""}]
 
         # 磁盘
         if vm_data.get("config.hardware.device"):
@@ -276,10 +656,53 @@ class VMwareVSphereInterface(object):
 
         # 主机
         if vm_data.get("summary.runtime.host"):
-            layout_data["host"] = vm_data["summary.runtime.host"].name
+            host_obj: Any = vm_data["summary.runtime.host"]
+            if host_names is not None and host_obj._moId in host_names:
+                layout_data["host"] = host_names[host_obj._moId]
+            else:
+                layout_data["host"] = host_obj.name
 
         return layout_data
 
+    def get_folder_paths(self) -> dict[str, str]:
+        """一次收集所有文件夹，计算每个文件夹的路径，结果与parse_obj_path一致
+
+        Returns:
+            dict[str, str]: 文件夹MOID到路径的映射
+        """
+        view_ref: Any = pchelper.get_container_view(self.si, [vim.Folder])
+        try:
+            folders: dict[str, dict[str, Any]] = {
+                folder_data["obj"]._moId: folder_data
+                for folder_data in pchelper.collect_properties(
+                    self.si, view_ref=view_ref, obj_type=vim.Folder,
+                    path_set=["name", "parent"], include_mors=True)
+            }
+        finally:
+            view_ref.Destroy()
+
+        paths: dict[str, str] = {}
+
+        def folder_path(folder_moid: str) -> Optional[str]:
+            if folder_moid in paths:
+                return paths[folder_moid]
+            folder_data: Optional[dict[str, Any]] = folders.get(folder_moid)
+            if folder_data is None:
+                return None
+            if folder_data.get("name") == "vm":
+                path: Optional[str] = ""
+            else:
+                parent_obj: Any = folder_data.get("parent")
+                parent_path: Optional[str] = folder_path(parent_obj._moId) if parent_obj is not None else None
+                path = None if parent_path is None else parent_path + folder_data.get("name", "") + "/"
+            if path is not None:
+                paths[folder_moid] = path
+            return path
+
+        for folder_moid in folders:
+            folder_path(folder_moid)
+        return paths
+
     def layout_obj_vm_data(self, vm_obj: Any) -> Optional[dict[str, Any]]:
         if isinstance(vm_obj, vim.VirtualApp):
             return None
@@ -350,9 +773,18 @@ class VMwareVSphereInterface(object):
         layout_data["disk"] = disk_list
         layout_data["nic"] = nic_list
 
-        # 存储
+        # 存储，优先从存储清单缓存读取，缓存中不存在时再读取存储的summary
         datastore_list: list[dict[str, Any]] = []
         for datastore_obj in vm_obj.datastore:
+            cached_info: Optional[dict[str, Any]] = self.datastores.get(datastore_obj._moId)
+            if cached_info is not None:
+                datastore_list.append({
+                    "name": cached_info["name"],
+                    "type": cached_info["type"],
+                    "total_size": cached_info["total_size"],
+                    "free_size": cached_info["free_size"],
+                })
+                continue
             datastore_info: dict[str, Any] = dict()
             datastore_info["name"] = datastore_obj.name
             datastore_info["type"] = datastore_obj.summary.type
@@ -367,11 +799,12 @@ class VMwareVSphereInterface(object):
             datastore_list.append(datastore_info)
         layout_data["datastore"] = datastore_list
 
-        # 网络
+        # 网络，优先从网络拓扑缓存读取名称
         network_list: list[dict[str, str]] = []
         for network_obj in vm_obj.network:
             network_info: dict[str, str] = dict()
-            network_info["name"] = network_obj.name
+            network_name: Optional[str] = self.network_topology.get_network_name(network_obj._moId)
+            network_info["name"] = network_name if network_name is not None else network_obj.name
             network_list.append(network_info)
         layout_data["network"] = network_list
 
@@ -437,32 +870,90 @@ class VMwareVSphereInterface(object):
         counterIds: list[int],
         instance: str,
         entity: Any,
+        interval_id: int = REALTIME_INTERVAL_ID,
     ) -> Optional[Any]:
 
-        perfManager: Any = self.content.perfManager
-        metricIds: list[Any] = [vim.PerformanceManager.MetricId(counterId=counterid,
-                                                     instance=instance) for counterid in counterIds]
-        query: Any = vim.PerformanceManager.QuerySpec(intervalId=20,
-                                                 entity=entity,
-                                                 metricId=metricIds,
-                                                 startTime=start_time,
-                                                 endTime=end_time)
         try:
-            perfResults: list[Any] = perfManager.QueryPerf(querySpec=[query])
-        except BaseException as e:
-            print("monitor api query error [%s]" % e)
+            perfResults: list[Any] = self.performance.query_entities(
+                [entity], counterIds, instance, start_time, end_time, interval_id)
+        except Exception as e:
+            logger.error(f"查询性能数据失败: {e}")
             return None
         else:
             if perfResults:
-                print("monitor api get perfResults [%s]" % perfResults)
                 return perfResults
             return False
     
     def get_counter_dict(self) -> dict[str, int]:
-        perfList: list[Any] = self.content.perfManager.perfCounter
-        counter_dict: dict[str, int] = {
-            "{}.{}.{}".format(counter.groupInfo.key, counter.nameInfo.key,
-                              counter.rollupType): counter.key
-            for counter in perfList
-        }
-        return counter_dict
+        return self.performance.get_counter_dict()
+
+    def get_perf_entities(
+        self,
+        vm_uuids: Optional[list[str]] = None,
+        host_moids: Optional[list[str]] = None,
+    ) -> tuple[dict[str, tuple[str, Any]], list[str]]:
+        """构建性能查询的实体引用
+
+        通过清单缓存校验实体是否存在，并把虚拟机UUID映射为MOID，
+        直接构造托管对象引用，不逐个访问vCenter
+
+        Returns:
+            tuple[dict[str, tuple[str, Any]], list[str]]: 实体MOID到(请求ID, 托管对象)的映射，以及不存在的实体ID
+        """
+        entities: dict[str, tuple[str, Any]] = {}
+        not_found: list[str] = []
+        for vm_uuid in vm_uuids or []:
+            placement: Optional[dict[str, Any]] = self.inventory.get_vm_placement(vm_uuid)
+            if placement is None:
+                not_found.append(vm_uuid)
+                continue
+            entities[placement["moid"]] = (vm_uuid, vim.VirtualMachine(placement["moid"], self.si._stub))
+        for host_moid in host_moids or []:
+            if self.inventory.get_host(host_moid) is None:
+                not_found.append(host_moid)
+                continue
+            entities[host_moid] = (host_moid, vim.HostSystem(host_moid, self.si._stub))
+        return entities, not_found
+
+    def query_perf_history(
+        self,
+        counter_ids: list[int],
+        start_time: Any,
+        end_time: Optional[Any],
+        interval_id: int,
+        vm_uuids: Optional[list[str]] = None,
+        host_moids: Optional[list[str]] = None,
+        include_host_vms: bool = False,
+    ) -> tuple[list[tuple[str, Any]], list[str]]:
+        """查询虚拟机和主机的历史性能数据
+
+        include_host_vms为True时每台主机用一次QueryPerfComposite同时取回主机及其上虚拟机的数据，
+        其余实体批量QueryPerf
+
+        Returns:
+            tuple[list[tuple[str, Any]], list[str]]: (实体ID, EntityMetric)列表，以及不存在的实体ID
+        """
+        entities, not_found = self.get_perf_entities(vm_uuids, host_moids)
+        entity_metrics: list[tuple[str, Any]] = []
+
+        if include_host_vms:
+            hosts: list[str] = [moid for moid in host_moids or [] if moid in entities]
+            if hosts:
+                host_objs: list[Any] = [entities.pop(moid)[1] for moid in hosts]
+                with ThreadPoolExecutor(max_workers=min(self.performance.max_workers, len(hosts)),
+                                        thread_name_prefix="vmware-perf") as executor:
+                    composites: list[tuple[Optional[Any], list[Any]]] = list(executor.map(
+                        lambda host_obj: self.performance.query_composite(
+                            host_obj, counter_ids, start_time, end_time, interval_id),
+                        host_objs))
+                for host_moid, (host_metric, child_metrics) in zip(hosts, composites):
+                    if host_metric is not None:
+                        entity_metrics.append((host_moid, host_metric))
+                    for child_metric in child_metrics:
+                        vm_moid: str = child_metric.entity._moId
+                        entity_metrics.append((self.inventory.get_vm_uuid(vm_moid) or vm_moid, child_metric))
+
+        results: list[Any] = self.performance.query_entities(
+            [entity for _, entity in entities.values()], counter_ids, "", start_time, end_time, interval_id)
+        entity_metrics += [(entities[result.entity._moId][0], result) for result in results]
+        return entity_metrics, not_found
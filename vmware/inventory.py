@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere清单缓存
+通过属性收集器批量拉取清单数据，按TTL整体刷新，避免逐个对象访问属性，
+刷新时同时生成存储、主机、网络到虚拟机的反向索引，用于影响分析
+"""
+
+from typing import Any, Optional
+
+from pyVmomi import vim
+
+from .cache import TtlCache
+from .tools import pchelper
+
+
+# 影响分析支持的实体类型
+IMPACT_ENTITY_TYPES: tuple[str, ...] = ("datastore", "host", "network")
+
+
+class Inventory(TtlCache):
+    """ VMware vSphere清单缓存类 """
+
+    # 虚拟机放置信息需要的属性
+    VM_PLACEMENT_PROPERTIES: list[str] = [
+        "summary.config.uuid",
+        "name",
+        "runtime.powerState",
+        "runtime.host",
+        "datastore",
+        "network",
+    ]
+
+    # 主机需要的属性
+    HOST_PROPERTIES: list[str] = [
+        "name",
+        "parent",
+        "runtime.connectionState",
+        "runtime.inMaintenanceMode",
+        "runtime.inQuarantineMode",
+    ]
+
+    def __init__(self, vi: Any, ttl: int = 60) -> None:
+        """初始化Inventory实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 缓存有效期，单位秒
+        """
+        super().__init__(ttl)
+        self.vi: Any = vi
+        # 虚拟机按MOID索引，导入或复制的虚拟机可能有相同的BIOS UUID
+        self._vms: dict[str, dict[str, Any]] = {}
+        self._hosts: dict[str, dict[str, Any]] = {}
+        self._vm_moids: dict[str, str] = {}
+        self._datastores: dict[str, str] = {}
+        self._networks: dict[str, str] = {}
+        # 实体类型到实体MOID到虚拟机MOID列表的反向索引
+        self._vm_indexes: dict[str, dict[str, list[str]]] = {
+            entity_type: {} for entity_type in IMPACT_ENTITY_TYPES
+        }
+
+    def _collect(self, obj_type: Any, path_set: list[str]) -> list[dict[str, Any]]:
+        """对指定类型的所有对象做一次属性收集"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [obj_type])
+        try:
+            return pchelper.collect_properties(
+                self.vi.si,
+                view_ref=view_ref,
+                obj_type=obj_type,
+                path_set=path_set,
+                include_mors=True)
+        finally:
+            view_ref.Destroy()
+
+    def refresh(self) -> None:
+        """重新拉取清单数据"""
+        hosts: dict[str, dict[str, Any]] = {}
+        for host_data in self._collect(vim.HostSystem, self.HOST_PROPERTIES):
+            parent: Any = host_data.get("parent")
+            hosts[host_data["obj"]._moId] = {
+                "name": host_data.get("name", ""),
+                # 独立主机的parent是ComputeResource，不计入集群
+                "cluster": parent._moId if isinstance(parent, vim.ClusterComputeResource) else None,
+                "connection_state": str(host_data.get("runtime.connectionState") or ""),
+                "in_maintenance_mode": bool(host_data.get("runtime.inMaintenanceMode")),
+                "in_quarantine_mode": bool(host_data.get("runtime.inQuarantineMode")),
+            }
+
+        vms: dict[str, dict[str, Any]] = {}
+        for vm_data in self._collect(vim.VirtualMachine, self.VM_PLACEMENT_PROPERTIES):
+            vm_uuid: Optional[str] = vm_data.get("summary.config.uuid")
+            if not vm_uuid:
+                continue
+            host_obj: Any = vm_data.get("runtime.host")
+            host_moid: Optional[str] = host_obj._moId if host_obj is not None else None
+            vms[vm_data["obj"]._moId] = {
+                "moid": vm_data["obj"]._moId,
+                "uuid": vm_uuid,
+                "name": vm_data.get("name", ""),
+                "power_state": str(vm_data.get("runtime.powerState") or ""),
+                "host": host_moid,
+                "cluster": hosts.get(host_moid, {}).get("cluster"),
+                "datastores": [ds_obj._moId for ds_obj in vm_data.get("datastore", [])],
+                "networks": [network_obj._moId for network_obj in vm_data.get("network", [])],
+            }
+
+        datastores: dict[str, str] = {
+            ds_data["obj"]._moId: ds_data.get("name", "") for ds_data in self._collect(vim.Datastore, ["name"])
+        }
+        networks: dict[str, str] = {
+            network_data["obj"]._moId: network_data.get("name", "")
+            for network_data in self._collect(vim.Network, ["name"])
+        }
+
+        vm_indexes: dict[str, dict[str, list[str]]] = {
+            "datastore": {ds_moid: [] for ds_moid in datastores},
+            "host": {host_moid: [] for host_moid in hosts},
+            "network": {network_moid: [] for network_moid in networks},
+        }
+        for vm_moid, vm in vms.items():
+            for ds_moid in vm["datastores"]:
+                vm_indexes["datastore"].setdefault(ds_moid, []).append(vm_moid)
+            if vm["host"] is not None:
+                vm_indexes["host"].setdefault(vm["host"], []).append(vm_moid)
+            for network_moid in vm["networks"]:
+                vm_indexes["network"].setdefault(network_moid, []).append(vm_moid)
+
+        self._hosts = hosts
+        self._datastores = datastores
+        self._networks = networks
+        self._vms = vms
+        self._vm_moids = {vm["uuid"]: vm_moid for vm_moid, vm in vms.items()}
+        self._vm_indexes = vm_indexes
+
+    def get_vm_placement(self, vm_uuid: str) -> Optional[dict[str, Any]]:
+        """获取虚拟机所在的主机、集群和存储
+
+        缓存中不存在时提前刷新一次，兼容新建的虚拟机
+
+        Returns:
+            Optional[dict[str, Any]]: 放置信息，虚拟机不存在时返回None
+        """
+        vm_moid: Optional[str] = self._lookup(lambda: self._vm_moids.get(vm_uuid))
+        return self._vms.get(vm_moid) if vm_moid is not None else None
+
+    def get_host(self, host_moid: str) -> Optional[dict[str, Any]]:
+        """获取主机名称、所在集群、连接状态和是否处于维护模式或隔离模式
+
+        Returns:
+            Optional[dict[str, Any]]: 主机信息，主机不存在时返回None
+        """
+        return self._lookup(lambda: self._hosts.get(host_moid))
+
+    def get_any_moid(self, entity_type: str) -> Optional[str]:
+        """获取指定类型的任一实体MOID，虚拟机只选择开机的虚拟机
+
+        关机的虚拟机和模板没有实时统计，不能用于查询可用计数器
+
+        Args:
+            entity_type: 实体类型，可选vm/host
+
+        Returns:
+            Optional[str]: 实体MOID，该类型没有符合条件的实体时返回None
+        """
+        self._ensure_fresh()
+        if entity_type == "vm":
+            return next((vm["moid"] for vm in self._vms.values() if vm["power_state"] == "poweredOn"), None)
+        return next(iter(self._hosts), None)
+
+    def list_perf_entities(self) -> dict[str, tuple[str, str]]:
+        """获取所有虚拟机和主机，用于批量采集性能数据
+
+        Returns:
+            dict[str, tuple[str, str]]: 实体MOID到(实体类型, 实体ID)的映射，
+                                        虚拟机的实体ID为UUID，主机的实体ID为MOID
+        """
+        self._ensure_fresh()
+        entities: dict[str, tuple[str, str]] = {
+            vm_moid: ("vm", vm["uuid"]) for vm_moid, vm in self._vms.items()
+        }
+        entities.update({host_moid: ("host", host_moid) for host_moid in self._hosts})
+        return entities
+
+    def get_vm_uuid(self, vm_moid: str) -> Optional[str]:
+        """根据虚拟机MOID获取UUID
+
+        Returns:
+            Optional[str]: 虚拟机UUID，虚拟机不在缓存中时返回None
+        """
+        self._ensure_fresh()
+        vm: Optional[dict[str, Any]] = self._vms.get(vm_moid)
+        return vm["uuid"] if vm is not None else None
+
+    def _entity_name(self, entity_type: str, entity_moid: str) -> Optional[str]:
+        if entity_type == "host":
+            host: Optional[dict[str, Any]] = self._hosts.get(entity_moid)
+            return host["name"] if host is not None else None
+        if entity_type == "datastore":
+            return self._datastores.get(entity_moid)
+        return self._networks.get(entity_moid)
+
+    def get_dependent_vms(self, entity_type: str, entity_moid: str) -> Optional[dict[str, Any]]:
+        """从反向索引获取存储、主机或网络上的虚拟机，用于维护前的影响分析
+
+        实体不在缓存中时提前刷新一次，兼容新建的实体
+
+        Args:
+            entity_type: 实体类型，可选datastore/host/network
+            entity_moid: 实体MOID
+
+        Returns:
+            Optional[dict[str, Any]]: 实体信息、虚拟机数量、开机的虚拟机数量和虚拟机列表，
+                                      实体不存在时返回None
+        """
+        if entity_type not in IMPACT_ENTITY_TYPES:
+            raise ValueError(f"不支持的实体类型: {entity_type}")
+        vm_moids: Optional[list[str]] = self._lookup(lambda: self._vm_indexes[entity_type].get(entity_moid))
+        if vm_moids is None:
+            return None
+
+        vms: dict[str, dict[str, Any]] = self._vms
+        dependent_vms: list[dict[str, Any]] = []
+        for vm_moid in vm_moids:
+            vm: Optional[dict[str, Any]] = vms.get(vm_moid)
+            if vm is None:
+                continue
+            dependent_vms.append({
+                "uuid": vm["uuid"],
+                "moid": vm["moid"],
+                "name": vm["name"],
+                "power_state": vm["power_state"],
+                "host": vm["host"],
+                "cluster": vm["cluster"],
+            })
+        return {
+            "entity": {
+                "type": entity_type,
+                "moid": entity_moid,
+                "name": self._entity_name(entity_type, entity_moid) or "",
+            },
+            "total": len(dependent_vms),
+            "powered_on": sum(1 for vm in dependent_vms if vm["power_state"] == "poweredOn"),
+            "vms": dependent_vms,
+        }
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere网络拓扑
+一次属性收集拉取所有网络、分布式端口组、分布式交换机及其连接的主机和虚拟机，
+刷新时预先计算VLAN到网络、网络到主机和虚拟机的邻接关系，查询时只访问本地缓存
+"""
+
+from typing import Any, Optional
+
+from pyVmomi import vim
+
+from .cache import TtlCache
+from .tools import pchelper
+
+
+# VLAN ID的取值范围
+VLAN_ID_MAX: int = 4094
+# 标准端口组的vlanId为4095时表示中继所有VLAN
+STANDARD_TRUNK_VLAN_ID: int = 4095
+
+
+class NetworkTopology(TtlCache):
+    """ VMware vSphere网络拓扑类 """
+
+    # 各类型对象需要的属性，分布式端口组同时匹配Network和DistributedVirtualPortgroup的属性
+    PATH_SETS: dict[Any, list[str]] = {
+        vim.Network: [
+            "name",
+            "summary.accessible",
+            "host",
+            "vm",
+        ],
+        vim.dvs.DistributedVirtualPortgroup: [
+            "config.distributedVirtualSwitch",
+            "config.defaultPortConfig",
+            "config.uplink",
+        ],
+        vim.DistributedVirtualSwitch: [
+            "name",
+            "uuid",
+            "summary.productInfo.version",
+            "summary.numPorts",
+            "summary.hostMember",
+        ],
+        vim.HostSystem: [
+            "name",
+            "config.network.portgroup",
+        ],
+        vim.VirtualMachine: [
+            "name",
+            "summary.config.uuid",
+        ],
+    }
+
+    def __init__(self, vi: Any, ttl: int = 60) -> None:
+        """初始化NetworkTopology实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            ttl: 缓存有效期，单位秒
+        """
+        super().__init__(ttl)
+        self.vi: Any = vi
+        self._networks: dict[str, dict[str, Any]] = {}
+        self._switches: dict[str, dict[str, Any]] = {}
+        self._hosts: dict[str, str] = {}
+        self._vms: dict[str, dict[str, Any]] = {}
+        # VLAN ID到网络MOID列表的邻接关系，不包括上行链路端口组
+        self._vlans: dict[int, list[str]] = {}
+
+    @staticmethod
+    def parse_dvs_vlan(port_config: Any) -> dict[str, Any]:
+        """解析分布式端口组默认端口配置中的VLAN
+
+        Returns:
+            dict[str, Any]: VLAN类型(none/vlan/trunk/pvlan)和VLAN ID范围
+        """
+        vlan_spec: Any = getattr(port_config, "vlan", None)
+        if isinstance(vlan_spec, vim.dvs.VmwareDistributedVirtualSwitch.VlanIdSpec):
+            if not vlan_spec.vlanId:
+                return {"type": "none", "ranges": []}
+            return {"type": "vlan", "ranges": [[vlan_spec.vlanId, vlan_spec.vlanId]]}
+        if isinstance(vlan_spec, vim.dvs.VmwareDistributedVirtualSwitch.TrunkVlanSpec):
+            return {"type": "trunk", "ranges": [[vlan_range.start, vlan_range.end] for vlan_range in vlan_spec.vlanId]}
+        if isinstance(vlan_spec, vim.dvs.VmwareDistributedVirtualSwitch.PvlanSpec):
+            return {"type": "pvlan", "ranges": [[vlan_spec.pvlanId, vlan_spec.pvlanId]]}
+        return {"type": "none", "ranges": []}
+
+    @staticmethod
+    def parse_standard_vlan(vlan_ids: set[int]) -> dict[str, Any]:
+        """合并标准端口组在各主机上的VLAN
+
+        Returns:
+            dict[str, Any]: VLAN类型(none/vlan/trunk)和VLAN ID范围
+        """
+        if STANDARD_TRUNK_VLAN_ID in vlan_ids:
+            return {"type": "trunk", "ranges": [[0, VLAN_ID_MAX]]}
+        ranges: list[list[int]] = [[vlan_id, vlan_id] for vlan_id in sorted(vlan_ids) if vlan_id]
+        return {"type": "vlan" if ranges else "none", "ranges": ranges}
+
+    def refresh(self) -> None:
+        """对网络、交换机、主机和虚拟机做一次属性收集，重新计算邻接关系"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, list(self.PATH_SETS))
+        try:
+            objects_data: list[dict[str, Any]] = pchelper.collect_multi_properties(
+                self.vi.si, view_ref, self.PATH_SETS)
+        finally:
+            view_ref.Destroy()
+
+        networks_data: list[dict[str, Any]] = []
+        switches_data: list[dict[str, Any]] = []
+        hosts: dict[str, str] = {}
+        vms: dict[str, dict[str, Any]] = {}
+        # 主机MOID到标准端口组名称到vlanId的映射
+        host_portgroups: dict[str, dict[str, int]] = {}
+        for obj_data in objects_data:
+            obj: Any = obj_data["obj"]
+            if isinstance(obj, vim.Network):
+                networks_data.append(obj_data)
+            elif isinstance(obj, vim.DistributedVirtualSwitch):
+                switches_data.append(obj_data)
+            elif isinstance(obj, vim.HostSystem):
+                hosts[obj._moId] = obj_data.get("name", "")
+                host_portgroups[obj._moId] = {
+                    portgroup.spec.name: portgroup.spec.vlanId
+                    for portgroup in obj_data.get("config.network.portgroup") or []
+                }
+            elif isinstance(obj, vim.VirtualMachine):
+                vms[obj._moId] = {
+                    "moid": obj._moId,
+                    "uuid": obj_data.get("summary.config.uuid") or "",
+                    "name": obj_data.get("name", ""),
+                }
+
+        networks: dict[str, dict[str, Any]] = {}
+        for network_data in networks_data:
+            network_obj: Any = network_data["obj"]
+            host_moids: list[str] = [host_obj._moId for host_obj in network_data.get("host") or []]
+            dvs_obj: Any = network_data.get("config.distributedVirtualSwitch")
+            if isinstance(network_obj, vim.dvs.DistributedVirtualPortgroup):
+                vlan: dict[str, Any] = self.parse_dvs_vlan(network_data.get("config.defaultPortConfig"))
+            elif isinstance(network_obj, vim.OpaqueNetwork):
+                vlan = {"type": "none", "ranges": []}
+            else:
+                name: str = network_data.get("name", "")
+                vlan = self.parse_standard_vlan({
+                    host_portgroups[host_moid][name] for host_moid in host_moids
+                    if name in host_portgroups.get(host_moid, {})
+                })
+            networks[network_obj._moId] = {
+                "moid": network_obj._moId,
+                "name": network_data.get("name", ""),
+                "type": type(network_obj).__name__.split(".")[-1],
+                "accessible": bool(network_data.get("summary.accessible")),
+                "dvs": dvs_obj._moId if dvs_obj is not None else None,
+                "uplink": bool(network_data.get("config.uplink")),
+                "vlan": vlan,
+                "hosts": host_moids,
+                "vms": [vm_obj._moId for vm_obj in network_data.get("vm") or []],
+            }
+
+        switches: dict[str, dict[str, Any]] = {}
+        for switch_data in switches_data:
+            switch_obj: Any = switch_data["obj"]
+            switches[switch_obj._moId] = {
+                "moid": switch_obj._moId,
+                "name": switch_data.get("name", ""),
+                "uuid": switch_data.get("uuid") or "",
+                "version": switch_data.get("summary.productInfo.version") or "",
+                "num_ports": switch_data.get("summary.numPorts") or 0,
+                "hosts": [host_obj._moId for host_obj in switch_data.get("summary.hostMember") or []],
+                "portgroups": [],
+            }
+        vlans: dict[int, list[str]] = {}
+        for network in networks.values():
+            if network["dvs"] in switches:
+                switches[network["dvs"]]["portgroups"].append(network["moid"])
+            if network["uplink"]:
+                continue
+            for start, end in network["vlan"]["ranges"]:
+                for vlan_id in range(max(start, 0), min(end, VLAN_ID_MAX) + 1):
+                    vlans.setdefault(vlan_id, []).append(network["moid"])
+
+        self._networks = networks
+        self._switches = switches
+        self._hosts = hosts
+        self._vms = vms
+        self._vlans = vlans
+
+    @staticmethod
+    def _summary(network: dict[str, Any]) -> dict[str, Any]:
+        """网络列表中的网络信息，主机和虚拟机只返回数量"""
+        summary: dict[str, Any] = {
+            key: value for key, value in network.items() if key not in ("hosts", "vms")
+        }
+        summary["host_count"] = len(network["hosts"])
+        summary["vm_count"] = len(network["vms"])
+        return summary
+
+    def list_networks(self) -> list[dict[str, Any]]:
+        """获取所有网络和分布式端口组
+
+        Returns:
+            list[dict[str, Any]]: 网络列表，按名称排序
+        """
+        self._ensure_fresh()
+        return sorted(
+            (self._summary(network) for network in self._networks.values()),
+            key=lambda network_info: network_info["name"])
+
+    def list_switches(self) -> list[dict[str, Any]]:
+        """获取所有分布式交换机
+
+        Returns:
+            list[dict[str, Any]]: 分布式交换机列表，按名称排序
+        """
+        self._ensure_fresh()
+        return sorted(self._switches.values(), key=lambda switch_info: switch_info["name"])
+
+    def get_network_name(self, network_moid: str) -> Optional[str]:
+        """获取网络名称，网络不在缓存中时返回None"""
+        self._ensure_fresh()
+        network: Optional[dict[str, Any]] = self._networks.get(network_moid)
+        return network["name"] if network is not None else None
+
+    def get_network(self, network_moid: str) -> Optional[dict[str, Any]]:
+        """获取网络详情，包括连接的主机和虚拟机
+
+        网络不在缓存中时提前刷新一次，兼容新建的网络
+
+        Args:
+            network_moid: 网络或分布式端口组MOID
+
+        Returns:
+            Optional[dict[str, Any]]: 网络详情，网络不存在时返回None
+        """
+        network: Optional[dict[str, Any]] = self._lookup(lambda: self._networks.get(network_moid))
+        if network is None:
+            return None
+        switch: Optional[dict[str, Any]] = self._switches.get(network["dvs"]) if network["dvs"] else None
+        return dict(
+            self._summary(network),
+            dvs={"moid": switch["moid"], "name": switch["name"]} if switch else None,
+            hosts=[{"moid": host_moid, "name": self._hosts.get(host_moid, "")} for host_moid in network["hosts"]],
+            vms=[self._vms.get(vm_moid, {"moid": vm_moid, "uuid": "", "name": ""}) for vm_moid in network["vms"]],
+        )
+
+    def get_vlan(self, vlan_id: int) -> dict[str, Any]:
+        """获取连接到VLAN的网络、主机和虚拟机，从预先计算的邻接关系读取
+
+        中继端口组计入其包含的每个VLAN，上行链路端口组不计入
+
+        Args:
+            vlan_id: VLAN ID
+
+        Returns:
+            dict[str, Any]: 网络、主机和虚拟机列表
+        """
+        self._ensure_fresh()
+        all_networks: dict[str, dict[str, Any]] = self._networks
+        networks: list[dict[str, Any]] = [
+            all_networks[network_moid] for network_moid in self._vlans.get(vlan_id, []) if network_moid in all_networks
+        ]
+        host_moids: dict[str, None] = {}
+        vm_moids: dict[str, None] = {}
+        for network in networks:
+            host_moids.update(dict.fromkeys(network["hosts"]))
+            vm_moids.update(dict.fromkeys(network["vms"]))
+        return {
+            "vlan_id": vlan_id,
+            "networks": [self._summary(network) for network in networks],
+            "hosts": [{"moid": host_moid, "name": self._hosts.get(host_moid, "")} for host_moid in host_moids],
+            "vms": [self._vms.get(vm_moid, {"moid": vm_moid, "uuid": "", "name": ""}) for vm_moid in vm_moids],
+        }
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere性能数据查询
+将多个实体、多个计数器打包为QuerySpec列表批量查询，并整理为紧凑的数组格式
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+from pyVmomi import vim
+
+
+# 实时统计的采样间隔，单位秒
+REALTIME_INTERVAL_ID: int = 20
+
+# vCenter保留实时统计的时长，单位秒
+REALTIME_RETENTION: int = 3600
+
+# 可查询可用计数器的实体类型
+PERF_ENTITY_TYPES: dict[str, Any] = {
+    "vm": vim.VirtualMachine,
+    "host": vim.HostSystem,
+}
+
+
+class Performance(object):
+    """ VMware vSphere性能数据查询类 """
+
+    def __init__(
+        self,
+        vi: Any,
+        max_query_metrics: int = 256,
+        max_workers: int = 8,
+        catalog_path: Optional[str] = None,
+    ) -> None:
+        """初始化Performance实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            max_query_metrics: 单次QueryPerf的指标数上限(实体数x计数器数)，
+                               不应超过vCenter的config.vpxd.stats.maxQueryMetrics
+            max_workers: 并发执行QueryPerf的最大线程数
+            catalog_path: 计数器目录的本地缓存文件，为空时只缓存在内存中
+        """
+        self.vi: Any = vi
+        self.max_query_metrics: int = max(int(max_query_metrics), 1)
+        self.max_workers: int = max(int(max_workers), 1)
+        self.catalog_path: Optional[str] = catalog_path
+        self._lock: threading.Lock = threading.Lock()
+        # 计数器目录，按vCenter实例UUID和版本区分
+        self._catalog_key: Optional[str] = None
+        self._catalog: list[dict[str, Any]] = []
+        self._counter_dict: dict[str, int] = {}
+        # 各实体类型可用的计数器ID
+        self._available_counters: dict[str, list[int]] = {}
+        # 已启用的历史统计间隔
+        self._historical_intervals: Optional[list[dict[str, int]]] = None
+
+    @property
+    def perf_manager(self) -> Any:
+        return self.vi.content.perfManager
+
+    @property
+    def catalog_key(self) -> str:
+        """计数器目录的缓存键，vCenter实例或版本变化时目录失效"""
+        about: Any = self.vi.content.about
+        return "{}:{}".format(about.instanceUuid, about.version)
+
+    @staticmethod
+    def layout_counter(counter: Any) -> dict[str, Any]:
+        """将PerfCounterInfo整理为可序列化的字典"""
+        return {
+            "key": counter.key,
+            "name": "{}.{}.{}".format(counter.groupInfo.key, counter.nameInfo.key, counter.rollupType),
+            "group": counter.groupInfo.key,
+            "counter": counter.nameInfo.key,
+            "rollup": str(counter.rollupType),
+            "unit": counter.unitInfo.key,
+            "stats_type": str(counter.statsType),
+            "level": counter.level,
+            "label": counter.nameInfo.label,
+            "description": counter.nameInfo.summary,
+        }
+
+    def _load_catalog_file(self, catalog_key: str) -> Optional[list[dict[str, Any]]]:
+        """从本地缓存文件读取计数器目录，缓存键不一致或文件损坏时返回None"""
+        if not self.catalog_path or not os.path.isfile(self.catalog_path):
+            return None
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                cache_data: dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache_data.get("key") != catalog_key:
+            return None
+        return cache_data.get("counters") or None
+
+    def _save_catalog_file(self, catalog_key: str, catalog: list[dict[str, Any]]) -> None:
+        """写入本地缓存文件，先写临时文件再替换，避免读到半个文件"""
+        if not self.catalog_path:
+            return
+        directory: str = os.path.dirname(self.catalog_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path: str = self.catalog_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": catalog_key, "counters": catalog}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.catalog_path)
+
+    def get_counter_catalog(self) -> list[dict[str, Any]]:
+        """获取计数器目录
+
+        依次使用内存缓存、本地缓存文件，都未命中时才下载perfManager.perfCounter
+
+        Returns:
+            list[dict[str, Any]]: 计数器列表
+        """
+        catalog_key: str = self.catalog_key
+        with self._lock:
+            if self._catalog_key != catalog_key:
+                catalog: Optional[list[dict[str, Any]]] = self._load_catalog_file(catalog_key)
+                if catalog is None:
+                    catalog = [self.layout_counter(counter) for counter in self.perf_manager.perfCounter]
+                    self._save_catalog_file(catalog_key, catalog)
+                self._catalog = catalog
+                self._counter_dict = {counter["name"]: counter["key"] for counter in catalog}
+                self._available_counters = {}
+                self._catalog_key = catalog_key
+            return self._catalog
+
+    def get_counter_dict(self) -> dict[str, int]:
+        """获取计数器名称到计数器ID的映射，名称格式为group.name.rollup"""
+        self.get_counter_catalog()
+        return self._counter_dict
+
+    def get_available_counter_ids(self, entity_type: str) -> list[int]:
+        """获取实体类型可用的计数器ID
+
+        同一类型实体的可用计数器基本一致，以该类型的任一开机实体做一次QueryAvailablePerfMetric，
+        非空结果按实体类型缓存
+
+        Args:
+            entity_type: 实体类型，可选vm/host
+
+        Returns:
+            list[int]: 计数器ID列表，该类型没有实体时返回空列表
+        """
+        self.get_counter_catalog()
+        counter_ids: Optional[list[int]] = self._available_counters.get(entity_type)
+        if counter_ids is not None:
+            return counter_ids
+
+        entity_moid: Optional[str] = self.vi.inventory.get_any_moid(entity_type)
+        if entity_moid is None:
+            return []
+        entity: Any = PERF_ENTITY_TYPES[entity_type](entity_moid, self.vi.si._stub)
+        metric_ids: list[Any] = self.perf_manager.QueryAvailablePerfMetric(
+            entity=entity, intervalId=REALTIME_INTERVAL_ID) or []
+        counter_ids = sorted({metric_id.counterId for metric_id in metric_ids})
+        # 空结果不缓存，实体可能刚好没有实时统计，下次换一个实体重新查询
+        if counter_ids:
+            self._available_counters[entity_type] = counter_ids
+        return counter_ids
+
+    def get_historical_intervals(self) -> list[dict[str, int]]:
+        """获取已启用的历史统计间隔，按采样间隔从小到大排序
+
+        默认为5分钟(保留1天)、30分钟(保留1周)、2小时(保留1个月)、1天(保留1年)
+
+        Returns:
+            list[dict[str, int]]: 采样间隔和保留时长，单位秒
+        """
+        if self._historical_intervals is None:
+            self._historical_intervals = sorted(
+                (
+                    {"sampling_period": interval.samplingPeriod, "length": interval.length}
+                    for interval in self.perf_manager.historicalInterval
+                    if interval.enabled
+                ),
+                key=lambda interval: interval["sampling_period"])
+        return self._historical_intervals
+
+    def select_interval(
+        self,
+        start_time: datetime,
+        resolution: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """根据查询范围选择采样间隔
+
+        在保留时长能覆盖开始时间的间隔中，选择不超过目标分辨率的最粗间隔，
+        没有不超过目标分辨率的间隔时选择最细的间隔
+
+        Args:
+            start_time: 开始时间
+            resolution: 目标分辨率，单位秒，为空时选择最细的间隔
+            now: 当前时间，默认为当前UTC时间
+
+        Returns:
+            int: 采样间隔，单位秒，即QuerySpec的intervalId
+        """
+        now = now or datetime.now(timezone.utc)
+        if start_time.tzinfo is None:
+            # 未指定时区的时间按UTC处理
+            start_time = start_time.replace(tzinfo=timezone.utc)
+        age: float = (now - start_time).total_seconds()
+        candidates: list[int] = [REALTIME_INTERVAL_ID] if age <= REALTIME_RETENTION else []
+        candidates += [
+            interval["sampling_period"] for interval in self.get_historical_intervals()
+            if interval["length"] >= age
+        ]
+        if not candidates:
+            # 超出所有间隔的保留时长，使用保留最久的间隔
+            intervals: list[dict[str, int]] = self.get_historical_intervals()
+            return max(intervals, key=lambda interval: interval["length"])["sampling_period"] \
+                if intervals else REALTIME_INTERVAL_ID
+        if resolution:
+            coarse: list[int] = [period for period in candidates if period <= resolution]
+            if coarse:
+                return max(coarse)
+        return min(candidates)
+
+    def query_composite(
+        self,
+        host: Any,
+        counter_ids: list[int],
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval_id: int = REALTIME_INTERVAL_ID,
+    ) -> tuple[Optional[Any], list[Any]]:
+        """用QueryPerfComposite一次查询主机及其上所有虚拟机
+
+        Args:
+            host: 主机对象
+            counter_ids: 计数器ID列表
+            start_time: 开始时间
+            end_time: 结束时间
+            interval_id: 采样间隔，单位秒
+
+        Returns:
+            tuple[Optional[Any], list[Any]]: 主机的EntityMetric和虚拟机的EntityMetric列表
+        """
+        query_spec: Any = self.build_query_spec(host, counter_ids, "", start_time, end_time, interval_id)
+        composite: Any = self.perf_manager.QueryPerfComposite(querySpec=query_spec)
+        return composite.entity, list(composite.childEntity or [])
+
+    @staticmethod
+    def build_query_spec(
+        entity: Any,
+        counter_ids: list[int],
+        instance: str = "",
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval_id: int = REALTIME_INTERVAL_ID,
+        max_sample: Optional[int] = None,
+    ) -> Any:
+        """构建单个实体的QuerySpec
+
+        Args:
+            entity: 虚拟机或主机对象
+            counter_ids: 计数器ID列表
+            instance: 实例名称，空字符串表示汇总值，*表示所有实例
+            start_time: 开始时间
+            end_time: 结束时间
+            interval_id: 采样间隔，单位秒
+            max_sample: 最多返回的采样点数量
+
+        Returns:
+            Any: vim.PerformanceManager.QuerySpec对象
+        """
+        metric_ids: list[Any] = [
+            vim.PerformanceManager.MetricId(counterId=counter_id, instance=instance)
+            for counter_id in counter_ids
+        ]
+        return vim.PerformanceManager.QuerySpec(
+            entity=entity,
+            metricId=metric_ids,
+            intervalId=interval_id,
+            startTime=start_time,
+            endTime=end_time,
+            maxSample=max_sample,
+            format="normal")
+
+    def split_query_specs(self, query_specs: list[Any]) -> list[list[Any]]:
+        """按单次查询的指标数上限拆分QuerySpec列表，每批至少包含一个QuerySpec"""
+        batches: list[list[Any]] = []
+        batch: list[Any] = []
+        metric_count: int = 0
+        for query_spec in query_specs:
+            spec_metrics: int = len(query_spec.metricId)
+            if batch and metric_count + spec_metrics > self.max_query_metrics:
+                batches.append(batch)
+                batch, metric_count = [], 0
+            batch.append(query_spec)
+            metric_count += spec_metrics
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def query(self, query_specs: list[Any]) -> list[Any]:
+        """批量执行QueryPerf
+
+        拆分后的各批次并发查询，结果按QuerySpec的顺序合并
+
+        Args:
+            query_specs: QuerySpec列表
+
+        Returns:
+            list[Any]: vim.PerformanceManager.EntityMetric列表
+        """
+        batches: list[list[Any]] = self.split_query_specs(query_specs)
+        if not batches:
+            return []
+        if len(batches) == 1:
+            return list(self.perf_manager.QueryPerf(querySpec=batches[0]) or [])
+
+        perf_manager: Any = self.perf_manager
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)),
+                                thread_name_prefix="vmware-perf") as executor:
+            batch_results: list[Any] = list(executor.map(
+                lambda batch: perf_manager.QueryPerf(querySpec=batch), batches))
+        return [entity_metric for results in batch_results for entity_metric in results or []]
+
+    def query_entities(
+        self,
+        entities: list[Any],
+        counter_ids: list[int],
+        instance: str = "",
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        interval_id: int = REALTIME_INTERVAL_ID,
+        max_sample: Optional[int] = None,
+    ) -> list[Any]:
+        """查询多个实体的同一组计数器
+
+        Returns:
+            list[Any]: vim.PerformanceManager.EntityMetric列表
+        """
+        query_specs: list[Any] = [
+            self.build_query_spec(entity, counter_ids, instance, start_time,
+                                  end_time, interval_id, max_sample)
+            for entity in entities
+        ]
+        return self.query(query_specs)
+
+    @staticmethod
+    def downsample(
+        timestamps: list[datetime],
+        series_values: list[list[int]],
+        resolution: int,
+    ) -> tuple[list[datetime], list[list[float]]]:
+        """按分辨率对齐时间桶并求平均值
+
+        vCenter以-1表示没有数据，不参与平均，整个时间桶都没有数据时仍为-1
+
+        Args:
+            timestamps: 采样时间
+            series_values: 每个序列的采样值
+            resolution: 分辨率，单位秒
+
+        Returns:
+            tuple[list[datetime], list[list[float]]]: 时间桶的开始时间和每个序列的平均值
+        """
+        if not timestamps:
+            return [], [[] for _ in series_values]
+        epochs: np.ndarray = np.asarray([timestamp.timestamp() for timestamp in timestamps], dtype=np.int64)
+        buckets, inverse = np.unique(epochs // resolution, return_inverse=True)
+        downsampled: list[list[float]] = []
+        for values in series_values:
+            samples: np.ndarray = np.asarray(values, dtype=np.float64)
+            valid: np.ndarray = samples >= 0
+            counts: np.ndarray = np.bincount(inverse, weights=valid, minlength=len(buckets))
+            sums: np.ndarray = np.bincount(inverse, weights=np.where(valid, samples, 0), minlength=len(buckets))
+            averages: np.ndarray = np.full(len(buckets), -1.0)
+            np.divide(sums, counts, out=averages, where=counts > 0)
+            downsampled.append(np.round(averages, 2).tolist())
+        bucket_times: list[datetime] = [
+            datetime.fromtimestamp(int(bucket) * resolution, timezone.utc) for bucket in buckets
+        ]
+        return bucket_times, downsampled
+
+    @classmethod
+    def layout_entity_metric(
+        cls,
+        entity_metric: Any,
+        counter_names: dict[int, str],
+        resolution: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """将EntityMetric整理为紧凑格式
+
+        Args:
+            entity_metric: vim.PerformanceManager.EntityMetric对象
+            counter_names: 计数器ID到计数器名称的映射
+            resolution: 降采样的分辨率，单位秒，为空或不大于采样间隔时不降采样
+
+        Returns:
+            dict[str, Any]: 时间戳数组和每个计数器实例的取值数组
+        """
+        interval: int = entity_metric.sampleInfo[0].interval if entity_metric.sampleInfo else 0
+        if resolution and resolution > interval:
+            timestamps, series_values = cls.downsample(
+                [sample_info.timestamp for sample_info in entity_metric.sampleInfo],
+                [list(series.value) for series in entity_metric.value],
+                resolution)
+            return {
+                "entity": entity_metric.entity._moId,
+                "interval": resolution,
+                "timestamps": [timestamp.strftime("%Y-%m-%dT%H:%M:%SZ") for timestamp in timestamps],
+                "series": [
+                    {
+                        "counter": counter_names.get(series.id.counterId, str(series.id.counterId)),
+                        "instance": series.id.instance,
+                        "values": values,
+                    }
+                    for series, values in zip(entity_metric.value, series_values)
+                ],
+            }
+        return {
+            "entity": entity_metric.entity._moId,
+            "interval": entity_metric.sampleInfo[0].interval if entity_metric.sampleInfo else 0,
+            "timestamps": [
+                sample_info.timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+                for sample_info in entity_metric.sampleInfo
+            ],
+            "series": [
+                {
+                    "counter": counter_names.get(series.id.counterId, str(series.id.counterId)),
+                    "instance": series.id.instance,
+                    "values": list(series.value),
+                }
+                for series in entity_metric.value
+            ],
+        }
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+变更操作准入控制
+按主机、集群、存储限制同时执行的变更操作数量，避免启动风暴
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Iterator, Optional
+
+
+class OperationPriority(Enum):
+    """变更操作的优先级，数值越小越优先"""
+    INTERACTIVE = 0     # 单台虚拟机的交互式操作
+    BULK = 1            # 批量操作
+
+
+# 准入键，例如("host", "host-10")
+AdmissionKey = tuple[str, str]
+
+
+class AdmissionScheduler(object):
+    """ 变更操作准入调度类
+
+    每个操作在执行前根据所在主机、集群、存储申请名额，名额已满时排队等待。
+    排队的操作按优先级和提交顺序放行，后来者或低优先级的操作不能越过
+    与其争用同一资源的等待者，因此批量任务不会饿死交互式操作
+    """
+
+    def __init__(self, limits: dict[str, int]) -> None:
+        """初始化AdmissionScheduler实例
+
+        Args:
+            limits: 各类资源的并发上限，例如{"host": 4, "cluster": 16, "datastore": 8}，
+                    0或未配置表示不限制
+        """
+        self.limits: dict[str, int] = {kind: limit for kind, limit in limits.items() if limit}
+        self._cond: threading.Condition = threading.Condition()
+        self._running: dict[AdmissionKey, int] = {}
+        self._waiting: list[tuple[int, int, tuple[AdmissionKey, ...]]] = []
+        self._seq: Iterator[int] = itertools.count()
+        self._polling: dict[OperationPriority, int] = {}
+
+    def _limited(self, keys: list[AdmissionKey]) -> tuple[AdmissionKey, ...]:
+        """过滤出有并发上限的准入键"""
+        return tuple(sorted({key for key in keys if key[0] in self.limits}))
+
+    def _has_capacity(self, keys: tuple[AdmissionKey, ...]) -> bool:
+        return all(self._running.get(key, 0) < self.limits[key[0]] for key in keys)
+
+    def _blocked_by_waiters(self, entry: tuple[int, int, tuple[AdmissionKey, ...]]) -> bool:
+        """是否有更早或更高优先级的等待者争用同一资源"""
+        keys: set[AdmissionKey] = set(entry[2])
+        return any(
+            waiter[:2] < entry[:2] and keys.intersection(waiter[2])
+            for waiter in self._waiting
+        )
+
+    def _take(self, keys: tuple[AdmissionKey, ...]) -> None:
+        for key in keys:
+            self._running[key] = self._running.get(key, 0) + 1
+
+    def acquire(
+        self,
+        keys: list[AdmissionKey],
+        priority: OperationPriority = OperationPriority.INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> tuple[AdmissionKey, ...]:
+        """申请执行名额，名额不足时阻塞等待
+
+        Returns:
+            tuple[AdmissionKey, ...]: 实际占用的准入键，释放时传给release
+
+        Raises:
+            TimeoutError: timeout秒内未获得名额
+        """
+        limited: tuple[AdmissionKey, ...] = self._limited(keys)
+        if not limited:
+            return limited
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entry: tuple[int, int, tuple[AdmissionKey, ...]] = (priority.value, next(self._seq), limited)
+            self._waiting.append(entry)
+            try:
+                while not self._has_capacity(limited) or self._blocked_by_waiters(entry):
+                    remaining: Optional[float] = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"等待变更操作名额超时: {limited}")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(entry)
+                # 队列变化后其他等待者可能满足条件
+                self._cond.notify_all()
+            self._take(limited)
+        return limited
+
+    def try_acquire(
+        self,
+        keys: list[AdmissionKey],
+        priority: OperationPriority = OperationPriority.BULK,
+    ) -> Optional[tuple[AdmissionKey, ...]]:
+        """非阻塞申请执行名额
+
+        Returns:
+            Optional[tuple[AdmissionKey, ...]]: 获得名额时返回占用的准入键，否则返回None
+        """
+        limited: tuple[AdmissionKey, ...] = self._limited(keys)
+        with self._cond:
+            entry: tuple[int, int, tuple[AdmissionKey, ...]] = (priority.value, next(self._seq), limited)
+            if not self._has_capacity(limited) or self._blocked_by_waiters(entry):
+                return None
+            self._take(limited)
+        return limited
+
+    def release(self, keys: tuple[AdmissionKey, ...]) -> None:
+        """释放执行名额"""
+        if not keys:
+            return
+        with self._cond:
+            for key in keys:
+                count: int = self._running.get(key, 0) - 1
+                if count > 0:
+                    self._running[key] = count
+                else:
+                    self._running.pop(key, None)
+            self._cond.notify_all()
+
+    def add_waiting(self, priority: OperationPriority, count: int) -> None:
+        """登记通过try_acquire轮询申请名额的排队数量，用于统计队列深度"""
+        with self._cond:
+            self._polling[priority] = self._polling.get(priority, 0) + count
+
+    @contextmanager
+    def admit(
+        self,
+        keys: list[AdmissionKey],
+        priority: OperationPriority = OperationPriority.INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> Iterator[None]:
+        """在名额内执行操作
+
+        Sample Usage:
+
+        with scheduler.admit([("host", "host-10")], OperationPriority.BULK):
+            vm_obj.PowerOnVM_Task()
+        """
+        acquired: tuple[AdmissionKey, ...] = self.acquire(keys, priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(acquired)
+
+    def stats(self) -> dict[str, Any]:
+        """获取准入控制状态
+
+        Returns:
+            dict[str, Any]: 并发上限、各资源的运行数量和各优先级的排队数量
+        """
+        with self._cond:
+            queue_depth: dict[str, int] = {
+                priority.name.lower(): self._polling.get(priority, 0) for priority in OperationPriority
+            }
+            for waiter in self._waiting:
+                queue_depth[OperationPriority(waiter[0]).name.lower()] += 1
+            running: dict[str, dict[str, int]] = {}
+            for (kind, moid), count in self._running.items():
+                running.setdefault(kind, {})[moid] = count
+        return {
+            "limits": dict(self.limits),
+            "running": running,
+            "queue_depth": queue_depth,
+        }
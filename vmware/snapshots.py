@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+VMware vSphere快照
+分页收集所有虚拟机的快照树和文件布局，在本地展开快照树并计算快照大小，
+按条件过滤后用堆保留前N个快照，不对所有快照整体排序；
+批量创建、删除快照时按主机和存储限制并发数，所有任务通过共享的任务监视器等待
+"""
+
+import heapq
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+
+from pyVmomi import vim
+
+from .bulk import BulkTaskRunner
+from .scheduler import AdmissionKey, AdmissionScheduler
+from .tools import pchelper
+
+
+# 快照报告支持的排序方式：age为最旧的在前，size为最大的在前
+SNAPSHOT_SORTS: tuple[str, ...] = ("age", "size")
+
+# 字节转GB
+GB: float = float(1024 * 1024 * 1024)
+
+
+class Snapshots(object):
+    """ VMware vSphere快照类 """
+
+    # 快照报告需要的虚拟机属性
+    VM_SNAPSHOT_PROPERTIES: list[str] = [
+        "name",
+        "summary.config.uuid",
+        "snapshot.rootSnapshotList",
+        "snapshot.currentSnapshot",
+        "layoutEx.file",
+        "layoutEx.disk",
+        "layoutEx.snapshot",
+    ]
+
+    def __init__(
+        self,
+        vi: Any,
+        page_size: int = 1000,
+        host_concurrency: int = 2,
+        datastore_concurrency: int = 4,
+    ) -> None:
+        """初始化Snapshots实例
+
+        Args:
+            vi: VMwareVSphereInterface实例
+            page_size: 分页收集时每页的虚拟机数量
+            host_concurrency: 每台主机同时执行的快照任务数，0表示不限制
+            datastore_concurrency: 每个存储同时执行的快照任务数，0表示不限制
+        """
+        self.vi: Any = vi
+        self.page_size: int = max(int(page_size), 1)
+        # 快照任务的并发上限，在变更操作的准入控制之外单独限制
+        self.scheduler: AdmissionScheduler = AdmissionScheduler({
+            "host": host_concurrency,
+            "datastore": datastore_concurrency,
+        })
+        self._runner: BulkTaskRunner = BulkTaskRunner(vi, self.scheduler)
+
+    def _iter_vm_pages(self) -> Iterator[list[dict[str, Any]]]:
+        """分页收集所有虚拟机的快照属性"""
+        view_ref: Any = pchelper.get_container_view(self.vi.si, [vim.VirtualMachine])
+        try:
+            yield from pchelper.iter_properties(
+                self.vi.si, view_ref, vim.VirtualMachine, self.VM_SNAPSHOT_PROPERTIES,
+                include_mors=True, page_size=self.page_size)
+        finally:
+            view_ref.Destroy()
+
+    @staticmethod
+    def _chain_files(disk_layouts: Optional[list[Any]]) -> set[int]:
+        """磁盘布局中所有磁盘链的文件"""
+        files: set[int] = set()
+        for disk_layout in disk_layouts or []:
+            for chain in disk_layout.chain or []:
+                files.update(chain.fileKey or [])
+        return files
+
+    @classmethod
+    def snapshot_sizes(cls, vm_data: dict[str, Any]) -> dict[str, int]:
+        """根据文件布局计算每个快照的大小
+
+        快照创建后的写入保存在其子快照或当前运行状态磁盘链中新增的增量文件里，
+        快照的大小为这些增量文件加上其内存和状态文件，不包括基础磁盘和更早的增量文件
+
+        Returns:
+            dict[str, int]: 快照MOID到大小(字节)的映射
+        """
+        file_sizes: dict[int, int] = {
+            file_info.key: file_info.size or 0 for file_info in vm_data.get("layoutEx.file") or []
+        }
+        snapshot_files: dict[str, set[int]] = {}
+        snapshot_state_files: dict[str, set[int]] = {}
+        for snapshot_layout in vm_data.get("layoutEx.snapshot") or []:
+            snapshot_moid: str = snapshot_layout.key._moId
+            snapshot_files[snapshot_moid] = cls._chain_files(snapshot_layout.disk)
+            snapshot_state_files[snapshot_moid] = {
+                file_key for file_key in (snapshot_layout.dataKey, getattr(snapshot_layout, "memoryKey", -1))
+                if file_key is not None and file_key >= 0
+            }
+        current_snapshot: Any = vm_data.get("snapshot.currentSnapshot")
+        current_moid: Optional[str] = current_snapshot._moId if current_snapshot is not None else None
+        running_files: set[int] = cls._chain_files(vm_data.get("layoutEx.disk"))
+
+        sizes: dict[str, int] = {}
+        stack: list[Any] = list(vm_data.get("snapshot.rootSnapshotList") or [])
+        while stack:
+            node = stack.pop()
+            snapshot_moid = node.snapshot._moId
+            children: list[Any] = node.childSnapshotList or []
+            # 子快照和当前运行状态的磁盘链在该快照的磁盘链之上新增的增量文件
+            successor_files: set[int] = set()
+            for child in children:
+                successor_files |= snapshot_files.get(child.snapshot._moId, set())
+            if snapshot_moid == current_moid:
+                successor_files |= running_files
+            own_files: set[int] = successor_files - snapshot_files.get(snapshot_moid, set())
+            own_files |= snapshot_state_files.get(snapshot_moid, set())
+            sizes[snapshot_moid] = sum(file_sizes.get(file_key, 0) for file_key in own_files)
+            stack.extend(children)
+        return sizes
+
+    def iter_vm_snapshots(self, vm_data: dict[str, Any], now: datetime) -> Iterator[dict[str, Any]]:
+        """展开虚拟机的快照树
+
+        Args:
+            vm_data: 收集的虚拟机快照属性
+            now: 计算快照时长的当前时间
+
+        Yields:
+            dict[str, Any]: 快照信息，包括所在虚拟机、父快照和在树中的深度
+        """
+        root_snapshots: list[Any] = vm_data.get("snapshot.rootSnapshotList") or []
+        if not root_snapshots:
+            return
+        current_snapshot: Any = vm_data.get("snapshot.currentSnapshot")
+        current_moid: Optional[str] = current_snapshot._moId if current_snapshot is not None else None
+        sizes: dict[str, int] = self.snapshot_sizes(vm_data)
+        stack: list[tuple[Any, Optional[int], int]] = [(node, None, 0) for node in reversed(root_snapshots)]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            create_time: datetime = node.createTime.astimezone(timezone.utc)
+            snapshot_moid: str = node.snapshot._moId
+            yield {
+                "vm_uuid": vm_data.get("summary.config.uuid") or "",
+                "vm_name": vm_data.get("name", ""),
+                "moid": snapshot_moid,
+                "id": node.id,
+                "name": node.name,
+                "description": node.description or "",
+                "create_time": create_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "age_days": round((now - create_time).total_seconds() / 86400, 1),
+                "state": str(node.state or ""),
+                "quiesced": bool(node.quiesced),
+                "size_gb": round(sizes.get(snapshot_moid, 0) / GB, 2),
+                "parent_id": parent_id,
+                "depth": depth,
+                "is_current": snapshot_moid == current_moid,
+            }
+            stack.extend((child, node.id, depth + 1) for child in reversed(node.childSnapshotList or []))
+
+    def report(
+        self,
+        older_than_days: Optional[float] = None,
+        larger_than_gb: Optional[float] = None,
+        sort: str = "age",
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """所有虚拟机的快照报告
+
+        分页收集时逐页展开快照树，符合条件的快照放入大小为limit的堆中，
+        只对最终保留的快照排序
+
+        Args:
+            older_than_days: 只返回创建时间早于该天数的快照，为空时不过滤
+            larger_than_gb: 只返回大于该大小(GB)的快照，为空时不过滤
+            sort: 排序方式，age为最旧的在前，size为最大的在前
+            limit: 返回的最大快照数
+
+        Returns:
+            dict[str, Any]: 符合条件的快照数量、总大小、有快照的虚拟机数量和快照列表
+        """
+        if sort not in SNAPSHOT_SORTS:
+            raise ValueError(f"不支持的排序方式: {sort}")
+        now: datetime = datetime.now(timezone.utc)
+        # 堆顶为当前保留的快照中排在最后的一个，分数越大越靠前
+        heap: list[tuple[float, int, dict[str, Any]]] = []
+        counter: Iterator[int] = itertools.count()
+        total: int = 0
+        total_size_gb: float = 0
+        vm_uuids: set[str] = set()
+        for page in self._iter_vm_pages():
+            for vm_data in page:
+                for snapshot in self.iter_vm_snapshots(vm_data, now):
+                    if older_than_days is not None and snapshot["age_days"] < older_than_days:
+                        continue
+                    if larger_than_gb is not None and snapshot["size_gb"] <= larger_than_gb:
+                        continue
+                    total += 1
+                    total_size_gb += snapshot["size_gb"]
+                    vm_uuids.add(snapshot["vm_uuid"])
+                    if sort == "age":
+                        # 创建时间越早越靠前，不使用取整后的天数
+                        score: float = -datetime.strptime(
+                            snapshot["create_time"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+                    else:
+                        score = snapshot["size_gb"]
+                    entry: tuple[float, int, dict[str, Any]] = (score, -next(counter), snapshot)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, entry)
+                    elif limit > 0 and entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+        return {
+            "total": total,
+            "total_size_gb": round(total_size_gb, 2),
+            "vm_count": len(vm_uuids),
+            "snapshots": [entry[2] for entry in sorted(heap, reverse=True)],
+        }
+
+    def _admission_keys(self, vm_uuid: str) -> list[AdmissionKey]:
+        """根据清单中的放置信息获取虚拟机快照任务的准入键"""
+        placement: Optional[dict[str, Any]] = self.vi.inventory.get_vm_placement(vm_uuid)
+        if not placement:
+            return []
+        keys: list[AdmissionKey] = [("datastore", ds_moid) for ds_moid in placement["datastores"]]
+        if placement["host"]:
+            keys.append(("host", placement["host"]))
+        return keys
+
+    def _bulk(
+        self,
+        vm_uuids: list[str],
+        prepare: Callable[[dict[str, Any]], dict[str, Any]],
+        submit: Callable[[str, Any], Any],
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict[str, dict[str, str]]:
+        """批量快照操作的公共流程：解析虚拟机、准备操作对象、在名额内提交任务并汇总结果"""
+        results: dict[str, dict[str, str]] = {}
+        total: int = len(vm_uuids) or 1
+
+        def finish(vm_uuid: str, result: Any = None, error: Optional[Any] = None) -> None:
+            if error is None:
+                results[vm_uuid] = {
+                    "result": "success",
+                    "error": "",
+                    "snapshot": result._moId if isinstance(result, vim.vm.Snapshot) else "",
+                }
+            else:
+                results[vm_uuid] = {"result": "error", "error": getattr(error, "msg", None) or str(error), "snapshot": ""}
+            if on_progress:
+                on_progress(int(len(results) * 100 / total))
+
+        vm_objs: dict[str, Any] = self.vi.get_vm_objs_by_uuids(vm_uuids)
+        for vm_uuid in vm_uuids:
+            if vm_uuid not in vm_objs:
+                finish(vm_uuid, error="虚拟机不存在")
+        targets: dict[str, Any] = prepare(vm_objs)
+        for vm_uuid in vm_objs:
+            if vm_uuid not in targets:
+                finish(vm_uuid, error="快照不存在或存在多个同名快照")
+        self._runner.run(
+            {
+                vm_uuid: (self._admission_keys(vm_uuid), self.vi.get_vm_admission_keys(vm_uuid))
+                for vm_uuid in targets
+            },
+            lambda vm_uuid: submit(vm_uuid, targets[vm_uuid]),
+            finish)
+        return results
+
+    def create_snapshots(
+        self,
+        vm_uuids: list[str],
+        name: str,
+        description: str = "",
+        memory: bool = False,
+        quiesce: bool = False,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict[str, dict[str, str]]:
+        """批量创建快照
+
+        Args:
+            vm_uuids: 虚拟机UUID列表
+            name: 快照名称
+            description: 快照描述
+            memory: 是否包括虚拟机内存
+            quiesce: 是否静默客户机文件系统，需要安装VMware Tools
+            on_progress: 接收整体进度(0-100)
+
+        Returns:
+            dict[str, dict[str, str]]: 每台虚拟机的操作结果，result为success或error，snapshot为新快照的MOID
+        """
+        return self._bulk(
+            vm_uuids,
+            lambda vm_objs: vm_objs,
+            lambda vm_uuid, vm_obj: vm_obj.CreateSnapshot_Task(
+                name=name, description=description, memory=memory, quiesce=quiesce),
+            on_progress)
+
+    def find_snapshots(self, vm_objs: dict[str, Any], name: str) -> dict[str, Any]:
+        """通过一次属性收集在多台虚拟机的快照树中按名称查找快照
+
+        同一虚拟机有多个同名快照时不删除，以免删错快照
+
+        Returns:
+            dict[str, Any]: 虚拟机UUID到快照对象的映射，只包括恰好有一个同名快照的虚拟机
+        """
+        uuid_by_moid: dict[str, str] = {vm_obj._moId: vm_uuid for vm_uuid, vm_obj in vm_objs.items()}
+        snapshots: dict[str, Any] = {}
+        for vm_data in pchelper.collect_object_properties(
+                self.vi.si, list(vm_objs.values()), vim.VirtualMachine, ["snapshot.rootSnapshotList"]):
+            matches: list[Any] = []
+            stack: list[Any] = list(vm_data.get("snapshot.rootSnapshotList") or [])
+            while stack:
+                node: Any = stack.pop()
+                if node.name == name:
+                    matches.append(node.snapshot)
+                stack.extend(node.childSnapshotList or [])
+            if len(matches) == 1:
+                snapshots[uuid_by_moid[vm_data["obj"]._moId]] = matches[0]
+        return snapshots
+
+    def remove_snapshots(
+        self,
+        vm_uuids: list[str],
+        name: str,
+        remove_children: bool = False,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict[str, dict[str, str]]:
+        """批量删除指定名称的快照
+
+        Args:
+            vm_uuids: 虚拟机UUID列表
+            name: 快照名称
+            remove_children: 是否同时删除子快照
+            on_progress: 接收整体进度(0-100)
+
+        Returns:
+            dict[str, dict[str, str]]: 每台虚拟机的操作结果，result为success或error
+        """
+        snapshots: dict[str, Any] = {}
+
+        def prepare(vm_objs: dict[str, Any]) -> dict[str, Any]:
+            snapshots.update(self.find_snapshots(vm_objs, name))
+            return {vm_uuid: vm_objs[vm_uuid] for vm_uuid in snapshots}
+
+        return self._bulk(
+            vm_uuids,
+            prepare,
+            lambda vm_uuid, vm_obj: snapshots[vm_uuid].RemoveSnapshot_Task(
+                removeChildren=remove_children, consolidate=True),
+            on_progress)
@@ -8,11 +8,38 @@ http://www.apache.org/licenses/LICENSE-2.0.html
 """
 
 import logging
-from xml.etree.ElementTree import Element
-from xml.etree.ElementTree import SubElement
-from xml.etree.ElementTree import tostring
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# SetAlarmStatus SOAP envelope, only the morefs change between requests
+_PAYLOAD_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    '<soap:Body>'
+    '<SetAlarmStatus xmlns="urn:vim25">'
+    '<_this xsi:type="ManagedObjectReference" type="AlarmManager">'
+    'AlarmManager</_this>'
+    '<alarm type="Alarm">{alarm_moref}</alarm>'
+    '<entity xsi:type="ManagedObjectReference" type={entity_type}>'
+    '{entity_moref}</entity>'
+    '<status>green</status>'
+    '</SetAlarmStatus>'
+    '</soap:Body>'
+    '</soap:Envelope>'
+)
+
+# Number of keep-alive connections kept per vCenter host
+HTTP_POOL_SIZE = 16
+
+_http_session = None
+_http_session_lock = threading.Lock()
 
 
 def reset_alarm(**kwargs):
@@ -51,6 +78,55 @@ def reset_alarm(**kwargs):
     return True
 
 
+def reset_alarms(service_instance, alarms, max_workers=8):
+    """
+    Resets many alarms to the green state concurrently.
+
+    All requests share one pooled HTTP session, so connections to the
+    vCenter are kept alive and reused instead of opening one per alarm.
+    At most max_workers requests (capped at HTTP_POOL_SIZE) are in flight
+    at the same time.
+
+    Usage:
+    SI = SmartConnect(xxx)
+    results = alarm.reset_alarms(SI, [
+        {'entity_moref': 'host-95', 'entity_type': 'HostSystem',
+         'alarm_moref': 'alarm-1'},
+    ])
+    :param service_instance:
+    :param alarms: list of dicts with entity_moref, entity_type, alarm_moref
+    :param max_workers:
+    :return list: [{'alarm': 'alarm-1', 'entity': 'host-95',
+                    'success': True, 'error': ''}]
+    """
+    stub = service_instance._stub
+
+    def reset(alarm_kwargs):
+        result = {
+            "alarm": alarm_kwargs.get("alarm_moref"),
+            "entity": alarm_kwargs.get("entity_moref"),
+            "success": False,
+            "error": "",
+        }
+        try:
+            res = _post(_build_payload(**alarm_kwargs), stub)
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+        if res.status_code != 200:
+            result["error"] = "HTTP Status: {0}".format(res.status_code)
+            return result
+        result["success"] = True
+        return result
+
+    if not alarms:
+        return []
+    # More workers than pooled connections would only open throwaway ones
+    workers = max(min(max_workers, HTTP_POOL_SIZE, len(alarms)), 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(reset, alarms))
+
+
 def _build_payload(**kwargs):
     """
     Builds a SOAP envelope to send to the vsphere hidden API
@@ -67,31 +143,10 @@ def _build_payload(**kwargs):
         raise ValueError("entity_moref, entity_type, and alarm_moref "
                          "must be set")
 
-    attribs = {
-        'xmlns:xsd': 'http://www.w3.org/2001/XMLSchema',
-        'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
-        'xmlns:soap': 'http://schemas.xmlsoap.org/soap/envelope/'
-    }
-    root = Element('soap:Envelope', attribs)
-    body = SubElement(root, 'soap:Body')
-    alarm_status = SubElement(body, 'SetAlarmStatus', {'xmlns': 'urn:vim25'})
-    this = SubElement(alarm_status, '_this', {
-        'xsi:type': 'ManagedObjectReference',
-        'type': 'AlarmManager'
-    })
-    this.text = 'AlarmManager'
-    alarm = SubElement(alarm_status, 'alarm', {'type': 'Alarm'})
-    alarm.text = alarm_moref
-    entity = SubElement(alarm_status, 'entity', {
-        'xsi:type': 'ManagedObjectReference',
-        'type': entity_type
-    })
-    entity.text = entity_moref
-    status = SubElement(alarm_status, 'status')
-    status.text = 'green'
-    # I hate hard coding this but I have no idea how to do it any other way
-    # pull requests welcome :)
-    return '<?xml version="1.0" encoding="UTF-8"?>{0}'.format(tostring(root))
+    return _PAYLOAD_TEMPLATE.format(
+        alarm_moref=escape(alarm_moref),
+        entity_type=quoteattr(entity_type),
+        entity_moref=escape(entity_moref))
 
 
 def _send_request(payload=None, session=None):
@@ -103,23 +158,52 @@ def _send_request(payload=None, session=None):
     :param session:
     :return:
     """
-    stub = session
+    res = _post(payload, session)
+    if res.status_code != 200:
+        logging.debug("Failed to reset alarm. HTTP Status: %s", res.status_code)
+        return False
+    return True
+
+
+def _get_http_session():
+    """
+    Returns the shared requests session, creating it on first use.
+
+    :return requests.Session:
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            http_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                  pool_maxsize=HTTP_POOL_SIZE)
+            http_session.mount('https://', adapter)
+            # I opted to ignore invalid ssl here because that happens in
+            # pyvmomi. Once pyvmomi validates ssl it wont take much to make
+            # it happen here.
+            http_session.verify = False
+            _http_session = http_session
+        return _http_session
+
+
+def _post(payload, stub):
+    """
+    Posts a SOAP envelope to the vsphere API over the shared session.
+
+    :param payload:
+    :param stub:
+    :return requests.Response:
+    """
     host_port = stub.host
     # Ive seen some code in pyvmomi where it seems like we check for http vs
     # https but since the default is https do people really run it on http?
     url = 'https://{0}/sdk'.format(host_port)
     logging.debug("Sending %s to %s", payload, url)
-    # I opted to ignore invalid ssl here because that happens in pyvmomi.
-    # Once pyvmomi validates ssl it wont take much to make it happen here.
-    res = requests.post(url=url, data=payload, headers={
+    return _get_http_session().post(url=url, data=payload, headers={
         'Cookie': stub.cookie,
         'SOAPAction': 'urn:vim25',
         'Content-Type': 'application/xml'
-    }, verify=False)
-    if res.status_code != 200:
-        logging.debug("Failed to reset alarm. HTTP Status: %s", res.status_code)
-        return False
-    return True
+    })
 
 
 def print_triggered_alarms(entity=None):
@@ -14,14 +14,25 @@ This module implements simple helper functions for working with:
 """
 
 
-def retrieve_fcd(content, datastore, vdisk):
+def retrieve_fcd(content, datastore, vdisk, catalog=None):
     """
     Retrieves the managed object for the first class disk specified
 
+    Without a catalog every disk on the datastore is retrieved until the
+    name matches. With a catalog (vmware.fcd.FcdCatalog) the name is looked
+    up in its cached name index instead.
+
     Sample Usage:
 
     retrieve_fcd(content, datastore, "First Class Disk Name")
+    retrieve_fcd(content, datastore, "First Class Disk Name", catalog)
     """
+    if catalog is not None:
+        fcd = catalog.get_by_name(datastore, vdisk)
+        if not fcd:
+            raise RuntimeError("First Class Disk not found.")
+        return fcd
+
     # Set vStorageObjectManager
     storage = content.vStorageObjectManager
 
@@ -37,14 +48,25 @@ def retrieve_fcd(content, datastore, vdisk):
     return fcd
 
 
-def retrieve_fcd_snapshot(content, datastore, vdisk, snapshot_name):
+def retrieve_fcd_snapshot(content, datastore, vdisk, snapshot_name,
+                          catalog=None):
     """
     Retrieves the managed object for the fcd snapshot specified
 
+    With a catalog (vmware.fcd.FcdCatalog) the snapshot list of each disk
+    is cached and only retrieved again when the name is not found.
+
     Sample Usage:
 
     retrieve_fcd_snapshot(content, datastore, vdisk, "Snapshot Name")
+    retrieve_fcd_snapshot(content, datastore, vdisk, "Snapshot Name", catalog)
     """
+    if catalog is not None:
+        fcd_snapshot = catalog.get_snapshot_id(datastore, vdisk, snapshot_name)
+        if not fcd_snapshot:
+            raise RuntimeError("Snapshot not found.")
+        return fcd_snapshot
+
     # Set vStorageObjectManager
     storage = content.vStorageObjectManager
 
@@ -11,8 +11,19 @@ This module implements simple helper functions for working with the
 VMware Storage Policy (pbm) API
 """
 
+import ssl
+import threading
+import time
+
+import pyVmomi
 from pyVmomi import pbm, VmomiSupport
 
+from ..cache import is_expired
+
+# PBM sessions keyed by vCenter host and session cookie
+_pbm_sessions = {}
+_pbm_sessions_lock = threading.Lock()
+
 
 def create_pbm_session(stub):
     """
@@ -52,15 +63,134 @@ def create_pbm_session(stub):
     return pbm_si
 
 
-def retrieve_storage_policy(pbm_content, policy):
+def get_pbm_session(stub):
+    """
+    Returns a long-lived session with the VMware Storage Policy API
+
+    The session is bound to the vCenter session: the vCenter session
+    cookie is passed in the stub's own request context instead of the
+    thread-local one, so the session can be shared between threads. Its
+    connection pool keeps the HTTP connections alive between calls. A new
+    session is created only when the vCenter session cookie changes,
+    e.g. after a reconnect.
+
+    Sample Usage:
+
+    pbm_si = get_pbm_session(service_instance._stub)
+    pbm_content = pbm_si.RetrieveContent()
+    """
+    session_cookie = stub.cookie.split('"')[1]
+    key = (stub.host, session_cookie)
+    with _pbm_sessions_lock:
+        pbm_si = _pbm_sessions.get(key)
+        if pbm_si is not None:
+            return pbm_si
+
+        # Drop sessions bound to an older cookie of the same vCenter
+        for old_key in [k for k in _pbm_sessions if k[0] == stub.host]:
+            _pbm_sessions.pop(old_key)
+
+        context = None
+        if hasattr(ssl, "_create_unverified_context"):
+            context = ssl._create_unverified_context()
+        pbm_stub = pyVmomi.SoapStubAdapter(
+            host=stub.host.split(":")[0],
+            version="pbm.version.version1",
+            path="/pbm/sdk",
+            sslContext=context,
+            requestContext={"vcSessionCookie": session_cookie})
+        pbm_stub.cookie = stub.cookie
+        pbm_si = pbm.ServiceInstance("ServiceInstance", pbm_stub)
+        _pbm_sessions[key] = pbm_si
+        return pbm_si
+
+
+class StoragePolicyCache(object):
+    """
+    Caches the storage (REQUIREMENT) policies by name
+
+    The profiles are downloaded with a single PbmRetrieveContent call and
+    kept for ttl seconds. A lookup that misses reloads the profiles at
+    most once every miss_refresh_interval seconds, so newly created
+    policies are found without downloading all profiles on every miss.
+
+    Sample Usage:
+
+    cache = StoragePolicyCache(ttl=300)
+    profile = cache.get(pbm_content, "Policy Name")
+    """
+
+    def __init__(self, ttl=300, miss_refresh_interval=5):
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._refresh_time = None
+
+    def _refresh(self, pbm_content):
+        profile_manager = pbm_content.profileManager
+        profile_ids = profile_manager.PbmQueryProfile(
+            resourceType=pbm.profile.ResourceType(resourceType="STORAGE"),
+            profileCategory="REQUIREMENT")
+        profiles = []
+        if profile_ids:
+            profiles = profile_manager.PbmRetrieveContent(
+                profileIds=profile_ids)
+        self._profiles = {profile.name: profile for profile in profiles}
+        self._refresh_time = time.monotonic()
+
+    def _ensure_fresh(self, pbm_content, max_age):
+        if is_expired(self._refresh_time, max_age):
+            self._refresh(pbm_content)
+
+    def list_policies(self, pbm_content):
+        """
+        Returns all cached storage policies
+        """
+        with self._lock:
+            self._ensure_fresh(pbm_content, self.ttl)
+            return list(self._profiles.values())
+
+    def get(self, pbm_content, policy):
+        """
+        Returns the storage policy with the given name or None
+        """
+        with self._lock:
+            self._ensure_fresh(pbm_content, self.ttl)
+            profile = self._profiles.get(policy)
+            if profile is None:
+                self._ensure_fresh(pbm_content, self.miss_refresh_interval)
+                profile = self._profiles.get(policy)
+            return profile
+
+    def invalidate(self):
+        """
+        Drops the cached policies, the next lookup downloads them again
+        """
+        with self._lock:
+            self._profiles = {}
+            self._refresh_time = None
+
+
+def retrieve_storage_policy(pbm_content, policy, cache=None):
     """
     Retrieves the managed object for the storage policy specified
 
+    With a cache (StoragePolicyCache) the policy is looked up by name in
+    the cached profiles instead of downloading every profile.
+
     Sample Usage:
 
     pbm_content = pbm_si.RetrieveContent()
     retrieve_storage_policy(pbm_content, "Policy Name")
+    retrieve_storage_policy(pbm_content, "Policy Name", cache)
     """
+    if cache is not None:
+        storage_polity_profile = cache.get(pbm_content, policy)
+        if not storage_polity_profile:
+            raise RuntimeError("Storage Policy specified not found.")
+        return storage_polity_profile
+
     # Set PbmQueryProfile
     profile_manager = pbm_content.profileManager
 
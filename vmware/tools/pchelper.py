@@ -2,6 +2,8 @@
 Property Collector helper module.
 """
 
+import time
+
 import pyVmomi
 
 
@@ -156,3 +158,229 @@ def get_obj(content, vim_type, name, folder=None, recurse=True):
     if not obj:
         raise RuntimeError("Managed Object " + name + " not found.")
     return obj
+
+
+def wait_for_properties(si, obj, path_set, condition, timeout):
+    """
+    Wait until the properties of a managed object satisfy a condition.
+
+    Property changes are pushed by a dedicated PropertyCollector through
+    WaitForUpdatesEx, so the caller returns as soon as the change is
+    observed instead of polling.
+
+    Sample Usage:
+
+    wait_for_properties(si, vm, ['runtime.powerState'],
+                        lambda props: props['runtime.powerState'] == 'poweredOff',
+                        timeout=300)
+
+    Args:
+        si      (ServiceInstance): ServiceInstance connection
+        obj       (ManagedObject): Managed object to watch
+        path_set           (list): List of properties to watch
+        condition      (callable): Called with a dict of the current property
+                                   values, returns True when done
+        timeout             (int): Seconds to wait before giving up
+
+    Returns:
+        The dict of property values that satisfied the condition
+
+    Raises:
+        TimeoutError if the condition is not met within timeout
+    """
+    collector = si.content.propertyCollector.CreatePropertyCollector()
+    try:
+        obj_spec = pyVmomi.vmodl.query.PropertyCollector.ObjectSpec(obj=obj)
+        property_spec = pyVmomi.vmodl.query.PropertyCollector.PropertySpec(
+            type=obj.__class__, pathSet=path_set)
+        filter_spec = pyVmomi.vmodl.query.PropertyCollector.FilterSpec(
+            objectSet=[obj_spec], propSet=[property_spec])
+        collector.CreateFilter(filter_spec, True)
+
+        properties = {}
+        version = ''
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = int(deadline - time.monotonic())
+            if remaining <= 0:
+                raise TimeoutError(
+                    "Properties %s of %s did not reach the expected state in %s seconds"
+                    % (path_set, obj._moId, timeout))
+            options = pyVmomi.vmodl.query.PropertyCollector.WaitOptions(
+                maxWaitSeconds=remaining)
+            update = collector.WaitForUpdatesEx(version, options)
+            if update is None:
+                continue
+            for filter_set in update.filterSet:
+                for obj_set in filter_set.objectSet:
+                    for change in obj_set.changeSet:
+                        properties[change.name] = change.val
+            if condition(properties):
+                return properties
+            version = update.version
+    finally:
+        collector.Destroy()
+
+
+def iter_properties(si, view_ref, obj_type, path_set=None,
+                    include_mors=False, page_size=1000):
+    """
+    Collect properties for managed objects from a view ref page by page
+
+    Unlike collect_properties, RetrievePropertiesEx is used with maxObjects
+    and the remaining pages are fetched with ContinueRetrievePropertiesEx,
+    so the caller can process each page before the next one is retrieved.
+
+    Sample Usage:
+
+    for page in iter_properties(si, view_ref, vim.VirtualMachine,
+                                ['name'], include_mors=True):
+        for properties in page:
+            print(properties['name'])
+
+    Args:
+        si          (ServiceInstance): ServiceInstance connection
+        view_ref (pyVmomi.vim.view.*): Starting point of inventory navigation
+        obj_type      (pyVmomi.vim.*): Type of managed object
+        path_set               (list): List of properties to retrieve
+        include_mors           (bool): If True include the managed objects
+                                       refs in the result
+        page_size               (int): Maximum number of objects per page
+
+    Yields:
+        A list of properties for the managed objects of one page
+    """
+    collector = si.content.propertyCollector
+
+    traversal_spec = pyVmomi.vmodl.query.PropertyCollector.TraversalSpec(
+        name='traverseEntities', path='view', skip=False,
+        type=view_ref.__class__)
+    obj_spec = pyVmomi.vmodl.query.PropertyCollector.ObjectSpec(
+        obj=view_ref, skip=True, selectSet=[traversal_spec])
+    property_spec = pyVmomi.vmodl.query.PropertyCollector.PropertySpec(
+        type=obj_type, all=not path_set, pathSet=path_set or [])
+    filter_spec = pyVmomi.vmodl.query.PropertyCollector.FilterSpec(
+        objectSet=[obj_spec], propSet=[property_spec])
+    options = pyVmomi.vmodl.query.PropertyCollector.RetrieveOptions(
+        maxObjects=page_size)
+
+    result = collector.RetrievePropertiesEx([filter_spec], options)
+    try:
+        while result:
+            page = []
+            for obj in result.objects:
+                properties = {}
+                for prop in obj.propSet:
+                    properties[prop.name] = prop.val
+
+                if include_mors:
+                    properties['obj'] = obj.obj
+
+                page.append(properties)
+            yield page
+
+            if not result.token:
+                break
+            token, result = result.token, None
+            result = collector.ContinueRetrievePropertiesEx(token)
+    finally:
+        # Release the server side result set if the caller stops early
+        if result is not None and result.token:
+            collector.CancelRetrievePropertiesEx(result.token)
+
+
+def collect_object_properties(si, objs, obj_type, path_set=None):
+    """
+    Collect properties for a given list of managed objects in one call
+
+    Unlike collect_properties no view is traversed, one ObjectSpec is
+    created per object, so objects that are not reachable from a view
+    (e.g. Alarm) can be read in a single round trip.
+
+    Sample Usage:
+
+    for properties in collect_object_properties(si, alarms, vim.alarm.Alarm,
+                                                ['info.name']):
+        print(properties['obj'], properties['info.name'])
+
+    Args:
+        si          (ServiceInstance): ServiceInstance connection
+        objs                   (list): List of managed object refs
+        obj_type      (pyVmomi.vim.*): Type of managed object
+        path_set               (list): List of properties to retrieve
+
+    Returns:
+        A list of properties for the managed objects, including the
+        managed object refs
+    """
+    if not objs:
+        return []
+
+    collector = si.content.propertyCollector
+    obj_specs = [pyVmomi.vmodl.query.PropertyCollector.ObjectSpec(obj=obj)
+                 for obj in objs]
+    property_spec = pyVmomi.vmodl.query.PropertyCollector.PropertySpec(
+        type=obj_type, all=not path_set, pathSet=path_set or [])
+    filter_spec = pyVmomi.vmodl.query.PropertyCollector.FilterSpec(
+        objectSet=obj_specs, propSet=[property_spec])
+
+    data = []
+    for obj in collector.RetrieveContents([filter_spec]):
+        properties = {}
+        for prop in obj.propSet:
+            properties[prop.name] = prop.val
+        properties['obj'] = obj.obj
+        data.append(properties)
+    return data
+
+
+def collect_multi_properties(si, view_ref, path_sets):
+    """
+    Collect properties for managed objects of several types from a view ref
+    in one call
+
+    One PropertySpec is created per type, so e.g. networks, switches and
+    the hosts attached to them are read in a single round trip. Properties
+    of all specs that match an object (including specs of its parent
+    types) are merged into one dict.
+
+    Sample Usage:
+
+    view_ref = get_container_view(si, [vim.Network, vim.HostSystem])
+    for properties in collect_multi_properties(si, view_ref, {
+            vim.Network: ['name'], vim.HostSystem: ['name']}):
+        print(properties['obj'], properties['name'])
+
+    Args:
+        si          (ServiceInstance): ServiceInstance connection
+        view_ref (pyVmomi.vim.view.*): Starting point of inventory navigation
+        path_sets              (dict): Type of managed object to the list of
+                                       properties to retrieve
+
+    Returns:
+        A list of properties for the managed objects, including the
+        managed object refs
+    """
+    collector = si.content.propertyCollector
+
+    traversal_spec = pyVmomi.vmodl.query.PropertyCollector.TraversalSpec(
+        name='traverseEntities', path='view', skip=False,
+        type=view_ref.__class__)
+    obj_spec = pyVmomi.vmodl.query.PropertyCollector.ObjectSpec(
+        obj=view_ref, skip=True, selectSet=[traversal_spec])
+    property_specs = [
+        pyVmomi.vmodl.query.PropertyCollector.PropertySpec(
+            type=obj_type, all=not path_set, pathSet=path_set or [])
+        for obj_type, path_set in path_sets.items()
+    ]
+    filter_spec = pyVmomi.vmodl.query.PropertyCollector.FilterSpec(
+        objectSet=[obj_spec], propSet=property_specs)
+
+    data = []
+    for obj in collector.RetrieveContents([filter_spec]):
+        properties = {}
+        for prop in obj.propSet:
+            properties[prop.name] = prop.val
+        properties['obj'] = obj.obj
+        data.append(properties)
+    return data
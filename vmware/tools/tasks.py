@@ -9,6 +9,10 @@ http://www.apache.org/licenses/LICENSE-2.0.html
 
 Helper module for task operations.
 """
+import logging
+import threading
+from concurrent.futures import Future
+
 from pyVmomi import vim
 from pyVmomi import vmodl
 
@@ -58,3 +62,208 @@ def wait_for_tasks(si, tasks):
     finally:
         if pcfilter:
             pcfilter.Destroy()
+
+
+class TaskMonitor(object):
+    """
+    Watches all outstanding tasks of a service instance through a single
+    PropertyCollector filter and one update loop.
+
+    Tasks are added to and removed from a ListView that the filter traverses,
+    so the filter never has to be recreated. The loop runs in a daemon thread
+    on a dedicated collector and resolves a Future per watched task.
+
+    Sample Usage:
+
+    monitor = TaskMonitor(si)
+    future = monitor.watch(vm.PowerOnVM_Task())
+    monitor.wait([vm.PowerOffVM_Task()])
+    """
+
+    # Task properties needed to decide completion and report progress
+    PATH_SET = ['info.state', 'info.progress', 'info.result', 'info.error']
+
+    def __init__(self, si, max_wait_seconds=30):
+        """
+        :param si: ServiceInstance connection
+        :param max_wait_seconds: upper bound of a single WaitForUpdatesEx call,
+                                 bounds how long stop() takes to take effect
+        """
+        self._si = si
+        self._max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._watchers = {}
+        self._collector = None
+        self._view = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def watch(self, task, callback=None, on_progress=None):
+        """
+        Start watching a task.
+
+        :param task: vim.Task
+        :param callback: called with the Future once the task finishes
+        :param on_progress: called with the task progress (0-100)
+        :return Future: resolves to info.result, or raises info.error
+        """
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        with self._lock:
+            if self._thread is None:
+                self._start()
+            watchers = self._watchers.setdefault(task._moId, [])
+            watchers.append((task, future, on_progress))
+            view = self._view
+            first = len(watchers) == 1
+        if first:
+            try:
+                view.ModifyListView(add=[task])
+            except Exception as error:
+                self._resolve(task._moId, error=error)
+        return future
+
+    def wait(self, tasks, on_progress=None, timeout=None):
+        """
+        Given a list of tasks, returns after all the tasks are complete.
+        Raises the error of the first failed task, like wait_for_tasks.
+
+        :return list: info.result of each task
+        """
+        futures = [self.watch(task, on_progress=on_progress) for task in tasks]
+        return [future.result(timeout) for future in futures]
+
+    def pending(self):
+        """
+        :return int: number of tasks still being watched
+        """
+        with self._lock:
+            return len(self._watchers)
+
+    def stop(self):
+        """
+        Stops the update loop and fails every task still being watched.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._stopped.set()
+        thread.join()
+
+    def _start(self):
+        """
+        Creates the dedicated collector, the ListView and the single filter,
+        then starts the update loop. Must be called with the lock held.
+        """
+        content = self._si.content
+        self._collector = content.propertyCollector.CreatePropertyCollector()
+        self._view = content.viewManager.CreateListView(obj=[])
+
+        traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+            name='traverseTasks', type=vim.view.ListView, path='view', skip=False)
+        obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+            obj=self._view, skip=True, selectSet=[traversal_spec])
+        property_spec = vmodl.query.PropertyCollector.PropertySpec(
+            type=vim.Task, pathSet=self.PATH_SET, all=False)
+        filter_spec = vmodl.query.PropertyCollector.FilterSpec(
+            objectSet=[obj_spec], propSet=[property_spec])
+        self._collector.CreateFilter(filter_spec, True)
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name='vmware-task-monitor', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        """
+        Single WaitForUpdatesEx loop dispatching updates of every task.
+        """
+        options = vmodl.query.PropertyCollector.WaitOptions(
+            maxWaitSeconds=self._max_wait_seconds)
+        states = {}
+        version = ''
+        error = None
+        try:
+            while not self._stopped.is_set():
+                update = self._collector.WaitForUpdatesEx(version, options)
+                if update is None:
+                    continue
+                finished = []
+                for filter_set in update.filterSet:
+                    for obj_set in filter_set.objectSet:
+                        moid = obj_set.obj._moId
+                        if obj_set.kind == 'leave':
+                            states.pop(moid, None)
+                            continue
+                        state = states.setdefault(moid, {})
+                        for change in obj_set.changeSet:
+                            state[change.name] = change.val
+                        self._notify_progress(moid, state.get('info.progress'))
+                        if state.get('info.state') in (vim.TaskInfo.State.success,
+                                                       vim.TaskInfo.State.error):
+                            finished.append((obj_set.obj, states.pop(moid)))
+                outcomes = {}
+                for task, state in finished:
+                    if state['info.state'] == vim.TaskInfo.State.success:
+                        outcomes[task._moId] = {'result': state.get('info.result')}
+                    else:
+                        outcomes[task._moId] = {'error': state.get('info.error') or
+                                                RuntimeError("task %s failed" % task._moId)}
+                    self._resolve(task._moId, **outcomes[task._moId])
+                if finished:
+                    # A watch() for a finished task may arrive after _resolve.
+                    # Its task is still in the view, so no further update would
+                    # come once it is removed: resolve it with the known outcome.
+                    with self._lock:
+                        late = [moid for moid in outcomes if moid in self._watchers]
+                        self._view.ModifyListView(remove=[task for task, _ in finished])
+                    for moid in late:
+                        self._resolve(moid, **outcomes[moid])
+                version = update.version
+        except Exception as e:
+            logging.error("task monitor update loop failed: %s", e)
+            error = e
+        finally:
+            self._shutdown(error or RuntimeError("task monitor stopped"))
+
+    def _notify_progress(self, moid, progress):
+        if progress is None:
+            return
+        with self._lock:
+            watchers = list(self._watchers.get(moid, []))
+        for _, _, on_progress in watchers:
+            if on_progress:
+                on_progress(progress)
+
+    def _resolve(self, moid, result=None, error=None):
+        with self._lock:
+            watchers = self._watchers.pop(moid, [])
+        for _, future, _ in watchers:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _shutdown(self, error):
+        """
+        Tears down the collector and fails the outstanding tasks, so the next
+        watch() starts a fresh loop, e.g. after the session expired.
+        """
+        with self._lock:
+            watchers, self._watchers = self._watchers, {}
+            collector, view = self._collector, self._view
+            self._collector = self._view = self._thread = None
+        for moid in watchers:
+            for _, future, _ in watchers[moid]:
+                if not future.done():
+                    future.set_exception(error)
+        for managed_object in (view, collector):
+            try:
+                if managed_object is not None:
+                    managed_object.Destroy()
+            except Exception:
+                pass